@@ -0,0 +1,49 @@
+"""
+Бенчмарк асинхронного режима: сколько сессий Reader-машины одно ядро
+обслуживает одновременно в одном цикле asyncio.
+
+    python -m benchmarks.bench_async_sessions
+"""
+import asyncio
+import random
+import time
+
+from benchmarks.common import load_cgml_sm
+from state_machine_sim.cgml_signal import StateMachine, run_state_machine, run_state_machine_async
+
+MESSAGE_LENGTH = 200
+
+
+def make_messages(count: int) -> list[str]:
+    rnd = random.Random(0)
+    return [''.join(rnd.choice('АБВГ') for _ in range(MESSAGE_LENGTH)) for _ in range(count)]
+
+
+async def run_sessions(cgml_sm, messages: list[str], yield_every: int):
+    return await asyncio.gather(*(
+        run_state_machine_async(StateMachine(cgml_sm, {'message': m}), [], None,
+                                yield_every=yield_every)
+        for m in messages
+    ))
+
+
+def main():
+    cgml_sm = load_cgml_sm('tests/from_ide.graphml')
+    print(f"{'mode':<24}{'sessions':>10}{'sec':>10}{'sessions/s':>12}")
+    for count in (100, 1000, 5000):
+        messages = make_messages(count)
+        start = time.perf_counter()
+        for m in messages:
+            run_state_machine(StateMachine(cgml_sm, {'message': m}), [], None)
+        elapsed = time.perf_counter() - start
+        print(f"{'sync, sequential':<24}{count:>10}{elapsed:>10.2f}{count / elapsed:>12.0f}")
+        for yield_every in (16, 256):
+            start = time.perf_counter()
+            asyncio.run(run_sessions(cgml_sm, messages, yield_every))
+            elapsed = time.perf_counter() - start
+            name = f'async, yield/{yield_every}'
+            print(f"{name:<24}{count:>10}{elapsed:>10.2f}{count / elapsed:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
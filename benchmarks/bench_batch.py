@@ -0,0 +1,45 @@
+"""
+Бенчмарк run_batch: накладные расходы на один вход при 10 000 входов.
+
+Сравнивается сборка машины на каждый вход (как в auto_test_reader) и
+run_batch поверх одной собранной машины. Сообщения короткие, чтобы время
+запуска определялось накладными расходами, а не самой симуляцией.
+
+    python -m benchmarks.bench_batch
+"""
+import random
+import time
+
+from benchmarks.common import load_cgml_sm
+from state_machine_sim.batch import run_batch
+from state_machine_sim.cgml_signal import StateMachine, run_state_machine
+
+INPUTS = 10_000
+
+
+def main():
+    cgml_sm = load_cgml_sm('Задача 9.graphml')
+    rnd = random.Random(0)
+    parameters = [
+        {'message': ''.join(rnd.choice('АБВГ') for _ in range(rnd.randint(0, 3)))}
+        for _ in range(INPUTS)
+    ]
+
+    start = time.perf_counter()
+    for params in parameters:
+        run_state_machine(StateMachine(cgml_sm, params), [], None)
+    rebuild = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sm = StateMachine(cgml_sm, parameters[0])
+    for _ in run_batch(sm, parameters, [], timeout_sec=None):
+        pass
+    batch = time.perf_counter() - start
+
+    print(f"{'mode':<28}{'total s':>10}{'us/input':>10}")
+    print(f"{'rebuild per input':<28}{rebuild:>10.2f}{rebuild / INPUTS * 1e6:>10.0f}")
+    print(f"{'run_batch':<28}{batch:>10.2f}{batch / INPUTS * 1e6:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
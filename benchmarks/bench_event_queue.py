@@ -0,0 +1,73 @@
+"""
+Бенчмарк очереди событий: сколько стоит одно событие при росте длины запуска.
+
+Сценарий похож на Reader: на каждый обработанный сигнал машина добавляет одно
+событие, а в очереди всё время лежат внешние сигналы, поданные на старте.
+Для сравнения запускается прежняя реализация (list.insert по курсору).
+
+    python -m benchmarks.bench_event_queue
+"""
+import time
+import tracemalloc
+
+from state_machine_sim.event_loop import EventLoop
+from state_machine_sim.trace import make_trace
+
+PENDING_EXTERNAL = 20_000
+
+
+class ListEventLoop:
+    """Прежняя реализация EventLoop."""
+
+    def __init__(self):
+        self.events = []
+        self.current_event_idx = 0
+        self.insert_event_idx = 0
+
+    def add_event(self, event):
+        self.insert_event_idx += 1
+        self.events.insert(self.insert_event_idx, event)
+
+    def get_event(self):
+        if self.current_event_idx < len(self.events):
+            event = self.events[self.current_event_idx]
+            self.current_event_idx += 1
+            self.insert_event_idx = self.current_event_idx
+            return event
+        return None
+
+
+def drive(loop, n_events: int) -> float:
+    for i in range(PENDING_EXTERNAL):
+        loop.add_event(f'external{i}')
+    start = time.perf_counter()
+    for _ in range(n_events):
+        loop.get_event()
+        loop.add_event('Reader1.char_accepted')
+    return time.perf_counter() - start
+
+
+def measure(make_loop, n_events: int) -> tuple[float, float]:
+    # Время и память меряются отдельными прогонами: tracemalloc сильно замедляет код
+    elapsed = drive(make_loop(), n_events)
+    tracemalloc.start()
+    drive(make_loop(), n_events)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def main():
+    print(f"{'impl':<22}{'events':>10}{'ns/event':>12}{'peak MiB':>10}")
+    for n in (10_000, 100_000):
+        elapsed, peak = measure(ListEventLoop, n)
+        print(f"{'list.insert':<22}{n:>10}{elapsed / n * 1e9:>12.0f}{peak:>10.1f}")
+    for n in (10_000, 100_000, 1_000_000, 2_000_000):
+        for history in (True, False):
+            name = 'deque' + (' + history' if history else '')
+            elapsed, peak = measure(lambda: EventLoop(make_trace('full' if history else 'called')), n)
+            print(f"{name:<22}{n:>10}{elapsed / n * 1e9:>12.0f}{peak:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Бенчмарк шага садовника: стоимость Sensor.search_walls, поворотов и
+движения Mover и одного шага машины tests/GardenerWalker.graphml.
+
+    python -m benchmarks.bench_gardener_step
+"""
+import time
+
+from benchmarks.common import load_cgml_sm
+from state_machine_sim.cgml_signal import StateMachine, run_state_machine
+from state_machine_sim.components import Gardener, Mover, Sensor
+
+SIZE = (40, 40)
+CALLS = 200_000
+MACHINE_STEPS = 200_000
+
+
+def per_call_ns(action, calls: int = CALLS) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(calls):
+        action()
+    return (time.perf_counter_ns() - start) / calls
+
+
+def main():
+    gardener = Gardener(*SIZE, with_walls=True, seed=0)
+    options = {'gardener': gardener}
+    sensor = Sensor('Sensor1')
+    sensor.get_sm_options(options)
+    mover = Mover('Mover1')
+    mover.get_sm_options(options)
+    # События датчика в бенчмарке не нужны
+    sensor.event_loop.set_filter(frozenset())
+
+    print(f"{'operation':<24}{'ns/call':>10}")
+    print(f"{'Sensor.search_walls':<24}{per_call_ns(sensor.search_walls):>10.0f}")
+    print(f"{'Mover.turn_right':<24}{per_call_ns(mover.turn_right):>10.0f}")
+
+    def step():
+        # Шаг вперед, если можно, иначе поворот - как у машины-обходчика
+        gardener.update_walls()
+        if gardener.wall_straight():
+            mover.turn_right()
+        else:
+            mover.move_forward()
+    print(f"{'look + move':<24}{per_call_ns(step):>10.0f}")
+
+    cgml_sm = load_cgml_sm('tests/GardenerWalker.graphml')
+    sm = StateMachine(cgml_sm, {'gardener': Gardener(*SIZE, with_walls=True, seed=0)})
+    start = time.perf_counter_ns()
+    result = run_state_machine(sm, [], None, max_steps=MACHINE_STEPS, drop_unhandled=True)
+    elapsed = time.perf_counter_ns() - start
+    print(f"{'machine step':<24}{elapsed / result.steps:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Бенчмарк условий переходов: разбор строки условия при каждой проверке
+(прежний intepreter_condition) против условий, собранных при сборке машины,
+для атрибутов компонентов садовника и считывателя.
+
+    python -m benchmarks.bench_guards
+"""
+import operator
+import time
+
+from benchmarks.common import parse_cgml_sm
+from state_machine_sim.cgml_signal import StateMachine
+from state_machine_sim.components import Gardener
+
+CALLS = 200_000
+CONDITIONS = [
+    'Sensor1.wall_right == 1',
+    'Sensor1.flower == Sensor1.rose',
+    'Compass1.orientation == Compass1.north',
+    'Compass1.x < 10',
+    'Reader1.current_char == А',
+]
+
+
+def component(component_id: str, component_type: str) -> str:
+    return f'''<node id="c{component_id}"><data key="dNote">formal</data><data key="dName">CGML_COMPONENT</data>
+      <data key="dData">id/ {component_id}
+
+type/ {component_type}
+
+</data></node>'''
+
+
+GRAPHML = f'''<?xml version="1.0" encoding="UTF-8"?>
+<graphml xmlns="http://graphml.graphdrawing.org/xmlns">
+  <data key="gFormat">Cyberiada-GraphML-1.0</data>
+  <key attr.name="name" attr.type="string" for="node" id="dName"></key>
+  <key attr.name="data" attr.type="string" for="node" id="dData"></key>
+  <key attr.name="data" attr.type="string" for="edge" id="dData"></key>
+  <graph id="Machine1">
+    <data key="dStateMachine"></data>
+    <node id="coreMeta"><data key="dNote">formal</data><data key="dName">CGML_META</data>
+      <data key="dData">platform/ junior-gardener
+
+standardVersion/ 1.0
+
+</data></node>
+    <node id="idle"><data key="dName">Ожидание</data></node>
+    <node id="init"><data key="dVertex">initial</data></node>
+    {component('Sensor1', 'Sensor')}
+    {component('Compass1', 'Compass')}
+    {component('Reader1', 'Reader')}
+    <edge id="e0" source="init" target="idle"></edge>
+  </graph>
+</graphml>'''
+
+
+def legacy_condition(sm: StateMachine, condition: str) -> bool:
+    """Прежний разбор условия при каждой проверке."""
+    if not condition or condition.strip() == "":
+        return True
+    ops = {
+        '>': operator.gt,
+        '<': operator.lt,
+        '==': operator.eq,
+        '!=': operator.ne,
+        '>=': operator.ge,
+        '<=': operator.le,
+    }
+    for op_str in sorted(ops.keys(), key=len, reverse=True):
+        if op_str in condition:
+            left, right = condition.split(op_str, 1)
+
+            def resolve(val):
+                val = val.strip()
+                try:
+                    return float(val) if '.' in val else int(val)
+                except ValueError:
+                    if '.' in val:
+                        comp_name, attr = val.split('.', 1)
+                        comp = sm.components.get(comp_name)
+                        if comp and hasattr(comp.obj, attr):
+                            return getattr(comp.obj, attr)
+                    return val
+            return ops[op_str](resolve(left), resolve(right))
+    return bool(condition)
+
+
+def per_call_ns(check, calls: int = CALLS) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(calls):
+        check()
+    return (time.perf_counter_ns() - start) / calls
+
+
+def main():
+    cgml_sm = parse_cgml_sm(GRAPHML)
+    sm = StateMachine(cgml_sm, {'gardener': Gardener(20, 20, with_walls=True, seed=0),
+                                'message': 'АБВ'})
+    sm.components['Sensor1'].obj.search_walls()
+    sm.components['Reader1'].obj.read()
+    print(f"{'condition':<42}{'parsed ns':>10}{'compiled ns':>12}{'speedup':>9}")
+    for condition in CONDITIONS:
+        assert legacy_condition(sm, condition) == sm.intepreter_condition(condition)
+        legacy = per_call_ns(lambda: legacy_condition(sm, condition))
+        guard = sm.compile_condition(condition)
+        compiled = per_call_ns(guard)
+        print(f"{condition:<42}{legacy:>10.0f}{compiled:>12.0f}{legacy / compiled:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
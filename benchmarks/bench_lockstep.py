@@ -0,0 +1,64 @@
+"""
+Бенчмарк run_lockstep: массовая проверка машин задач 9-11 на случайных входах.
+
+Сравниваются run_batch (trace='called') и одновременный прогон по таблицам -
+с NumPy и без него. Время lockstep включает разворачивание машины.
+У задачи 11 счетчик суммы цифр дает тысячи состояний (до max_states):
+разворачивание обходится дороже самих запусков, и lockstep проигрывает
+run_batch. fallback - входы, досчитанные обычным запуском.
+
+    python -m benchmarks.bench_lockstep
+"""
+import random
+import time
+
+from benchmarks.common import load_cgml_sm
+from state_machine_sim import lockstep
+from state_machine_sim.batch import run_batch
+from state_machine_sim.cgml_signal import StateMachine
+
+# Схема и алфавит входов (задача 11 принимает только цифры и '-')
+TASKS = (
+    ('Задача 9.graphml', 'АБВКИТ'),
+    ('Задача 10.graphml', 'АБВКИТ'),
+    ('Задача 11.graphml', '0123456789-'),
+)
+INPUTS = 20_000
+
+
+def main():
+    numpy = lockstep.np
+    print(f"{'task':<20}{'states':>8}{'fallback':>10}{'run_batch s':>13}{'numpy s':>10}"
+          f"{'python s':>10}")
+    for task, alphabet in TASKS:
+        rnd = random.Random(0)
+        messages = [''.join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 30)))
+                    for _ in range(INPUTS)]
+        cgml_sm = load_cgml_sm(task)
+        sm = StateMachine(cgml_sm, {'message': ''})
+
+        start = time.perf_counter()
+        expected = [item.result.called_signals for item in run_batch(
+            sm, [{'message': m} for m in messages], [], timeout_sec=None, trace='called')]
+        scalar = time.perf_counter() - start
+
+        timings = {}
+        for name, module in (('numpy', numpy), ('python', None)):
+            if name == 'numpy' and numpy is None:
+                continue
+            lockstep.np = module
+            start = time.perf_counter()
+            flat = lockstep.flatten_reader_machine(sm, [], ''.join(messages))
+            results = lockstep.run_lockstep(sm, messages, [], flat=flat)
+            timings[name] = f'{time.perf_counter() - start:.2f}'
+            assert [r.called_signals for r in results] == expected
+        lockstep.np = numpy
+        # Входы, которые таблицы не довели до конца
+        fallback = sum(flat.end_stop[state] is None
+                       for state in lockstep._walk_python(flat, messages)[0])
+        print(f"{task:<20}{flat.state_count:>8}{fallback:>10}{scalar:>13.2f}"
+              f"{timings.get('numpy', '-'):>10}{timings['python']:>10}")
+
+
+if __name__ == '__main__':
+    main()
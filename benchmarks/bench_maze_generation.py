@@ -0,0 +1,67 @@
+"""
+Бенчмарк Gardener.generate_walls: остовное дерево против прежней схемы
+(BFS по всему полю после каждой пробной стены, O((N * M)^2)).
+Прежняя схема запускается только на малых полях.
+
+    python -m benchmarks.bench_maze_generation
+"""
+import random
+import time
+from collections import deque
+
+from state_machine_sim.components import Gardener
+
+SIZES = [20, 50, 100, 300, 1000]
+LEGACY_MAX_SIZE = 50
+WALL_FRACTION = 0.2
+
+
+def legacy_generate_walls(N: int, M: int, rng: random.Random,
+                          wall_fraction: float = WALL_FRACTION) -> list[list[int]]:
+    field = [[0] * N for _ in range(M)]
+    num_walls = int(N * M * wall_fraction)
+    coords = [(x, y) for x in range(N) for y in range(M) if not (x == 0 and y == 0)]
+    rng.shuffle(coords)
+
+    def is_connected():
+        visited = [[False] * N for _ in range(M)]
+        queue = deque([(0, 0)])
+        visited[0][0] = True
+        reachable = 1
+        while queue:
+            x, y = queue.popleft()
+            for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                if 0 <= ny < M and 0 <= nx < N and not visited[ny][nx] and field[ny][nx] != -1:
+                    visited[ny][nx] = True
+                    queue.append((nx, ny))
+                    reachable += 1
+        return reachable == sum(cell != -1 for row in field for cell in row)
+
+    walls_placed = 0
+    for x, y in coords:
+        if walls_placed >= num_walls:
+            break
+        field[y][x] = -1
+        if is_connected():
+            walls_placed += 1
+        else:
+            field[y][x] = 0
+    return field
+
+
+def main():
+    print(f"{'size':<12}{'legacy s':>10}{'tree s':>10}{'cells/s':>12}")
+    for size in SIZES:
+        legacy = '-'
+        if size <= LEGACY_MAX_SIZE:
+            start = time.perf_counter()
+            legacy_generate_walls(size, size, random.Random(0))
+            legacy = f'{time.perf_counter() - start:.3f}'
+        start = time.perf_counter()
+        Gardener(size, size, seed=0).generate_walls(WALL_FRACTION)
+        elapsed = time.perf_counter() - start
+        print(f"{f'{size}x{size}':<12}{legacy:>10}{elapsed:>10.3f}{size * size / elapsed:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+Бенчмарк sweep_mazes: машина садовника (tests/GardenerWalker.graphml)
+в K = 10 000 лабиринтах каждого размера, масштабирование по числу процессов.
+
+    python -m benchmarks.bench_maze_sweep
+"""
+import os
+import time
+
+from benchmarks.common import load_cgml_sm
+from state_machine_sim.maze_sweep import sweep_mazes
+
+SIZES = [(5, 5), (10, 10), (20, 10)]
+MAZES = 10_000
+MAX_STEPS = 400
+
+
+def main():
+    cgml_sm = load_cgml_sm('tests/GardenerWalker.graphml')
+    total_runs = MAZES * len(SIZES)
+    print(f"cores available: {os.cpu_count()}, mazes: {total_runs}")
+    print(f"{'workers':<10}{'sec':>8}{'mazes/s':>10}")
+    workers = 1
+    result = None
+    while workers <= (os.cpu_count() or 1):
+        start = time.perf_counter()
+        result = sweep_mazes(cgml_sm, SIZES, MAZES, workers=workers,
+                             max_steps=MAX_STEPS, drop_unhandled=True, timeout_sec=None)
+        elapsed = time.perf_counter() - start
+        print(f"{workers:<10}{elapsed:>8.2f}{total_runs / elapsed:>10.0f}")
+        workers *= 2
+    print(f"{'size':<10}{'crash rate':>12}{'coverage':>10}{'steps':>8}")
+    for size, stats in result.by_size.items():
+        print(f"{f'{size[0]}x{size[1]}':<10}{stats.crash_rate:>12.3f}"
+              f"{stats.mean_coverage:>10.3f}{stats.mean_steps:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Бенчмарк run_prefix_shared: сколько шагов симуляции экономят общие префиксы.
+
+Для задач 9-11 берутся сообщения тестов автопроверки (run() в taskN.py)
+и синтетический набор: базовые сообщения и их варианты с разными
+окончаниями. Сравниваются отдельные запуски (run_batch) и общий прогон по
+префиксному дереву. На тестах автопроверки (три сообщения почти без общих
+префиксов) общий прогон не окупается, и run_prefix_shared запускает
+сообщения по отдельности: экономия там нулевая.
+
+    python -m benchmarks.bench_prefix_sharing
+"""
+import random
+import time
+
+from benchmarks.common import load_cgml_sm
+from state_machine_sim.batch import run_batch
+from state_machine_sim.cgml_signal import StateMachine
+from state_machine_sim.prefix import run_prefix_shared
+
+# Схема, алфавит синтетических сообщений и сообщения тестов автопроверки
+TASKS = (
+    ('Задача 9.graphml', 'АБВКИТ', ['АААГБББАВС', 'ОМСМЯЧСФЫ', 'АБВ']),
+    ('Задача 10.graphml', 'АБВКИТ', ['КИТСОБАКАКОШКАМОРЖКОМРАДКОНЬ', 'ГАЗМЯС', 'КИТКИТКИТИ']),
+    ('Задача 11.graphml', '0123456789-', ['5-66666', '5-9999', '88888-77777-666666']),
+)
+BASES = 20
+VARIANTS = 50
+
+
+def make_messages(rnd: random.Random, alphabet: str) -> list[str]:
+    messages = []
+    for _ in range(BASES):
+        base = ''.join(rnd.choice(alphabet) for _ in range(rnd.randint(20, 40)))
+        for _ in range(VARIANTS):
+            cut = rnd.randint(len(base) // 2, len(base))
+            messages.append(base[:cut] + ''.join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 5))))
+    return messages
+
+
+def measure(task: str, kind: str, cgml_sm, messages: list[str]):
+    start = time.perf_counter()
+    sm = StateMachine(cgml_sm, {'message': ''})
+    for _ in run_batch(sm, [{'message': m} for m in messages], [], timeout_sec=None):
+        pass
+    separate = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sm = StateMachine(cgml_sm, {'message': ''})
+    _, stats = run_prefix_shared(sm, messages, [], timeout_sec=None)
+    shared = time.perf_counter() - start
+
+    print(f"{task:<20}{kind:<11}{stats.steps_separate:>16}{stats.steps_executed:>14}"
+          f"{stats.steps_saved / stats.steps_separate:>8.0%}{separate:>12.3f}{shared:>10.3f}")
+
+
+def main():
+    print(f"{'task':<20}{'messages':<11}{'separate steps':>16}{'shared steps':>14}{'saved':>8}"
+          f"{'separate s':>12}{'shared s':>10}")
+    for task, alphabet, tests in TASKS:
+        cgml_sm = load_cgml_sm(task)
+        measure(task, 'tests', cgml_sm, tests)
+        measure(task, 'synthetic', cgml_sm, make_messages(random.Random(0), alphabet))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Бенчмарк run_batch_parallel: масштабирование по числу процессов.
+
+    python -m benchmarks.bench_process_pool
+"""
+import os
+import random
+import time
+
+from benchmarks.common import load_cgml_sm
+from state_machine_sim.batch import run_batch
+from state_machine_sim.cgml_signal import StateMachine
+from state_machine_sim.parallel import run_batch_parallel
+
+INPUTS = 4000
+MESSAGE_LENGTH = 100
+
+
+def main():
+    cgml_sm = load_cgml_sm('Задача 9.graphml')
+    rnd = random.Random(0)
+    parameters = [
+        {'message': ''.join(rnd.choice('АБВГ') for _ in range(MESSAGE_LENGTH))}
+        for _ in range(INPUTS)
+    ]
+
+    start = time.perf_counter()
+    for _ in run_batch(StateMachine(cgml_sm, parameters[0]), parameters, [], timeout_sec=None):
+        pass
+    base = time.perf_counter() - start
+    print(f"cores available: {os.cpu_count()}")
+    print(f"{'workers':<10}{'sec':>8}{'inputs/s':>10}{'speedup':>9}")
+    print(f"{'in-proc':<10}{base:>8.2f}{INPUTS / base:>10.0f}{1:>9.2f}")
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        start = time.perf_counter()
+        for _ in run_batch_parallel(cgml_sm, parameters, [], workers=workers, timeout_sec=None):
+            pass
+        elapsed = time.perf_counter() - start
+        print(f"{workers:<10}{elapsed:>8.2f}{INPUTS / elapsed:>10.0f}{base / elapsed:>9.2f}")
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Бенчмарк потокового ввода Reader: символов в секунду для сообщения-строки,
+файла на диске, StringIO и генератора кусков (задача 9, trace='called').
+
+    python -m benchmarks.bench_reader_stream
+"""
+import io
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.common import load_cgml_sm
+from state_machine_sim.cgml_signal import StateMachine, run_state_machine
+
+CHARS = 500_000
+GENERATOR_CHUNK = 4096
+
+
+def generated(text: str):
+    for start in range(0, len(text), GENERATOR_CHUNK):
+        yield text[start:start + GENERATOR_CHUNK]
+
+
+def main():
+    cgml_sm = load_cgml_sm('Задача 9.graphml')
+    rnd = random.Random(0)
+    text = ''.join(rnd.choice('АБВКИТ') for _ in range(CHARS))
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.txt', delete=False) as f:
+        f.write(text)
+        path = f.name
+    sources = {
+        'str': lambda: text,
+        'file': lambda: open(path, encoding='utf-8'),
+        'StringIO': lambda: io.StringIO(text),
+        'generator': lambda: generated(text),
+    }
+    sm = StateMachine(cgml_sm, {'message': ''})
+    print(f"{'source':<12}{'sec':>8}{'chars/s':>12}{'steps':>10}")
+    try:
+        for name, make_source in sources.items():
+            source = make_source()
+            sm.reset({'message': source})
+            start = time.perf_counter()
+            result = run_state_machine(sm, [], None, trace='called')
+            elapsed = time.perf_counter() - start
+            if hasattr(source, 'close'):
+                source.close()
+            reader = sm.components['Reader1'].obj
+            print(f"{name:<12}{elapsed:>8.2f}{reader.index / elapsed:>12.0f}{result.steps:>10}")
+    finally:
+        os.unlink(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Бенчмарк неглубокой истории: время цикла pause/resume в зависимости от
+числа подсостояний составного состояния.
+
+Восстановление - одно обращение к QHsm.history, поэтому время на цикл не
+должно расти с числом подсостояний.
+
+    python -m benchmarks.bench_shallow_history
+"""
+import time
+
+from benchmarks.common import parse_cgml_sm
+from state_machine_sim.cgml_signal import StateMachine, run_state_machine
+
+CYCLES = 2000
+SIZES = (4, 64, 1024)
+
+
+def make_graphml(size: int) -> str:
+    substates = ''.join(
+        f'<node id="s{i}"><data key="dName">S{i}</data></node>' for i in range(size))
+    ring = ''.join(
+        f'<edge id="n{i}" source="s{i}" target="s{(i + 1) % size}"><data key="dData">next/\n</data></edge>'
+        for i in range(size))
+    return f'''<?xml version="1.0" encoding="UTF-8"?>
+<graphml xmlns="http://graphml.graphdrawing.org/xmlns">
+  <data key="gFormat">Cyberiada-GraphML-1.0</data>
+  <key attr.name="name" attr.type="string" for="node" id="dName"></key>
+  <key attr.name="data" attr.type="string" for="node" id="dData"></key>
+  <key attr.name="data" attr.type="string" for="edge" id="dData"></key>
+  <graph id="Machine1">
+    <data key="dStateMachine"></data>
+    <node id="coreMeta"><data key="dNote">formal</data><data key="dName">CGML_META</data>
+      <data key="dData">platform/ junior-reader
+
+standardVersion/ 1.0
+
+</data></node>
+    <node id="work"><data key="dName">Work</data><graph id="work:">{substates}
+      <node id="history"><data key="dVertex">shallowHistory</data></node></graph></node>
+    <node id="pause"><data key="dName">Pause</data></node>
+    <node id="init"><data key="dVertex">initial</data></node>
+    <edge id="e0" source="init" target="s0"></edge>
+    {ring}
+    <edge id="p" source="work" target="pause"><data key="dData">pause/
+</data></edge>
+    <edge id="r" source="pause" target="history"><data key="dData">resume/
+</data></edge>
+  </graph>
+</graphml>'''
+
+
+def main():
+    print(f"{'substates':>10}{'us/cycle':>10}")
+    for size in SIZES:
+        cgml_sm = parse_cgml_sm(make_graphml(size))
+        sm = StateMachine(cgml_sm, {})
+        signals = ['next', 'pause', 'resume'] * CYCLES
+        start = time.perf_counter()
+        run_state_machine(sm, signals, None, trace='called')
+        elapsed = time.perf_counter() - start
+        assert sm.current_state_id().startswith('s')
+        print(f"{size:>10}{elapsed / CYCLES * 1e6:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
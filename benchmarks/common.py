@@ -0,0 +1,18 @@
+"""Общие помощники бенчмарков: загрузка схем."""
+import os
+
+from state_machine_sim.cgml_types import CGMLStateMachine
+from state_machine_sim.simple_parser import CGMLParser
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+
+def parse_cgml_sm(xml: str) -> CGMLStateMachine:
+    """Первая машина состояний из текста схемы."""
+    return list(CGMLParser().parse_cgml(xml).state_machines.values())[0]
+
+
+def load_cgml_sm(path: str) -> CGMLStateMachine:
+    """Первая машина состояний из файла схемы path (путь от корня репозитория)."""
+    with open(os.path.join(ROOT, path), encoding='utf-8') as f:
+        return parse_cgml_sm(f.read())
@@ -0,0 +1,41 @@
+"""Запуск одной собранной машины на множестве входных данных."""
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator
+
+from .cgml_signal import StateMachine, StateMachineResult, run_state_machine
+
+
+@dataclass
+class BatchItem:
+    index: int  # номер входа в списке параметров
+    result: StateMachineResult
+    passed: bool | None = None  # результат check, если он задан
+
+
+def run_batch(
+    sm: StateMachine,
+    sm_parameters: Iterable[dict],
+    signals: list[str],
+    check: Callable[[StateMachineResult], bool] | None = None,
+    stop_on_first_failure: bool = False,
+    **run_options
+) -> Iterator[BatchItem]:
+    """
+    Запускает машину sm по очереди на каждом наборе sm_parameters и отдает
+    результаты по мере готовности. Машина не пересобирается: между запусками
+    вызывается только StateMachine.reset.
+
+    check(result) -> bool проверяет результат; при stop_on_first_failure
+    обработка останавливается на первом непрошедшем входе.
+    run_options передаются в run_state_machine.
+
+    Компоненты в result.components - живые объекты машины: их состояние
+    актуально, пока не запрошен следующий элемент.
+    """
+    for index, parameters in enumerate(sm_parameters):
+        sm.reset(parameters)
+        result = run_state_machine(sm, signals, **run_options)
+        passed = check(result) if check is not None else None
+        yield BatchItem(index, result, passed)
+        if stop_on_first_failure and passed is False:
+            return
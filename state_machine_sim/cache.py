@@ -0,0 +1,195 @@
+"""
+Кеш результатов детерминированных запусков.
+
+Машина Reader полностью определяется схемой, параметрами sm_parameters
+и внешними сигналами, а автопроверка гоняет одни и те же тесты на одних и
+тех же схемах. Ключ кеша - хеш версии формата кеша, снимка схемы (как в
+parallel.py) и канонической записи (JSON с сортировкой ключей) параметров,
+сигналов и опций запуска. Результаты хранятся в LRU в памяти и, если задан
+path, в файле SQLite (в виде JSON), который переживает перезапуск
+проверяющей системы.
+
+Запуски с недетерминированными компонентами (Component.is_deterministic),
+с параметрами, которые нельзя записать в JSON, с trace_sink и запуски,
+остановленные по таймауту, не кешируются.
+"""
+import hashlib
+import inspect
+import json
+import sqlite3
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from .cgml_signal import StateMachine, StateMachineResult, run_state_machine, STOP_TIMEOUT
+from .cgml_types import CGMLStateMachine
+from .components.registry import component_class
+from .parallel import machine_snapshot, snapshot_hash
+
+# Версия ключей и записей кеша: увеличивается, когда меняется формат записи
+# или результат запусков, чтобы старые записи в файле SQLite не находились
+CACHE_VERSION = 1
+# Опции run_state_machine по умолчанию: явно переданное значение по умолчанию дает тот же ключ
+_RUN_DEFAULTS = {
+    name: parameter.default
+    for name, parameter in inspect.signature(run_state_machine).parameters.items()
+    if parameter.default is not inspect.Parameter.empty
+}
+# Опции, от которых не зависит результат запуска, не остановленного по таймауту
+_UNKEYED_OPTIONS = frozenset({'timeout_sec', 'clock_check_interval', 'trace_sink'})
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    refused: int = 0  # запуски, которые нельзя кешировать
+
+
+def machine_hash(cgml_sm: CGMLStateMachine) -> str:
+    return snapshot_hash(machine_snapshot(cgml_sm))
+
+
+def is_cacheable(cgml_sm: CGMLStateMachine, virtual_time: bool = False) -> bool:
+    """Все ли компоненты схемы детерминированы."""
+    for cgml_comp in cgml_sm.components.values():
+        try:
+            component_type = component_class(cgml_comp.type)
+        except ValueError:
+            return False
+        if not component_type.is_deterministic(virtual_time):
+            return False
+    return True
+
+
+def result_key(sm_hash: str, sm_parameters: dict, signals: list[str],
+               run_options: dict) -> str | None:
+    """Ключ запуска или None, если параметры нельзя записать канонически."""
+    if run_options.get('trace_sink') is not None:
+        return None
+    options = {name: value for name, value in {**_RUN_DEFAULTS, **run_options}.items()
+               if name not in _UNKEYED_OPTIONS}
+    try:
+        payload = json.dumps([CACHE_VERSION, sm_hash, sm_parameters, list(signals), options],
+                             sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _pack(result: StateMachineResult) -> tuple:
+    return (result.timeout, list(result.signals), list(result.called_signals),
+            result.dropped_signals, result.stop_reason, result.steps, result.transitions,
+            result.loop_cycle, result.virtual_time)
+
+
+def _unpack(entry: tuple) -> StateMachineResult:
+    (timeout, signals, called_signals, dropped_signals, stop_reason, steps, transitions,
+     loop_cycle, virtual_time) = entry
+    # Копии списков: вызывающий код может менять результат, не портя кеш
+    return StateMachineResult(timeout, list(signals), list(called_signals), {},
+                              dropped_signals, stop_reason, steps, transitions,
+                              list(loop_cycle) if loop_cycle is not None else None,
+                              virtual_time)
+
+
+class ResultCache:
+    """
+    LRU на max_entries результатов; path - файл SQLite для долговременного
+    хранения (запись сразу, при промахе в памяти результат ищется в файле).
+    В файле записи хранятся в JSON: чтение файла не выполняет код.
+    """
+
+    def __init__(self, max_entries: int = 4096, path: str | None = None):
+        if max_entries <= 0:
+            raise ValueError('max_entries must be positive.')
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, tuple] = OrderedDict()
+        self.stats = CacheStats()
+        self.db: sqlite3.Connection | None = None
+        if path is not None:
+            self.db = sqlite3.connect(path)
+            self.db.execute(
+                'CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+            self.db.commit()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _remember(self, key: str, entry: tuple):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get(self, key: str) -> StateMachineResult | None:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        elif self.db is not None:
+            row = self.db.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+            if row is not None:
+                entry = tuple(json.loads(row[0]))
+                self._remember(key, entry)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return _unpack(entry)
+
+    def put(self, key: str, result: StateMachineResult):
+        entry = _pack(result)
+        self._remember(key, entry)
+        if self.db is not None:
+            self.db.execute('INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)',
+                            (key, json.dumps(entry, ensure_ascii=False)))
+            self.db.commit()
+
+    def clear(self):
+        self.entries.clear()
+        if self.db is not None:
+            self.db.execute('DELETE FROM results')
+            self.db.commit()
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def run_state_machine_cached(cache: ResultCache, cgml_sm: CGMLStateMachine,
+                             sm_parameters: dict, signals: list[str],
+                             sm: StateMachine | None = None,
+                             sm_hash: str | None = None,
+                             **run_options) -> StateMachineResult:
+    """
+    run_state_machine с кешем. При попадании машина не собирается и не
+    запускается; components в таком результате пустой, как у
+    run_batch_parallel. sm - уже собранная машина этой схемы (переиспользуется
+    через reset), sm_hash - заранее посчитанный machine_hash(cgml_sm).
+    """
+    key = None
+    if is_cacheable(cgml_sm, run_options.get('virtual_time', False)):
+        if sm_hash is None:
+            sm_hash = machine_hash(cgml_sm)
+        key = result_key(sm_hash, sm_parameters, signals, run_options)
+    if key is None:
+        cache.stats.refused += 1
+    else:
+        result = cache.get(key)
+        if result is not None:
+            return result
+    if sm is None:
+        sm = StateMachine(cgml_sm, sm_parameters)
+    else:
+        sm.reset(sm_parameters)
+    result = run_state_machine(sm, signals, **run_options)
+    # Остановка по таймауту зависит от скорости машины, а не от входов
+    if key is not None and result.stop_reason != STOP_TIMEOUT:
+        cache.put(key, result)
+    return result
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from .qhsm import Q_SUPER, QHsm, Q_UNHANDLED, Q_HANDLED, Q_TRAN, SIMPLE_DISPATCH
+from dataclasses import dataclass, field
+from .qhsm import Q_SUPER, QHsm, Q_UNHANDLED, Q_HANDLED, Q_TRAN, Q_RET_TRAN, QMsm_dispatch
 from .cgml_types import (
     CGMLComponent,
     CGMLState,
@@ -7,18 +7,30 @@ from .cgml_types import (
     CGMLStateMachine,
     CGMLInitialState,
     CGMLFinal,
-    CGMLChoice
+    CGMLChoice,
+    CGMLShallowHistory,
+    CGMLTerminate
 )
 
 from .event_loop import EventLoop
-from . import components
+from .trace import make_trace, TraceSink
+from .loop_detector import LoopDetector
+from .virtual_clock import VirtualClock
+from .components.registry import component_class
 from functools import partial
-from typing import Callable
+from typing import Callable, Iterable
 from abc import ABC
+import asyncio
+import inspect
+import operator
 import time
 import re
+import sys
 from .simple_parser import CGMLParser
 
+# События, которые псевдосостояния и цикл событий обрабатывают всегда.
+ALWAYS_HANDLED_SIGNALS = ('noconditionTransition', 'break')
+
 @dataclass
 class Component:
     id: str
@@ -37,6 +49,8 @@ class Signal:
     condition: str
     action: str
     status: Callable[..., int]
+    # id перехода из схемы; для действий внутри состояния - '<id состояния>/<событие>'
+    id: str | None = field(default=None, kw_only=True)
 
     def __str__(self):
         cond = f"[{self.condition}]" if self.condition else ""
@@ -52,11 +66,14 @@ class StateMachine:
         sm: CGMLStateMachine,
         sm_parameters: dict
     ):
-        self.components = init_components(sm.components, sm_parameters)
+        self.event_loop = EventLoop()
+        self.components = init_components(sm.components, sm_parameters, self.event_loop)
         self.inital_states = init_initial_states(
             self, sm.initial_states, sm.transitions)
         self.final_states = init_final_states(self, sm.finals)
         self.choice_states = init_choice_states(self, sm.choices, sm.transitions)
+        self.history_states = init_history_states(self, sm.shallow_history, sm.transitions)
+        self.terminate_states = init_terminate_states(self, sm.terminates)
         self.qhsm = QHsm()
         self.states = init_states(
             self.qhsm,
@@ -65,59 +82,144 @@ class StateMachine:
             self.final_states,
             self.choice_states,
             sm.states,
-            sm.transitions
+            sm.transitions,
+            self.history_states,
+            self.terminate_states
         )
-        post_init_choice_states(self, self.choice_states, self.states, self.inital_states, self.final_states)
+        post_init_choice_states(self, self.choice_states, self.states, self.inital_states,
+                                self.final_states, self.history_states, self.terminate_states)
+        post_init_history_states(self, self.history_states, self.states, self.inital_states)
+        self.qhsm.set_hierarchy(collect_parents(
+            self.states, self.inital_states, self.final_states, self.choice_states,
+            self.history_states, self.terminate_states))
+        self.handled_signals = collect_handled_signals(self.states)
+        check_declared_events(self.components, self.handled_signals)
+        self.element_ids = collect_element_ids(
+            self.states, self.inital_states, self.final_states, self.choice_states,
+            self.history_states, self.terminate_states)
+        self.state_names = {
+            state_id: cgml_state.name for state_id, cgml_state in sm.states.items()}
         self.initial = find_highest_level_initial_state(self.inital_states)
         if self.initial is None:
             raise ValueError("No initial state found in the state machine.")
         self.qhsm.post_init(self.initial.execute_signal)
+        self.tracer = None
+        # Действия и условия связываются с компонентами один раз, при сборке
+        self.compiled_actions: dict[str, list[Callable[[], object]]] = {}
+        self.compiled_conditions: dict[str, Callable[[], bool]] = {}
+        for _, signal in self.iter_signals():
+            if signal.action not in self.compiled_actions:
+                self.compiled_actions[signal.action] = self.compile_action(signal.action)
+            if signal.condition != 'else' and signal.condition not in self.compiled_conditions:
+                self.compiled_conditions[signal.condition] = self.compile_condition(signal.condition)
+
+    def set_tracer(self, tracer):
+        """
+        Подключает обработчик микрошагов (microsteps.MicrostepHooks: трассировщик
+        или профилировщик); None - отключает.
+        """
+        self.tracer = tracer
+        self.qhsm.tracer = tracer
+
+    def reset(self, sm_parameters: dict):
+        """
+        Готовит уже собранную машину к новому запуску с другими параметрами:
+        возвращает QHsm в начальное состояние и переинициализирует компоненты
+        на месте (разобранные действия и переходы переиспользуются).
+        """
+        for component in self.components.values():
+            component.obj.reset()
+            component.obj.get_sm_options(sm_parameters)
+        self.qhsm.post_init(self.initial.execute_signal)
+
+    def iter_signals(self):
+        """(id элемента, Signal) для всех переходов и действий машины."""
+        for state_id, state in self.states.items():
+            for signals in state.signals.values():
+                for signal in signals:
+                    yield state_id, signal
+        for state_id, choice in self.choice_states.items():
+            for signal in choice.conditions:
+                yield state_id, signal
+
+    def current_state_id(self) -> str:
+        """id активного состояния (или псевдосостояния)."""
+        return self.element_ids[self.qhsm.current_.__self__]
+
+    def state_name(self, state_id: str) -> str:
+        """Имя состояния из схемы, для псевдосостояний - id."""
+        return self.state_names.get(state_id) or state_id
+
+    def configuration(self) -> tuple:
+        """
+        Конфигурация машины: активное состояние, ожидающие события и
+        наблюдаемое состояние компонентов. Если конфигурация в точке покоя
+        повторилась, машина зациклилась.
+        """
+        clock = self.event_loop.clock
+        return (
+            self.current_state_id(),
+            self.event_loop.pending(),
+            tuple(comp.obj.observable_state() for comp in self.components.values()),
+            clock.pending() if clock is not None else (),
+            tuple(self.qhsm.history),
+        )
+
+    def compile_condition(self, condition: str) -> Callable[[], bool]:
+        """
+        Собирает условие вида 'левое op правое' (op: <, >, ==, !=, <=, >=)
+        в функцию без аргументов. Операнд - число, атрибут компонента
+        'компонент.атрибут' (Component.attribute_getter; постоянные атрибуты
+        из Component.constants подставляются сразу) или строка как есть.
+        Пустое условие и условие без оператора истинны.
+        """
+        if not condition or condition.strip() == "":
+            return _always_true
+        for op_str, op_func in _CONDITION_OPERATORS:
+            if op_str in condition:
+                left, right = condition.split(op_str, 1)
+                left_const, left_value = self._compile_operand(left.strip())
+                right_const, right_value = self._compile_operand(right.strip())
+                if left_const and right_const:
+                    result = op_func(left_value, right_value)
+                    return partial(_constant, result)
+                if right_const:
+                    return partial(_compare_to_constant, op_func, left_value, right_value)
+                if left_const:
+                    return partial(_compare_constant_to, op_func, left_value, right_value)
+                return partial(_compare, op_func, left_value, right_value)
+        return _always_true
+
+    def _compile_operand(self, val: str) -> tuple[bool, object]:
+        """(True, значение) для постоянного операнда или (False, функция чтения)."""
+        try:
+            return True, (float(val) if '.' in val else int(val))
+        except ValueError:
+            if '.' in val:
+                comp_name, attr = val.split('.', 1)
+                comp = self.components.get(comp_name)
+                if comp and attr in comp.obj.constants:
+                    return True, comp.obj.constants[attr]
+                if comp and comp.obj.has_attribute(attr):
+                    return False, comp.obj.attribute_getter(attr)
+                if comp and comp.obj.attributes is not None:
+                    raise ValueError(
+                        f"Attribute {attr} is not declared by component {comp_name} ({comp.type}).")
+            return True, val
 
     def intepreter_condition(self, condition: str) -> bool:
         """
-        Интерпретирует простые условные выражения вида:
+        Вычисляет условие перехода, например:
         timer.difference > 0
         12 > 0
         3 == timer.difference
         timer.difference == timer.difference
+        Условия собираются при сборке машины (compile_condition).
         """
-        if not condition or condition.strip() == "":
-            return True
-        # Поддержка: <, >, ==, !=, <=, >=
-        import operator
-        ops = {
-            '>': operator.gt,
-            '<': operator.lt,
-            '==': operator.eq,
-            '!=': operator.ne,
-            '>=': operator.ge,
-            '<=': operator.le,
-        }
-        # Поиск оператора
-        for op_str in sorted(ops.keys(), key=len, reverse=True):
-            if op_str in condition:
-                left, right = condition.split(op_str, 1)
-                left = left.strip()
-                right = right.strip()
-                op_func = ops[op_str]
-                # Попытка привести к числу
-
-                def resolve(val):
-                    try:
-                        return float(val) if '.' in val else int(val)
-                    except ValueError:
-                        # Попытка получить значение из компонента
-                        if '.' in val:
-                            comp_name, attr = val.split('.', 1)
-                            comp = self.components.get(comp_name)
-                            if comp and hasattr(comp.obj, attr):
-                                return getattr(comp.obj, attr)
-                        return val
-                left_val = resolve(left)
-                right_val = resolve(right)
-                return op_func(left_val, right_val)
-        # Если не найден оператор, просто сравниваем на True
-        return bool(condition)
+        guard = self.compiled_conditions.get(condition)
+        if guard is None:
+            guard = self.compiled_conditions[condition] = self.compile_condition(condition)
+        return guard()
 
     def __parse_action(self, actions: str) -> list[Action]:
         """
@@ -137,27 +239,119 @@ class StateMachine:
             component = match.group('component')
             method = match.group('method')
             args_str = match.group('args').strip()
-            if args_str:
-                args = [arg.strip() for arg in re.split(r',\s*', args_str)]
-            else:
-                args = []
+            args = _split_arguments(args_str) if args_str else []
             result.append(Action(
                 component=component, action=method, args=args))
         return result
 
-    def intepreter_action(self, action: str):
-        # если не компонентная структура кода, то просто делаем eval здесь
-        actions_obj = self.__parse_action(action)
+    def compile_action(self, action: str) -> list[Callable[[], object]]:
+        """
+        Связывает строки 'компонент.действие(арг1, ...)' с методами компонентов
+        машины; аргументы разбираются здесь же (_compile_argument). Действие,
+        которого компонент не объявил (Component.actions) или в неверном
+        формате, дает ошибку при выполнении, как и раньше;
+        действия неизвестных компонентов пропускаются.
+        """
+        try:
+            actions_obj = self.__parse_action(action)
+        except ValueError as error:
+            return [partial(_fail_action, str(error))]
+        calls = []
         for action_obj in actions_obj:
             component = self.components.get(action_obj.component)
-            if component:
-                method = getattr(component.obj, action_obj.action, None)
-                if callable(method):
-                    method(*action_obj.args)
-                else:
-                    raise ValueError(
-                        f"Action {action_obj.action} not \
-                            callable on {component.type}")
+            if not component:
+                continue
+            method = getattr(component.obj, action_obj.action, None)
+            declared = component.obj.actions
+            if not callable(method) or (declared is not None and action_obj.action not in declared):
+                calls.append(partial(
+                    _fail_action, f"Action {action_obj.action} not callable on {component.type}"))
+                continue
+            args = [self._compile_argument(arg) for arg in action_obj.args]
+            if all(is_constant for is_constant, _ in args):
+                calls.append(partial(method, *(value for _, value in args)))
+            else:
+                getters = tuple(value if not is_constant else partial(_constant, value)
+                                for is_constant, value in args)
+                calls.append(partial(_call_with_arguments, method, getters))
+        return calls
+
+    def _compile_argument(self, arg: str) -> tuple[bool, object]:
+        """
+        Аргумент действия: число (int или float), строка в кавычках,
+        атрибут компонента (читается при вызове) или строка как есть.
+        """
+        if len(arg) >= 2 and arg[0] == arg[-1] and arg[0] in '\'"':
+            return True, arg[1:-1]
+        return self._compile_operand(arg)
+
+    def intepreter_action(self, action: str):
+        calls = self.compiled_actions.get(action)
+        if calls is None:
+            calls = self.compiled_actions[action] = self.compile_action(action)
+        event_loop = self.event_loop
+        for call in calls:
+            result = call()
+            if event_loop.asynchronous and inspect.isawaitable(result):
+                # Асинхронное действие, его выполнит run_state_machine_async
+                event_loop.awaitables.append(result)
+
+
+def _split_arguments(args: str) -> list[str]:
+    """Разбивает аргументы действия по запятым; запятые в кавычках не делят аргумент."""
+    result = []
+    start = 0
+    quote = None
+    for position, char in enumerate(args):
+        if quote is not None:
+            if char == quote:
+                quote = None
+        elif char in '\'"':
+            quote = char
+        elif char == ',':
+            result.append(args[start:position].strip())
+            start = position + 1
+    result.append(args[start:].strip())
+    return result
+
+
+def _fail_action(message: str):
+    raise ValueError(message)
+
+
+# Операторы условий; длинные проверяются первыми, чтобы '>=' не читался как '>'
+_CONDITION_OPERATORS = (
+    ('==', operator.eq),
+    ('!=', operator.ne),
+    ('>=', operator.ge),
+    ('<=', operator.le),
+    ('>', operator.gt),
+    ('<', operator.lt),
+)
+
+
+def _always_true() -> bool:
+    return True
+
+
+def _constant(value):
+    return value
+
+
+def _call_with_arguments(method, getters):
+    return method(*[getter() for getter in getters])
+
+
+def _compare(op_func, left, right) -> bool:
+    return op_func(left(), right())
+
+
+def _compare_to_constant(op_func, left, right) -> bool:
+    return op_func(left(), right)
+
+
+def _compare_constant_to(op_func, left, right) -> bool:
+    return op_func(left, right())
 
 
 class Element(ABC):
@@ -178,7 +372,9 @@ class InitialState(Element):
 
     def execute_signal(self, qhsm: QHsm, signal_name: str) -> int:
         if signal_name == 'entry':
-            EventLoop.add_event('noconditionTransition')
+            self.sm.event_loop.add_event('noconditionTransition')
+            return Q_HANDLED()
+        if signal_name == 'exit':
             return Q_HANDLED()
         return Q_TRAN(qhsm, self.sm.states[self.target].execute_signal)
 
@@ -190,25 +386,69 @@ class ChoiceState(Element):
 
     def execute_signal(self, qhsm: QHsm, signal_name: str) -> int:
         if signal_name == 'entry':
-            EventLoop.add_event('noconditionTransition')
+            self.sm.event_loop.add_event('noconditionTransition')
+            return Q_HANDLED()
+        if signal_name == 'exit':
+            # Выход из псевдосостояния не должен заново проверять условия
             return Q_HANDLED()
         else_signal = None
+        tracer = self.sm.tracer
         for signal in self.conditions:
             signal_condition = signal.condition
             signal_action = signal.action
             if (signal_condition == "else"):
                 else_signal = signal
                 continue
-            if self.sm.intepreter_condition(signal_condition):
+            passed = self.sm.intepreter_condition(signal_condition)
+            if tracer is not None:
+                tracer.guard(self, signal, passed)
+            if passed:
+                if tracer is not None:
+                    tracer.action(self, signal)
                 self.sm.intepreter_action(signal_action)
+                if tracer is not None:
+                    tracer.action_done(self, signal)
                 status = signal.status()
                 return status
         if else_signal is not None:
+            if tracer is not None:
+                tracer.action(self, else_signal)
             self.sm.intepreter_action(else_signal.action)
+            if tracer is not None:
+                tracer.action_done(self, else_signal)
             status = else_signal.status()
             return status
         return Q_UNHANDLED()
 
+class ShallowHistoryState(Element):
+    """
+    Неглубокая история: вход в вершину возвращает составное состояние-родитель
+    в подсостояние, активное при последнем выходе из него (QHsm.history).
+    Если выхода еще не было - переход по умолчанию из вершины или начальное
+    состояние родителя.
+    """
+
+    def __init__(self, sm: StateMachine, parent: str | None = None, target: str | None = None):
+        self.sm = sm
+        self.parent = parent
+        self.target = target
+        self.slot: int | None = None  # номер родителя в QHsm.history
+        self.default = None  # обработчик, куда идти без записанной истории
+
+    def execute_signal(self, qhsm: QHsm, signal_name: str) -> int:
+        if signal_name == 'entry':
+            self.sm.event_loop.add_event('noconditionTransition')
+            return Q_HANDLED()
+        if signal_name == 'exit':
+            return Q_HANDLED()
+        restored = qhsm.history[self.slot] if self.slot is not None else None
+        if restored is None:
+            restored = self.default
+        if restored is None:
+            return Q_HANDLED()
+        return Q_TRAN(qhsm, restored)
+
+
 class FinalState(Element):
     def __init__(self, sm: StateMachine, parent: str | None = None):
         self.sm = sm
@@ -216,12 +456,27 @@ class FinalState(Element):
 
     def execute_signal(self, qhsm: QHsm, signal_name: str) -> int:
         if signal_name == 'entry':
-            EventLoop.add_event('break')
+            # Запуск останавливается сразу после шага, без события 'break' в очереди
+            self.sm.event_loop.halt(STOP_FINAL)
             return Q_HANDLED()
         # Final state does not handle any other signals
         return Q_UNHANDLED()
 
 
+class TerminateState(Element):
+    """Terminate: запуск останавливается после шага, ожидающие события выбрасываются."""
+
+    def __init__(self, sm: StateMachine, parent: str | None = None):
+        self.sm = sm
+        self.parent = parent
+
+    def execute_signal(self, qhsm: QHsm, signal_name: str) -> int:
+        if signal_name == 'entry':
+            self.sm.event_loop.halt(STOP_TERMINATED, discard=True)
+            return Q_HANDLED()
+        return Q_UNHANDLED()
+
+
 class State(Element):
     def __init__(
         self,
@@ -245,16 +500,28 @@ class State(Element):
         signals = self.signals.get(signal_name)
         if signals:
             else_signal = None
+            tracer = self.sm.tracer
             for signal in signals:
                 if signal.condition == "else":
                     else_signal = signal
                     continue
-                if self.sm.intepreter_condition(signal.condition):
+                passed = self.sm.intepreter_condition(signal.condition)
+                if tracer is not None:
+                    tracer.guard(self, signal, passed)
+                if passed:
+                    if tracer is not None:
+                        tracer.action(self, signal)
                     self.sm.intepreter_action(signal.action)
+                    if tracer is not None:
+                        tracer.action_done(self, signal)
                     status = signal.status()
                     return status
             if else_signal is not None:
+                if tracer is not None:
+                    tracer.action(self, else_signal)
                 self.sm.intepreter_action(else_signal.action)
+                if tracer is not None:
+                    tracer.action_done(self, else_signal)
                 status = else_signal.status()
                 return status
         if self.parent:
@@ -324,7 +591,8 @@ def init_choice_states(
                 condition=condition,
                 action=action,
                 status=Q_HANDLED,
-                target=trans.target
+                target=trans.target,
+                id=trans.id
             )
             conditions.append(signal)
         choice_state.conditions = conditions
@@ -336,11 +604,14 @@ def post_init_choice_states(
     choice_states: dict[str, ChoiceState],
     states: dict[str, State],
     initials: dict[str, 'InitialState'],
-    finals: dict[str, FinalState]
+    finals: dict[str, FinalState],
+    histories: dict[str, ShallowHistoryState] | None = None,
+    terminates: dict[str, TerminateState] | None = None
 ):
     """
     Для каждого ChoiceState обновляет status у Signal в conditions на partial(Q_TRAN, qhsm, target_func),
-    где target_func — execute_signal целевого состояния (State, InitialState, FinalState, ChoiceState).
+    где target_func — execute_signal целевого состояния (State, InitialState, FinalState, ChoiceState,
+    ShallowHistoryState, TerminateState).
     """
     qhsm = sm.qhsm
     for choice_state in choice_states.values():
@@ -355,6 +626,10 @@ def post_init_choice_states(
                 target_func = finals[signal.target].execute_signal
             elif signal.target in choice_states:
                 target_func = choice_states[signal.target].execute_signal
+            elif histories and signal.target in histories:
+                target_func = histories[signal.target].execute_signal
+            elif terminates and signal.target in terminates:
+                target_func = terminates[signal.target].execute_signal
             else:
                 raise ValueError(f"Target state '{signal.target}' not found for choice transition.")
             signal.status = partial(Q_TRAN, qhsm, target_func)
@@ -367,11 +642,16 @@ def init_states(
         choices: dict[str, ChoiceState],
         cgml_states: dict[str, CGMLState],
         cgml_transition: dict[str, CGMLTransition],
+        histories: dict[str, ShallowHistoryState] | None = None,
+        terminates: dict[str, TerminateState] | None = None,
 ) -> dict[str, 'State']:
     """Initialize states from CGMLState data."""
     initialized_states: dict[str, 'State'] = {}
     for state_id, cgml_state in cgml_states.items():
         signals = parse_actions_block(cgml_state.actions)
+        for event_name, event_signals in signals.items():
+            for signal in event_signals:
+                signal.id = f'{state_id}/{event_name}'
         initialized_states[state_id] = State(sm, signals, cgml_state.parent)
     # transitions
     for trans in cgml_transition.values():
@@ -393,7 +673,8 @@ def init_states(
             action = ""
         if trans.source in initialized_states:
             target = initialized_states.get(trans.target) or initials.get(
-                trans.target) or finals.get(trans.target) or choices.get(trans.target)
+                trans.target) or finals.get(trans.target) or choices.get(trans.target) or (
+                histories or {}).get(trans.target) or (terminates or {}).get(trans.target)
             if target is None:
                 continue
             target_func = target.execute_signal
@@ -401,7 +682,8 @@ def init_states(
             signal = Signal(
                 condition=condition,
                 action=action,
-                status=status_func
+                status=status_func,
+                id=trans.id
             )
             if event_name not in initialized_states[trans.source].signals:
                 initialized_states[trans.source].signals[event_name] = []
@@ -418,25 +700,31 @@ def init_final_states(sm: StateMachine, cgml_final_states: dict[str, CGMLFinal])
         )
     return initialized_states
 
+def init_terminate_states(sm: StateMachine, cgml_terminates: dict[str, CGMLTerminate]):
+    """Initialize terminate pseudostates from CGMLTerminate data."""
+    return {
+        state_id: TerminateState(sm, parent=cgml_terminate.parent)
+        for state_id, cgml_terminate in cgml_terminates.items()
+    }
+
 def init_components(
     cgml_components: dict[str, CGMLComponent],
-    sm_parameters: dict
+    sm_parameters: dict,
+    event_loop: EventLoop
 ) -> dict[str, Component]:
     """Initialize components from CGMLComponent data."""
     initialized_components = {}
     for cgml_comp in cgml_components.values():
-        components_obj = getattr(components, cgml_comp.type)
-        if components_obj:
-            # print(cgml_comp.parameters)
-            component_instance = components_obj(cgml_comp.id)
-            component_instance.get_sm_options(sm_parameters)
-            initialized_components[cgml_comp.id] = Component(
-                id=cgml_comp.id,
-                type=cgml_comp.type,
-                obj=component_instance
-            )
-        else:
-            raise ValueError(f"Component type {cgml_comp.type} not found.")
+        # Модуль компонента загружается при первом использовании типа
+        components_obj = component_class(cgml_comp.type)
+        component_instance = components_obj(cgml_comp.id)
+        component_instance.event_loop = event_loop
+        component_instance.get_sm_options(sm_parameters)
+        initialized_components[cgml_comp.id] = Component(
+            id=cgml_comp.id,
+            type=cgml_comp.type,
+            obj=component_instance
+        )
     return initialized_components
 
 
@@ -459,6 +747,97 @@ def init_initial_states(
     return initial_states
 
 
+def init_history_states(
+    sm: 'StateMachine',
+    cgml_histories: dict[str, CGMLShallowHistory],
+    cgml_transitions: dict[str, CGMLTransition]
+) -> dict[str, ShallowHistoryState]:
+    """Вершины неглубокой истории; переход из вершины (если есть) - путь по умолчанию."""
+    histories = {}
+    for history_id, cgml_history in cgml_histories.items():
+        trans = find_transitions_for_state(history_id, cgml_transitions)
+        histories[history_id] = ShallowHistoryState(
+            sm,
+            parent=cgml_history.parent,
+            target=trans[0].target if trans else None
+        )
+    return histories
+
+
+def post_init_history_states(
+    sm: 'StateMachine',
+    histories: dict[str, ShallowHistoryState],
+    states: dict[str, 'State'],
+    initials: dict[str, 'InitialState']
+):
+    """
+    Нумерует составные состояния и включает в QHsm запись истории:
+    выход из состояния запоминается в ячейке его родителя - восстановление
+    по вершине истории - одно обращение к списку.
+    """
+    slots = {state_id: index for index, state_id in enumerate(
+        {state.parent for state in states.values() if state.parent in states})}
+    sm.qhsm.set_history_slots(
+        {state.execute_signal: slots[state.parent]
+         for state in states.values() if state.parent in slots},
+        len(slots))
+    parent_initials = {initial.parent: initial for initial in initials.values()}
+    for history in histories.values():
+        history.slot = slots.get(history.parent)
+        if history.target in states:
+            history.default = states[history.target].execute_signal
+        elif history.parent in parent_initials:
+            history.default = parent_initials[history.parent].execute_signal
+
+
+def collect_handled_signals(states: dict[str, 'State']) -> frozenset[str]:
+    """
+    Возвращает множество событий, на которые реагирует хотя бы одно состояние.
+    Остальные события проходят весь путь до Q_UNHANDLED, их можно не ставить в очередь.
+    """
+    handled = set(ALWAYS_HANDLED_SIGNALS)
+    for state in states.values():
+        handled.update(state.signals.keys())
+    return frozenset(handled)
+
+
+def check_declared_events(components: dict, triggers: Iterable[str]):
+    """
+    Триггер '<id>.событие' компонента, который поднимает события со своим
+    префиксом, должен быть среди объявленных (Component.events); иначе
+    переход никогда не сработает. У Impulse события общие, без префикса -
+    такие компоненты не проверяются.
+    """
+    for trigger in triggers:
+        comp_id, dot, event = trigger.partition('.')
+        component = components.get(comp_id) if dot else None
+        if component is None or component.obj.events is None:
+            continue
+        names = component.obj.event_names(comp_id)
+        if trigger not in names and all(name.startswith(f'{comp_id}.') for name in names):
+            raise ValueError(
+                f"Event {event} is not declared by component {comp_id} ({component.type}).")
+
+
+def collect_element_ids(*elements: dict[str, 'Element']) -> dict['Element', str]:
+    """Обратное отображение: элемент машины -> его id в схеме."""
+    element_ids = {}
+    for group in elements:
+        for element_id, element in group.items():
+            element_ids[element] = element_id
+    return element_ids
+
+
+def collect_parents(states: dict[str, 'State'], *elements: dict[str, 'Element']) -> dict:
+    """Обработчик каждого элемента -> обработчик родительского состояния (None - верхний уровень)."""
+    parents = {}
+    for group in (states, *elements):
+        for element in group.values():
+            parent = states.get(element.parent) if element.parent else None
+            parents[element.execute_signal] = parent.execute_signal if parent is not None else None
+    return parents
+
+
 def find_transitions_for_state(
     state_id: str,
     cgml_transitions: dict[str, CGMLTransition]
@@ -480,34 +859,298 @@ def find_highest_level_initial_state(
     return None
 
 
+# Причины остановки запуска
+STOP_FINISHED = 'finished'  # очередь событий опустела
+STOP_FINAL = 'final'  # машина пришла в конечное состояние
+STOP_TERMINATED = 'terminated'  # машина пришла в terminate, очередь выброшена
+STOP_TIMEOUT = 'timeout'  # вышло время timeout_sec
+STOP_MAX_STEPS = 'max_steps'  # обработано max_steps событий
+STOP_MAX_TRANSITIONS = 'max_transitions'  # выполнено max_transitions переходов
+STOP_LOOP = 'loop'  # конфигурация машины повторилась, см. detect_loops
+LIMIT_STOP_REASONS = (STOP_TIMEOUT, STOP_MAX_STEPS, STOP_MAX_TRANSITIONS, STOP_LOOP)
+
+
 class StateMachineResult:
-    def __init__(self, timeout: bool, signals: list[str], called_signals: list[str], components: dict[str, Component]):
-        self.timeout = timeout  # Закончилась ли МС по таймауту
+    def __init__(self, timeout: bool, signals: list[str], called_signals: list[str], components: dict[str, Component],
+                 dropped_signals: int = 0, stop_reason: str = STOP_FINISHED, steps: int = 0,
+                 transitions: int = 0, loop_cycle: list[str] | None = None,
+                 virtual_time: int | None = None):
+        self.timeout = timeout  # Закончилась ли МС по таймауту (или другому ограничению)
         self.signals = signals  # Сигналы, которые были вызваны (с учетом сигналов по умолчанию)
         self.called_signals = called_signals  # Все, что вызвано пользователем вручную
         self.components = components  # компоненты и их состояния
+        self.dropped_signals = dropped_signals  # Сколько событий отброшено без обработки
+        self.stop_reason = stop_reason  # Почему запуск остановился, см. STOP_*
+        self.steps = steps  # Сколько событий обработано
+        self.transitions = transitions  # Сколько переходов выполнено
+        self.loop_cycle = loop_cycle  # Цикл состояний, если найдено зацикливание
+        self.virtual_time = virtual_time  # Виртуальное время остановки в мс, если оно включено
+
+@dataclass
+class RunSnapshot:
+    """Снимок запуска машины, см. StateMachineRun.snapshot."""
+    qhsm: tuple
+    event_loop: tuple
+    components: dict[str, object]
+    counters: tuple
+    loop_detector: int | None
+
+
+class StateMachineRun:
+    """
+    Один запуск машины: очередь событий, ограничения и счетчики.
+    Параметры те же, что у run_state_machine. Шаги выполняются порциями через
+    run_steps, поэтому запуск можно продолжать из разных циклов (синхронного,
+    asyncio). start=False откладывает вход в начальное состояние до вызова start().
+    """
+
+    def __init__(self, sm: StateMachine,
+                 signals: list[str], timeout_sec: float | None = 10.0,
+                 drop_unhandled: bool = False,
+                 trace: str = 'full',
+                 trace_size: int = 1000,
+                 trace_sink: TraceSink | None = None,
+                 max_steps: int | None = None,
+                 max_transitions: int | None = None,
+                 clock_check_interval: int = 1024,
+                 detect_loops: bool = False,
+                 virtual_time: bool = False,
+                 start: bool = True):
+        if clock_check_interval <= 0:
+            raise ValueError('clock_check_interval must be positive.')
+        self.sm = sm
+        event_loop = sm.event_loop
+        event_loop.clear(make_trace(trace, trace_size, trace_sink),
+                         VirtualClock() if virtual_time else None)
+        if drop_unhandled:
+            event_loop.set_filter(sm.handled_signals)
+        self.step_limit = max_steps if max_steps is not None else sys.maxsize
+        self.transition_limit = max_transitions if max_transitions is not None else sys.maxsize
+        self.deadline = None
+        if timeout_sec is not None:
+            self.deadline = time.monotonic() + timeout_sec
+        self.clock_check_interval = clock_check_interval
+        self.next_clock_check = clock_check_interval if self.deadline is not None else sys.maxsize
+        self.steps = 0
+        self.transitions = 0
+        self.stop_reason: str | None = None
+        self.loop_detector = LoopDetector(sm) if detect_loops else None
+        self.signals = signals
+        self.started = False
+        if start:
+            self.start()
+
+    def start(self):
+        """Входит в начальное состояние и ставит в очередь внешние сигналы."""
+        event_loop = self.sm.event_loop
+        qhsm = self.sm.qhsm
+        with event_loop.activate():
+            if qhsm.tracer is not None:
+                qhsm.tracer.entry(qhsm.current_)
+            qhsm.current_(qhsm, 'entry')
+
+            for event in self.signals:
+                event_loop.add_event(event)
+            if self.loop_detector is not None:
+                self.loop_detector.check()
+        self.started = True
+
+    def run_steps(self, budget: int = sys.maxsize) -> str | None:
+        """
+        Обрабатывает не больше budget событий. Возвращает причину остановки
+        (STOP_*) или None, если раньше закончился budget. Пустая очередь
+        дает STOP_FINISHED.
+        """
+        event_loop = self.sm.event_loop
+        qhsm = self.sm.qhsm
+        loop_detector = self.loop_detector
+        step_limit = self.step_limit
+        transition_limit = self.transition_limit
+        budget_end = self.steps + budget if budget < sys.maxsize else sys.maxsize
+        steps = self.steps
+        transitions = self.transitions
+        # Одно сравнение на шаг: checkpoint - ближайшая проверка часов, лимит шагов или конец порции
+        checkpoint = min(step_limit, self.next_clock_check, budget_end)
+        stop_reason = None
+        # Счетчики сохраняются и при исключении из действия (авария садовника)
+        try:
+            with event_loop.activate():
+                while True:
+                    if steps >= checkpoint:
+                        if steps >= step_limit:
+                            # Лимит исчерпан, только если есть следующее событие
+                            event = event_loop.peek_event()
+                            if event is None:
+                                stop_reason = STOP_FINISHED
+                            elif event == 'break':
+                                event_loop.get_event()
+                                stop_reason = STOP_FINAL
+                            else:
+                                stop_reason = STOP_MAX_STEPS
+                            break
+                        if steps >= self.next_clock_check:
+                            if time.monotonic() > self.deadline:
+                                stop_reason = STOP_TIMEOUT
+                                break
+                            self.next_clock_check += self.clock_check_interval
+                        if steps >= budget_end:
+                            break
+                        checkpoint = min(step_limit, self.next_clock_check, budget_end)
+                    event = event_loop.get_event()
+                    if event is None:
+                        stop_reason = STOP_FINISHED
+                        break
+                    if event == 'break':
+                        stop_reason = STOP_FINAL
+                        break
+                    steps += 1
+                    if QMsm_dispatch(qhsm, event) == Q_RET_TRAN:
+                        transitions += 1
+                        if event_loop.halted is not None:
+                            stop_reason = event_loop.halted
+                            break
+                        if transitions >= transition_limit:
+                            stop_reason = STOP_MAX_TRANSITIONS
+                            break
+                    if loop_detector is not None and loop_detector.check():
+                        stop_reason = STOP_LOOP
+                        break
+        finally:
+            self.steps = steps
+            self.transitions = transitions
+        return stop_reason
+
+    def snapshot(self) -> RunSnapshot:
+        """
+        Дешевый снимок запуска: курсор QHsm, очередь событий, отметка трассы,
+        состояние компонентов и счетчики. Вернуться к нему можно через
+        restore, в том числе несколько раз подряд.
+
+        Трасса и детектор циклов откатываются усечением, поэтому restore
+        годится только для снимков, сделанных раньше текущего момента
+        этого же запуска (обход дерева вариантов в глубину).
+        """
+        qhsm = self.sm.qhsm
+        return RunSnapshot(
+            qhsm=(qhsm.current_, qhsm.effective_, qhsm.target_, tuple(qhsm.history)),
+            event_loop=self.sm.event_loop.snapshot(),
+            components={
+                comp_id: comp.obj.snapshot() for comp_id, comp in self.sm.components.items()},
+            counters=(self.started, self.steps, self.transitions, self.next_clock_check,
+                      self.stop_reason),
+            loop_detector=self.loop_detector.mark() if self.loop_detector is not None else None,
+        )
+
+    def restore(self, snapshot: RunSnapshot):
+        qhsm = self.sm.qhsm
+        qhsm.current_, qhsm.effective_, qhsm.target_, history = snapshot.qhsm
+        qhsm.history = list(history)
+        self.sm.event_loop.restore(snapshot.event_loop)
+        for comp_id, state in snapshot.components.items():
+            self.sm.components[comp_id].obj.restore(state)
+        (self.started, self.steps, self.transitions, self.next_clock_check,
+         self.stop_reason) = snapshot.counters
+        if self.loop_detector is not None:
+            self.loop_detector.rewind(snapshot.loop_detector)
+
+    async def run_async(self, yield_every: int = 256):
+        """
+        Выполняет запуск в asyncio: отдает управление циклу asyncio каждые
+        yield_every событий. Awaitable, которые вернули действия компонентов
+        (например, Timer.start), выполняются как задачи; пока они не
+        завершились, пустая очередь не считается концом запуска.
+        """
+        if yield_every <= 0:
+            raise ValueError('yield_every must be positive.')
+        event_loop = self.sm.event_loop
+        event_loop.asynchronous = True
+        tasks: set[asyncio.Future] = set()
+        try:
+            while True:
+                stop_reason = self.run_steps(yield_every)
+                tasks.update(asyncio.ensure_future(aw) for aw in event_loop.take_awaitables())
+                if stop_reason is None:
+                    await asyncio.sleep(0)
+                    continue
+                if stop_reason != STOP_FINISHED or not tasks:
+                    self.stop_reason = stop_reason
+                    return
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    # Отмененные задачи - остановленные таймеры
+                    if not task.cancelled():
+                        task.result()
+        finally:
+            event_loop.asynchronous = False
+            for task in tasks:
+                task.cancel()
+
+    def result(self) -> StateMachineResult:
+        event_loop = self.sm.event_loop
+        loop_detector = self.loop_detector
+        return StateMachineResult(self.stop_reason in LIMIT_STOP_REASONS, event_loop.events,
+                                  event_loop.called_events, self.sm.components,
+                                  event_loop.dropped_events, self.stop_reason, self.steps,
+                                  self.transitions,
+                                  loop_detector.cycle if loop_detector is not None else None,
+                                  event_loop.clock.now if event_loop.clock is not None else None)
+
 
 def run_state_machine(sm: StateMachine,
-                      signals: list[str], timeout_sec: float = 10.0) -> StateMachineResult:
+                      signals: list[str], timeout_sec: float | None = 10.0,
+                      drop_unhandled: bool = False,
+                      trace: str = 'full',
+                      trace_size: int = 1000,
+                      trace_sink: TraceSink | None = None,
+                      max_steps: int | None = None,
+                      max_transitions: int | None = None,
+                      clock_check_interval: int = 1024,
+                      detect_loops: bool = False,
+                      virtual_time: bool = False) -> StateMachineResult:
     """
     Запускает машину состояний на основе CGML XML и списка сигналов.
     Возвращает StateMachineResult: был ли выход по таймауту, список сигналов, компоненты.
+
+    drop_unhandled - не ставить в очередь события, которые не обрабатывает ни одно
+    состояние (они не попадут в signals, но вызванные события по-прежнему
+    записываются в called_signals).
+    trace - что сохранять в signals: 'full' - все события, 'last' - последние
+    trace_size событий, 'called' - ничего, 'stream' - отдавать события в
+    trace_sink(event, called). called_signals хранится целиком в режимах
+    'full' и 'called', в 'last' - последние trace_size, в 'stream' - пустой.
+    max_steps, max_transitions - детерминированные ограничения на число
+    обработанных событий и переходов. timeout_sec проверяется по монотонным
+    часам раз в clock_check_interval событий; None - без ограничения.
+    detect_loops - останавливать запуск, как только конфигурация машины
+    (см. StateMachine.configuration) повторилась; цикл попадет в loop_cycle.
+    virtual_time - таймеры компонентов (Timer.start) срабатывают в виртуальном
+    времени: когда очередь пуста, время перескакивает к ближайшему таймеру.
+    Итоговое время в мс - в result.virtual_time.
     """
-    EventLoop.clear()
-    qhsm = sm.qhsm
-    qhsm.current_(qhsm, 'entry')
-
-    for event in signals:
-        EventLoop.add_event(event)
-
-    timeout = False
-    start_time = time.time()
-    while True:
-        if time.time() - start_time > timeout_sec:
-            timeout = True
-            break
-        event = EventLoop.get_event()
-        if event is None or event == 'break':
-            break
-        SIMPLE_DISPATCH(qhsm, event)
-    return StateMachineResult(timeout, EventLoop.events, EventLoop.called_events, sm.components)
+    run = StateMachineRun(sm, signals, timeout_sec, drop_unhandled, trace, trace_size,
+                          trace_sink, max_steps, max_transitions, clock_check_interval,
+                          detect_loops, virtual_time)
+    run.stop_reason = run.run_steps()
+    return run.result()
+
+
+async def run_state_machine_async(sm: StateMachine,
+                                  signals: list[str], timeout_sec: float | None = 10.0,
+                                  yield_every: int = 256,
+                                  **options) -> StateMachineResult:
+    """
+    Асинхронный вариант run_state_machine для запуска многих машин в одном
+    цикле asyncio. Каждые yield_every событий управление отдается другим задачам.
+    timeout_sec реализован через asyncio.wait_for и дает stop_reason='timeout';
+    отмена задачи (CancelledError) отменяет и ожидающие действия компонентов.
+    Остальные параметры - как у run_state_machine.
+    """
+    run = StateMachineRun(sm, signals, None, **options)
+    try:
+        if timeout_sec is None:
+            await run.run_async(yield_every)
+        else:
+            await asyncio.wait_for(run.run_async(yield_every), timeout_sec)
+    except asyncio.TimeoutError:
+        run.stop_reason = STOP_TIMEOUT
+    return run.result()
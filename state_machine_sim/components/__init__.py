@@ -0,0 +1,53 @@
+"""
+Компоненты машины. Каждый компонент - в своем модуле, модуль загружается
+при первом обращении к имени (components.Reader, from .components import
+Reader) или к типу через registry.component_class.
+"""
+import importlib
+
+_EXPORTS = {
+    'Component': 'base',
+    'InputStarved': 'reader',
+    'Reader': 'reader',
+    'Impulse': 'impulse',
+    'Counter': 'counter',
+    'UserSignal': 'user_signal',
+    'LED': 'led',
+    'Timer': 'timer',
+    'Gardener': 'gardener',
+    'GardenerComponent': 'gardener',
+    'GardenerCrashException': 'gardener',
+    'Sensor': 'gardener',
+    'Flower': 'gardener',
+    'Mover': 'gardener',
+    'Compass': 'gardener',
+    'SOUTH': 'gardener',
+    'NORTH': 'gardener',
+    'WEST': 'gardener',
+    'EAST': 'gardener',
+    'TURN_LEFT': 'gardener',
+    'TURN_RIGHT': 'gardener',
+    'TURN_BACK': 'gardener',
+    'STEP_X': 'gardener',
+    'STEP_Y': 'gardener',
+    'WALL': 'gardener',
+    'EMPTY': 'gardener',
+    'ROSE': 'gardener',
+    'MINT': 'gardener',
+    'VASILEK': 'gardener',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(f'{__name__}.{module}'), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
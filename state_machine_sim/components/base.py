@@ -0,0 +1,61 @@
+"""Базовый класс компонентов машины."""
+import abc
+from functools import partial
+from typing import Callable
+
+from ..event_loop import EventLoop, current_event_loop
+
+
+class Component(abc.ABC):
+    # Интерфейс для компилятора схем: события (без префикса '<id>.'), атрибуты
+    # для условий и аргументов действий и действия. None - не объявлено,
+    # допустимо любое имя.
+    events: tuple[str, ...] | None = None
+    attributes: tuple[str, ...] | None = None
+    actions: tuple[str, ...] | None = None
+    # Атрибуты, значение которых не меняется: подставляются в условия при сборке
+    constants: dict[str, object] = {}
+
+    def __init__(self, name: str):
+        self.name = name
+        # Машина подставляет сюда свой цикл событий при инициализации компонентов
+        self.event_loop: EventLoop = current_event_loop()
+
+    def get_sm_options(self, options: dict):
+        ...
+        # raise NotImplementedError("This method should be overridden in subclasses")
+
+    def reset(self):
+        """Возвращает компонент в начальное состояние перед новым запуском той же машины."""
+        ...
+
+    def observable_state(self) -> tuple:
+        """Наблюдаемое состояние компонента - входит в конфигурацию машины при поиске зацикливания."""
+        return ()
+
+    def snapshot(self):
+        """Состояние компонента для отката запуска (см. StateMachineRun.snapshot)."""
+        return self.__dict__.copy()
+
+    def restore(self, state):
+        self.__dict__.update(state)
+
+    @classmethod
+    def is_deterministic(cls, virtual_time: bool) -> bool:
+        """Зависит ли результат запуска только от схемы и входов (см. cache.py)."""
+        return True
+
+    @classmethod
+    def event_names(cls, name: str) -> tuple[str, ...]:
+        """Полные имена событий, которые поднимает компонент name."""
+        return tuple(f'{name}.{event}' for event in cls.events or ())
+
+    def has_attribute(self, name: str) -> bool:
+        """Можно ли читать атрибут name в условиях: объявлен в attributes (или есть у объекта)."""
+        if self.attributes is None:
+            return hasattr(self, name)
+        return name in self.attributes
+
+    def attribute_getter(self, name: str) -> Callable[[], object]:
+        """Функция без аргументов, читающая атрибут name, для условий переходов."""
+        return partial(getattr, self, name)
@@ -0,0 +1,43 @@
+# Компонент Счётчик:
+# Действие «Установить»
+# Действие «Увеличить»
+# Действие «Уменьшить»
+# Действие «Очистить»
+# Атрибут «Значение»
+from .base import Component
+
+
+class Counter(Component):
+    events = ()
+    attributes = ('value',)
+    actions = ('set', 'add', 'sub', 'clear')
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.value = 0
+
+    def reset(self):
+        self.value = 0
+
+    def observable_state(self) -> tuple:
+        return (self.value,)
+
+    # Значение может прийти атрибутом другого компонента (например, символом-цифрой)
+    def set(self, value: int):
+        self.value = _integer(value)
+
+    def add(self, value: int = 1):
+        self.value += _integer(value)
+
+    def sub(self, value: int = 1):
+        self.value -= _integer(value)
+
+    def clear(self):
+        self.value = 0
+
+
+def _integer(value) -> int:
+    """Целый аргумент действия; строка-число переводится, дробное значение - ошибка."""
+    if isinstance(value, float) and not value.is_integer():
+        raise ValueError(f'Counter expects an integer, got {value}.')
+    return int(value)
@@ -0,0 +1,531 @@
+"""Садовник: поле с цветами и стенами и компоненты, которые с ним работают."""
+import random
+from array import array
+
+from .base import Component
+
+# Компонент Компас
+# Атрибут Ориентация (С, Ю, З, В)
+# Атрибут Координата X
+# Атрибут Координата Y
+
+# Компонент Цветы
+# Действие Высадить, параметр Тип [роза, мята, василек]
+
+# Компонент Движение
+# Действие Вперёд
+# Действие Назад
+# Действие Повернуть влево
+# Действие Повернуть вправо
+
+# Компонент Сенсор
+# Действие Осмотреть стены
+# Действия Осмотреть растение
+# Событие Растение осмотрено
+# Событие Стена спереди
+# Событие Стена сзади
+# Событие Стена слева
+# Событие Стена справа
+# Атрибут Стена спереди = 1/0
+# Атрибут Стена сзади = 1/0
+# Атрибут Стена слева = 1/0
+# Атрибут Стена справа = 1/0
+# Атрибут Высаженные цветы = 0/1/2/3 (нет/роза/мята/василек)
+
+class GardenerCrashException(Exception):
+    ...
+
+# Направления садовника и таблицы поворотов: индекс - текущее направление
+SOUTH, NORTH, WEST, EAST = 0, 1, 2, 3
+TURN_LEFT = (EAST, WEST, SOUTH, NORTH)
+TURN_RIGHT = (WEST, EAST, NORTH, SOUTH)
+TURN_BACK = (NORTH, SOUTH, EAST, WEST)
+STEP_X = (0, 0, -1, 1)
+STEP_Y = (1, -1, 0, 0)
+WALL = -1
+EMPTY = 0
+ROSE = 1
+MINT = 2
+VASILEK = 3
+
+
+class Gardener:
+    """
+    Поле N x M хранится построчно в array('b') cells: WALL или цветок
+    (EMPTY/ROSE/MINT/VASILEK). wall_mask - для каждой клетки биты 1 << направление:
+    стена или край поля в этом направлении. Маски пересчитываются при
+    генерации стен, присваивании field и записи стены в field[y][x];
+    запись WALL прямо в cells их не обновляет - для этого есть set_wall.
+    """
+
+    def __init__(self, N: int, M: int, with_walls: bool = False,
+                 seed: int | None = None, rng: random.Random | None = None):
+        self.N = N
+        self.M = M
+        # Свой генератор: поле воспроизводится по seed и не зависит от других садовников
+        self.rng = rng if rng is not None else random.Random(seed)
+        self.cells = array('b', bytes(N * M))
+        self.wall_mask = bytearray(N * M)
+        self._update_wall_masks()
+        # Клетки, где садовник побывал (для оценки покрытия)
+        self.visited = {(0, 0)}
+        if with_walls:
+            self.generate_walls()
+        self.SOUTH = SOUTH
+        self.NORTH = NORTH
+        self.WEST = WEST
+        self.EAST = EAST
+
+        self.ROSE = ROSE
+        self.MINT = MINT
+        self.VASILEK = VASILEK
+        self.EMPTY = EMPTY
+
+        self.orientation = self.SOUTH
+        self.x = 0
+        self.y = 0
+
+        # Атрибуты наличия стен
+        self.wall_left_value = 0
+        self.wall_right_value = 0
+        self.wall_straight_value = 0
+        self.wall_back_value = 0
+
+    @property
+    def field(self) -> list['FieldRow']:
+        """Строки поля: field[y][x] читает и пишет cells, стены - через set_wall."""
+        return [FieldRow(self, y) for y in range(self.M)]
+
+    @field.setter
+    def field(self, rows: list[list[int]]):
+        self.cells = array('b', (cell for row in rows for cell in row))
+        self._update_wall_masks()
+
+    def _update_wall_masks(self):
+        N, M = self.N, self.M
+        cells = self.cells
+        masks = self.wall_mask
+        for y in range(M):
+            for x in range(N):
+                index = y * N + x
+                mask = 0
+                if y == M - 1 or cells[index + N] == WALL:
+                    mask |= 1 << SOUTH
+                if y == 0 or cells[index - N] == WALL:
+                    mask |= 1 << NORTH
+                if x == 0 or cells[index - 1] == WALL:
+                    mask |= 1 << WEST
+                if x == N - 1 or cells[index + 1] == WALL:
+                    mask |= 1 << EAST
+                masks[index] = mask
+
+    def set_wall(self, x: int, y: int, wall: bool = True):
+        """Ставит или убирает стену в (x, y) и обновляет маски соседей."""
+        N = self.N
+        self.cells[y * N + x] = WALL if wall else EMPTY
+        for direction in (SOUTH, NORTH, WEST, EAST):
+            nx, ny = x + STEP_X[direction], y + STEP_Y[direction]
+            if 0 <= nx < N and 0 <= ny < self.M:
+                # У соседа стена в обратном направлении
+                bit = 1 << TURN_BACK[direction]
+                if wall:
+                    self.wall_mask[ny * N + nx] |= bit
+                else:
+                    self.wall_mask[ny * N + nx] &= ~bit
+
+    def generate_walls(self, wall_fraction: float = 0.2, max_attempts: int | None = None):
+        """
+        Ставит int(N * M * wall_fraction) стен так, что все свободные клетки
+        остаются достижимы из (0, 0), за время O(N * M).
+
+        Строится случайное остовное дерево свободных клеток (алгоритм Прима
+        по ребрам), затем стены ставятся в случайные листья: без листа
+        дерево остается связным, а его родитель может сам стать листом.
+        Клетки с цветами не застраиваются. max_attempts - необязательный
+        предел числа стен.
+        """
+        N = self.N
+        size = N * self.M
+        num_walls = int(size * wall_fraction)
+        if max_attempts is not None:
+            num_walls = min(num_walls, max_attempts)
+        cells = self.cells
+        if num_walls <= 0 or cells[0] == WALL:
+            return
+        # Ребро - клетка * 4 + направление (индекс в offsets)
+        free = bytearray(cell != WALL for cell in cells)
+        offsets = (-1, 1, -N, N)
+        visited = bytearray(size)
+        parent = [-1] * size
+        children = bytearray(size)
+        random_ = self.rng.random
+        edges = []
+
+        def push_edges(cell: int):
+            x = cell % N
+            base = cell * 4
+            if x > 0:
+                edges.append(base)
+            if x < N - 1:
+                edges.append(base + 1)
+            if cell >= N:
+                edges.append(base + 2)
+            if cell + N < size:
+                edges.append(base + 3)
+
+        visited[0] = 1
+        push_edges(0)
+        while edges:
+            # Случайное ребро из границы дерева, удаление перестановкой с последним
+            index = int(random_() * len(edges))
+            edge = edges[index]
+            edges[index] = edges[-1]
+            edges.pop()
+            source = edge >> 2
+            target = source + offsets[edge & 3]
+            if visited[target] or not free[target]:
+                continue
+            visited[target] = 1
+            parent[target] = source
+            children[source] += 1
+            push_edges(target)
+
+        leaves = [cell for cell in range(1, size)
+                  if visited[cell] and not children[cell] and cells[cell] == EMPTY]
+        walls_placed = 0
+        while leaves and walls_placed < num_walls:
+            index = int(random_() * len(leaves))
+            cell = leaves[index]
+            leaves[index] = leaves[-1]
+            leaves.pop()
+            cells[cell] = WALL
+            walls_placed += 1
+            up = parent[cell]
+            children[up] -= 1
+            if not children[up] and up != 0 and cells[up] == EMPTY:
+                leaves.append(up)
+        self._update_wall_masks()
+
+    def update_walls(self):
+        # Обновляет значения wall_left_value, wall_right_value, wall_straight_value, wall_back_value
+        mask = self.wall_mask[self.y * self.N + self.x]
+        orientation = self.orientation
+        self.wall_left_value = mask >> TURN_LEFT[orientation] & 1
+        self.wall_right_value = mask >> TURN_RIGHT[orientation] & 1
+        self.wall_straight_value = mask >> orientation & 1
+        self.wall_back_value = mask >> TURN_BACK[orientation] & 1
+
+    def wall_left(self):
+        return self.wall_left_value == 1
+
+    def wall_right(self):
+        return self.wall_right_value == 1
+
+    def wall_straight(self):
+        return self.wall_straight_value == 1
+
+    def wall_back(self):
+        return self.wall_back_value == 1
+
+    def get_current_flower(self):
+        return self.cells[self.y * self.N + self.x]
+
+    def plant(self, flower: int):
+        # Число-литерал приходит int, но атрибут другого компонента может быть
+        # строкой (например, Reader1.current_char)
+        self.cells[self.y * self.N + self.x] = int(flower)
+
+    def move_to(self, x: int, y: int):
+        self.x = x
+        self.y = y
+        self.visited.add((x, y))
+
+    def step(self, direction: int):
+        """Шаг в направлении direction; в стену или за край поля - авария."""
+        if self.wall_mask[self.y * self.N + self.x] >> direction & 1:
+            nx, ny = self.x + STEP_X[direction], self.y + STEP_Y[direction]
+            if 0 <= nx < self.N and 0 <= ny < self.M:
+                raise GardenerCrashException('Crash: hit a wall!')
+            raise GardenerCrashException('Crash: out of bounds!')
+        self.move_to(self.x + STEP_X[direction], self.y + STEP_Y[direction])
+
+    def coverage(self) -> float:
+        """Доля свободных клеток поля, где садовник побывал."""
+        return len(self.visited) / (len(self.cells) - self.cells.count(WALL))
+
+    def observable_state(self) -> tuple:
+        # Поле входит целиком: цветы, высаженные Flower.plant, читают условия
+        return (self.x, self.y, self.orientation, self.cells.tobytes())
+
+    def snapshot(self):
+        return (self.x, self.y, self.orientation, self.cells.tobytes(), bytes(self.wall_mask),
+                self.wall_left_value, self.wall_right_value,
+                self.wall_straight_value, self.wall_back_value, frozenset(self.visited))
+
+    def restore(self, state):
+        (self.x, self.y, self.orientation, cells, wall_mask,
+         self.wall_left_value, self.wall_right_value,
+         self.wall_straight_value, self.wall_back_value, visited) = state
+        self.cells = array('b', cells)
+        self.wall_mask = bytearray(wall_mask)
+        self.visited = set(visited)
+
+    def _wall_in_direction(self, direction):
+        return bool(self.wall_mask[self.y * self.N + self.x] >> direction & 1)
+
+class FieldRow:
+    """Строка y поля садовника в старом виде field[y][x]; запись стены идет через set_wall."""
+    __slots__ = ('gardener', 'y')
+
+    def __init__(self, gardener: Gardener, y: int):
+        self.gardener = gardener
+        self.y = y
+
+    def _index(self, x: int) -> int:
+        N = self.gardener.N
+        if x < 0:
+            x += N
+        if not 0 <= x < N:
+            raise IndexError('field row index out of range')
+        return self.y * N + x
+
+    def __len__(self) -> int:
+        return self.gardener.N
+
+    def __getitem__(self, x: int) -> int:
+        return self.gardener.cells[self._index(x)]
+
+    def __setitem__(self, x: int, value: int):
+        gardener = self.gardener
+        index = self._index(x)
+        if value == WALL or gardener.cells[index] == WALL:
+            # Стена появилась или исчезла - маски соседей пересчитываются
+            gardener.set_wall(index - self.y * gardener.N, self.y, value == WALL)
+        gardener.cells[index] = value
+
+    def __iter__(self):
+        N = self.gardener.N
+        return iter(self.gardener.cells[self.y * N:(self.y + 1) * N])
+
+    def __eq__(self, other) -> bool:
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class GardenerComponent(Component):
+    """Компонент, работающий с общим садовником из sm_parameters['gardener']."""
+    gardener: Gardener | None
+
+    @classmethod
+    def is_deterministic(cls, virtual_time: bool) -> bool:
+        # Поле садовника генерируется случайно
+        return False
+
+    def observable_state(self) -> tuple:
+        if self.gardener is None:
+            return ()
+        return self.gardener.observable_state()
+
+    def snapshot(self):
+        gardener = self.gardener.snapshot() if self.gardener is not None else None
+        return super().snapshot(), gardener
+
+    def restore(self, state):
+        own, gardener = state
+        super().restore(own)
+        if gardener is not None:
+            self.gardener.restore(gardener)
+
+
+class Sensor(GardenerComponent):
+    events = ('wall_right', 'wall_back', 'wall_left', 'wall_straight', 'isDataRecieved')
+    attributes = ('flower', 'wall_right', 'wall_left', 'wall_straight', 'wall_back',
+                  'rose', 'mint', 'vasilek', 'empty', 'north')
+    actions = ('search_walls', 'search_flowers')
+    constants = {'rose': ROSE, 'mint': MINT, 'vasilek': VASILEK, 'empty': EMPTY, 'north': NORTH}
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.gardener: Gardener | None = None
+        self.reset()
+
+    def reset(self):
+        # Показания до первого осмотра (flower уточняет get_sm_options)
+        self.flower = -1
+        self.wall_right = -1
+        self.wall_left = -1
+        self.wall_straight = -1
+        self.wall_back = -1
+
+    @property
+    def rose(self):
+        return ROSE
+
+    @property
+    def mint(self):
+        return MINT
+
+    @property
+    def vasilek(self):
+        return VASILEK
+
+    @property
+    def empty(self):
+        return EMPTY
+
+    @property
+    def north(self):
+        return NORTH
+
+    def get_sm_options(self, options: dict):
+        gardener = options.get('gardener')
+
+        if gardener is None:
+            raise ValueError('Gardener is None!')
+
+        self.gardener = gardener
+        self.flower = gardener.get_current_flower()
+
+    def observable_state(self) -> tuple:
+        return (super().observable_state(), self.flower, self.wall_right, self.wall_left,
+                self.wall_straight, self.wall_back)
+    
+    def search_walls(self):
+        if self.gardener is None:
+            raise ValueError('Gardener is None!')
+        self.gardener.update_walls()
+        if self.gardener.wall_right():
+            self.event_loop.add_event(f'{self.name}.wall_right')
+        elif self.gardener.wall_back():
+            self.event_loop.add_event(f'{self.name}.wall_back')
+        elif self.gardener.wall_left():
+            self.event_loop.add_event(f'{self.name}.wall_left')
+        elif self.gardener.wall_straight():
+            self.event_loop.add_event(f'{self.name}.wall_straight')
+        self.wall_back = self.gardener.wall_back_value
+        self.wall_left = self.gardener.wall_left_value
+        self.wall_right = self.gardener.wall_right_value
+        self.wall_straight = self.gardener.wall_straight_value
+
+    def search_flowers(self):
+        if self.gardener is None:
+            raise ValueError('Gardener is None!')
+        self.flower = self.gardener.get_current_flower()
+        self.event_loop.add_event(f'{self.name}.isDataRecieved')
+
+
+class Flower(GardenerComponent):
+    events = ()
+    attributes = ()
+    actions = ('plant',)
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.gardener: Gardener | None = None
+
+    def get_sm_options(self, options: dict):
+        gardener = options.get('gardener')
+
+        if gardener is None:
+            raise ValueError('Gardener is None!')
+
+        self.gardener = gardener
+    
+    def plant(self, flower: int):
+        if self.gardener is None:
+            raise ValueError('Gardener is None!')
+        self.gardener.plant(flower)
+
+# Компонент Движение
+# Действие Вперёд
+# Действие Назад
+# Действие Повернуть влево
+# Действие Повернуть вправо
+
+class Mover(GardenerComponent):
+    events = ()
+    attributes = ()
+    actions = ('move_forward', 'move_backward', 'turn_left', 'turn_right')
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.gardener: Gardener | None = None
+    
+    def get_sm_options(self, options: dict):
+        gardener = options.get('gardener') 
+
+        if gardener is None:
+            raise ValueError('Gardener is None!')
+
+        self.gardener = gardener
+    
+    def move_forward(self):
+        if self.gardener is None:
+            raise ValueError('Gardener is None!')
+        self.gardener.step(self.gardener.orientation)
+
+    def move_backward(self):
+        if self.gardener is None:
+            raise ValueError('Gardener is None!')
+        self.gardener.step(TURN_BACK[self.gardener.orientation])
+
+    def turn_left(self):
+        if self.gardener is None:
+            raise ValueError('Gardener is None!')
+        # Поворот против часовой стрелки
+        self.gardener.orientation = TURN_LEFT[self.gardener.orientation]
+
+    def turn_right(self):
+        if self.gardener is None:
+            raise ValueError('Gardener is None!')
+        # Поворот по часовой стрелке
+        self.gardener.orientation = TURN_RIGHT[self.gardener.orientation]
+
+class Compass(GardenerComponent):
+    events = ()
+    attributes = ('x', 'y', 'south', 'north', 'west', 'east', 'orientation')
+    actions = ()
+    constants = {'south': SOUTH, 'north': NORTH, 'west': WEST, 'east': EAST}
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.gardener: Gardener | None = None
+
+    def get_sm_options(self, options: dict):
+        gardener = options.get('gardener')
+
+        if gardener is None:
+            raise ValueError('Gardener is required for Compass work!')
+
+        self.gardener = gardener
+
+    # Наличие садовника проверяет get_sm_options, атрибуты читаются без проверок
+    @property
+    def x(self):
+        return self.gardener.x
+
+    @property
+    def y(self):
+        return self.gardener.y
+
+    @property
+    def south(self):
+        return SOUTH
+
+    @property
+    def north(self):
+        return NORTH
+
+    @property
+    def west(self):
+        return WEST
+
+    @property
+    def east(self):
+        return EAST
+
+    @property
+    def orientation(self):
+        return self.gardener.orientation
@@ -0,0 +1,28 @@
+# Компонент Сигнал:
+# Действие «Импульс А»
+# Действие «Импульс Б»
+# Действие «Импульс В»
+from .base import Component
+
+
+class Impulse(Component):
+    # События импульсов общие, без префикса компонента
+    events = ('impulseA', 'impulseB', 'impulseC')
+    attributes = ()
+    actions = ('impulseA', 'impulseB', 'impulseC')
+
+    @classmethod
+    def event_names(cls, name: str) -> tuple[str, ...]:
+        return cls.events
+
+    def impulseA(self):
+        # print('impulseA')
+        self.event_loop.add_event('impulseA', True)
+
+    def impulseB(self):
+        # print('impulseB')
+        self.event_loop.add_event('impulseB', True)
+
+    def impulseC(self):
+        # print('impulseC')
+        self.event_loop.add_event('impulseC', True)
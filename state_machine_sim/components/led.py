@@ -0,0 +1,16 @@
+from .base import Component
+
+
+class LED(Component):
+    events = ()
+    attributes = ()
+    actions = ('on', 'off')
+
+    def on(self):
+        print('on')
+
+    def off(self):
+        print('off')
+
+    def get_sm_options(self, options: dict):
+        ...
@@ -0,0 +1,116 @@
+# Компонент Считыватель:
+# Действие «Принять символ»
+# Событие «Есть символ»
+# Событие «Строка закончилась»
+# Атрибут «Принятый символ»
+import codecs
+from typing import Iterable, Iterator
+
+from .base import Component
+
+# Размер куска при чтении сообщения из файла
+READ_CHUNK_SIZE = 1 << 16
+
+
+class InputStarved(Exception):
+    """Считыватель дошел до конца доступной части сообщения (см. Reader.available)."""
+
+
+def _read_chunks(stream, chunk_size: int) -> Iterator[str]:
+    """Куски текста из файла; файл в двоичном режиме читается как UTF-8."""
+    decoder = None
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        if isinstance(chunk, bytes):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder('utf-8')()
+            chunk = decoder.decode(chunk)
+        yield chunk
+    if decoder is not None:
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
+
+
+def message_chunks(message: Iterable[str], chunk_size: int = READ_CHUNK_SIZE) -> Iterator[str]:
+    """Итератор кусков сообщения из файлового объекта или итерируемого источника строк."""
+    if hasattr(message, 'read'):
+        return _read_chunks(message, chunk_size)
+    return iter(message)
+
+class Reader(Component):
+    events = ('char_accepted', 'line_finished')
+    attributes = ('current_char', 'index')
+    actions = ('read',)
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        # Сообщение целиком или текущий кусок потока; message[0] - символ номер offset
+        self.message = ''
+        self.offset = 0
+        # Итератор следующих кусков, если сообщение читается потоком
+        self.source: Iterator[str] | None = None
+        self.current_char = ''
+        self.index = 0
+        # Сколько символов сообщения уже известно; None - всё сообщение.
+        # Используется при общем прогоне префиксов (prefix.py).
+        self.available: int | None = None
+
+    def get_sm_options(self, options: dict):
+        """
+        options['message'] - строка, файловый объект (текстовый или двоичный
+        в UTF-8) или итерируемый источник строк любой длины. Файлы и
+        итераторы читаются кусками по мере чтения символов, в памяти
+        держится только текущий кусок.
+        """
+        message = options['message']
+        if isinstance(message, str):
+            self.message = message
+        else:
+            self.message = ''
+            self.source = message_chunks(message)
+        # self.current_char = self.message[0]
+
+    def reset(self):
+        self.message = ''
+        self.offset = 0
+        self.source = None
+        self.current_char = ''
+        self.index = 0
+        self.available = None
+
+    def snapshot(self):
+        if self.source is not None:
+            # Прочитанную часть потока не вернуть
+            raise ValueError('Streaming Reader input cannot be snapshotted.')
+        return super().snapshot()
+
+    def _next_chunk(self) -> bool:
+        """Берет следующий непустой кусок потока; False - поток кончился."""
+        for chunk in self.source:
+            if chunk:
+                self.offset += len(self.message)
+                self.message = chunk
+                return True
+        self.source = None
+        return False
+
+    def observable_state(self) -> tuple:
+        return (self.index,)
+
+    def read(self):
+        if self.available is not None and self.index >= self.available:
+            raise InputStarved(self.name)
+        position = self.index - self.offset
+        if position >= len(self.message) and self.source is not None and self._next_chunk():
+            position = self.index - self.offset
+        if position < len(self.message):
+            self.current_char = self.message[position]
+            self.index += 1
+            self.event_loop.add_event(f'{self.name}.char_accepted')
+            return True
+        else:
+            self.event_loop.add_event(f'{self.name}.line_finished')
+            return False
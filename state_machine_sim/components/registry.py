@@ -0,0 +1,80 @@
+"""
+Реестр типов компонентов.
+
+Тип из схемы (CGML_COMPONENT type/) сопоставляется классу по строке
+'модуль:Класс'; модуль импортируется при первом обращении, поэтому запуск
+машины загружает только компоненты, которые есть в схеме. Сторонние
+компоненты регистрируются через register_component или точки входа пакета
+в группе ENTRY_POINT_GROUP (имя точки входа - тип компонента).
+"""
+import importlib
+from importlib.metadata import EntryPoint, entry_points
+
+from .base import Component
+
+ENTRY_POINT_GROUP = 'state_machine_sim.components'
+
+_BUILTIN_COMPONENTS = {
+    'Reader': 'state_machine_sim.components.reader:Reader',
+    'Impulse': 'state_machine_sim.components.impulse:Impulse',
+    'Counter': 'state_machine_sim.components.counter:Counter',
+    'UserSignal': 'state_machine_sim.components.user_signal:UserSignal',
+    'Sensor': 'state_machine_sim.components.gardener:Sensor',
+    'Flower': 'state_machine_sim.components.gardener:Flower',
+    'Mover': 'state_machine_sim.components.gardener:Mover',
+    'Compass': 'state_machine_sim.components.gardener:Compass',
+    'LED': 'state_machine_sim.components.led:LED',
+    'Timer': 'state_machine_sim.components.timer:Timer',
+}
+
+# Тип -> 'модуль:Класс', точка входа или уже загруженный класс
+_targets: dict[str, str | EntryPoint | type[Component]] = dict(_BUILTIN_COMPONENTS)
+_classes: dict[str, type[Component]] = {}
+_entry_points_loaded = False
+
+
+def _load_entry_points():
+    global _entry_points_loaded
+    _entry_points_loaded = True
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        # Встроенные и явно зарегистрированные типы не перекрываются
+        _targets.setdefault(entry_point.name, entry_point)
+
+
+def register_component(type_name: str, target: str | type[Component], replace: bool = False):
+    """
+    Регистрирует тип компонента: target - класс или строка 'модуль:Класс'
+    (импортируется при первом использовании).
+    """
+    if not replace and type_name in _targets:
+        raise ValueError(f'Component type {type_name} is already registered.')
+    _targets[type_name] = target
+    _classes.pop(type_name, None)
+
+
+def component_class(type_name: str) -> type[Component]:
+    component_type = _classes.get(type_name)
+    if component_type is not None:
+        return component_type
+    target = _targets.get(type_name)
+    if target is None and not _entry_points_loaded:
+        _load_entry_points()
+        target = _targets.get(type_name)
+    if target is None:
+        raise ValueError(f'Component type {type_name} not found.')
+    if isinstance(target, EntryPoint):
+        component_type = target.load()
+    elif isinstance(target, str):
+        module_name, _, class_name = target.partition(':')
+        component_type = getattr(importlib.import_module(module_name), class_name)
+    else:
+        component_type = target
+    _classes[type_name] = component_type
+    return component_type
+
+
+def component_types() -> list[str]:
+    """Все известные типы компонентов, включая точки входа (классы не загружаются)."""
+    if not _entry_points_loaded:
+        _load_entry_points()
+    return sorted(_targets)
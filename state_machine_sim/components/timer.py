@@ -0,0 +1,53 @@
+import asyncio
+
+from .base import Component
+
+
+class Timer(Component):
+    events = ('timeout',)
+    attributes = ('interval',)
+    actions = ('start', 'stop')
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.interval = 0
+        self.timer_id: int | None = None
+        # Задача ожидания в asyncio (run_state_machine_async)
+        self.task: asyncio.Task | None = None
+
+    def reset(self):
+        self.stop()
+        self.interval = 0
+
+    @classmethod
+    def is_deterministic(cls, virtual_time: bool) -> bool:
+        # В реальном времени порядок срабатываний зависит от планировщика
+        return virtual_time
+
+    def start(self, time: int):
+        self.interval = int(time)
+        # Перезапуск отменяет прежний срок
+        self.stop()
+        clock = self.event_loop.clock
+        if clock is not None:
+            self.timer_id = clock.schedule(self.interval, f'{self.name}.timeout')
+            return
+        if self.event_loop.asynchronous:
+            # В asyncio таймер действительно ждет interval миллисекунд;
+            # задачу ждет run_async, stop ее отменяет
+            self.task = asyncio.ensure_future(self._wait_timeout(self.interval))
+            return self.task
+        print('timer started for', time)
+
+    def stop(self):
+        clock = self.event_loop.clock
+        if clock is not None and self.timer_id is not None:
+            clock.cancel(self.timer_id)
+        self.timer_id = None
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def _wait_timeout(self, interval: int):
+        await asyncio.sleep(interval / 1000)
+        self.event_loop.add_event(f'{self.name}.timeout')
@@ -0,0 +1,13 @@
+# Компонент Свое событие
+# Событие Вызвано
+# Действие Вызвать
+from .base import Component
+
+
+class UserSignal(Component):
+    events = ('call',)
+    attributes = ()
+    actions = ('call',)
+
+    def call(self):
+        self.event_loop.add_event(f'{self.name}.call', True)
@@ -1,32 +1,181 @@
-class EventLoop:
-    events: list[str] = []
-    called_events: list[str] = []
-    current_event_idx = 0
-    insert_event_idx = 0
-
-    @staticmethod
-    def add_event(event: str, is_called=False):
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from .trace import Trace, FullTrace
+from .virtual_clock import VirtualClock
+
+
+# Методы и списки событий, доступные через класс: EventLoop.add_event(...)
+# и EventLoop.events работают с текущим циклом событий (см. current_event_loop).
+_STATIC_API = frozenset({'add_event', 'get_event', 'clear', 'set_filter',
+                         'events', 'called_events'})
+
+
+class _EventLoopMeta(type):
+    def __getattribute__(cls, name):
+        # Перехватывается только обращение через класс, вызовы у экземпляра
+        # идут обычным путем и ничего не стоят
+        if name in _STATIC_API:
+            return getattr(current_event_loop(), name)
+        return super().__getattribute__(name)
+
+
+class EventLoop(metaclass=_EventLoopMeta):
+    """
+    Очередь событий из двух полос:
+    batch - события, добавленные за текущий шаг (run-to-completion), добавление O(1);
+    queue - ожидающие события (deque).
+    Перед выдачей следующего события batch вставляется сразу после головы queue -
+    это тот же порядок, что давала вставка в список по курсору insert_event_idx.
+    Обработанные и вызванные события пишутся в трассу (см. trace.py).
+    Если задан clock (виртуальное время), пустая очередь пополняется
+    событием ближайшего таймера.
+    """
+
+    def __init__(self, trace: Trace | None = None):
+        self.queue: deque[str] = deque()
+        self.batch: list[str] = []
+        self.trace: Trace = trace if trace is not None else FullTrace()
+        # Множество событий, которые машина может обработать.
+        # None - фильтр выключен, в очередь попадает всё.
+        self.handled_events: frozenset[str] | None = None
+        self.dropped_events = 0
+        # Запуск идет в asyncio: компоненты могут возвращать awaitable из действий
+        self.asynchronous = False
+        self.awaitables: list = []
+        self.clock: VirtualClock | None = None
+        # Причина немедленной остановки запуска (конечное состояние, terminate) или None
+        self.halted: str | None = None
+
+    @property
+    def events(self) -> list[str]:
+        """Обработанные события, которые сохранила трасса, и все ещё ожидающие."""
+        self._flush_batch()
+        return self.trace.signals(self.queue)
+
+    def pending(self) -> tuple[str, ...]:
+        """Ожидающие события в порядке обработки."""
+        self._flush_batch()
+        return tuple(self.queue)
+
+    @property
+    def called_events(self) -> list[str]:
+        return self.trace.called_result()
+
+    def add_event(self, event: str, is_called=False):
         """Добавляет событие в цикл событий."""
-        EventLoop.insert_event_idx += 1
-        EventLoop.events.insert(
-            EventLoop.insert_event_idx,
-            event
-            )
         if is_called:
-            EventLoop.called_events.append(event)
-
-    @staticmethod
-    def clear():
-        EventLoop.current_event_idx = 0
-        EventLoop.events.clear()
-        EventLoop.called_events.clear()
-
-    @staticmethod
-    def get_event():
-        # обнулять где-то надо
-        if EventLoop.current_event_idx < len(EventLoop.events):
-            event = EventLoop.events[EventLoop.current_event_idx]
-            EventLoop.current_event_idx += 1
-            EventLoop.insert_event_idx = EventLoop.current_event_idx
+            self.trace.called(event)
+        if (self.handled_events is not None
+                and event not in self.handled_events):
+            # Событие не обработает ни одно состояние - в очередь не кладем
+            self.dropped_events += 1
+            return
+        self.batch.append(event)
+
+    def halt(self, reason: str, discard: bool = False):
+        """
+        Останавливает запуск после текущего шага. discard - выбросить
+        ожидающие события (terminate); иначе они остаются в signals.
+        """
+        self.halted = reason
+        if discard:
+            self.queue.clear()
+            self.batch.clear()
+
+    def set_filter(self, handled_events: frozenset[str] | None):
+        """Включает отбрасывание необрабатываемых событий при добавлении."""
+        self.handled_events = handled_events
+
+    def clear(self, trace: Trace | None = None, clock: VirtualClock | None = None):
+        # Новые списки, чтобы не портить результаты предыдущего запуска
+        self.queue = deque()
+        self.batch = []
+        self.trace = trace if trace is not None else FullTrace()
+        self.handled_events = None
+        self.dropped_events = 0
+        self.awaitables = []
+        self.clock = clock
+        self.halted = None
+
+    def take_awaitables(self) -> list:
+        """Забирает awaitable, которые вернули действия компонентов."""
+        awaitables = self.awaitables
+        self.awaitables = []
+        return awaitables
+
+    def snapshot(self) -> tuple:
+        """Состояние очереди и трассы для restore."""
+        clock = self.clock.snapshot() if self.clock is not None else None
+        return (tuple(self.queue), tuple(self.batch), self.trace.mark(), self.dropped_events,
+                clock, self.halted)
+
+    def restore(self, snapshot: tuple):
+        queue, batch, trace_mark, dropped_events, clock, self.halted = snapshot
+        self.queue = deque(queue)
+        self.batch = list(batch)
+        self.trace.rewind(trace_mark)
+        self.dropped_events = dropped_events
+        if clock is not None:
+            self.clock.restore(clock)
+
+    def _flush_batch(self):
+        batch = self.batch
+        if not batch:
+            return
+        queue = self.queue
+        if queue:
+            head = queue.popleft()
+            queue.extendleft(reversed(batch))
+            queue.appendleft(head)
+        else:
+            queue.extend(batch)
+        batch.clear()
+
+    def peek_event(self) -> str | None:
+        """
+        Следующее событие без выдачи; часы не переводятся, ближайший таймер
+        только подсматривается. None - очередь пуста и таймеров нет.
+        """
+        self._flush_batch()
+        if self.queue:
+            return self.queue[0]
+        if self.clock is not None:
+            return self.clock.peek_due()
+        return None
+
+    def get_event(self):
+        self._flush_batch()
+        if not self.queue and self.clock is not None:
+            # Событие таймера может отбросить фильтр - тогда берем следующий
+            while not self.batch:
+                event = self.clock.pop_due()
+                if event is None:
+                    break
+                self.add_event(event)
+            self._flush_batch()
+        if self.queue:
+            event = self.queue.popleft()
+            self.trace.dispatched(event)
             return event
-        return None
\ No newline at end of file
+        return None
+
+    @contextmanager
+    def activate(self):
+        """Делает цикл событий текущим для статического API EventLoop.*"""
+        token = _current_loop.set(self)
+        try:
+            yield self
+        finally:
+            _current_loop.reset(token)
+
+
+# Цикл событий по умолчанию - для кода, который вызывает EventLoop.* вне запуска машины
+_default_loop = EventLoop()
+_current_loop: ContextVar[EventLoop] = ContextVar('current_event_loop')
+
+
+def current_event_loop() -> EventLoop:
+    """Возвращает цикл событий запущенной в этом контексте машины."""
+    return _current_loop.get(_default_loop)
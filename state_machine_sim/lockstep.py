@@ -0,0 +1,355 @@
+"""
+Одновременное (lockstep) выполнение машины с одним Reader на многих входах.
+
+Сначала машина разворачивается в таблицы (flatten_reader_machine). Состояние
+таблицы - конфигурация машины в момент, когда Reader ждет следующий символ;
+переход - символ алфавита входов. Для перехода хранятся вызванные события,
+число шагов и переходов машины. Затем все входы продвигаются вместе: шаг -
+выборка из таблицы по векторам состояний и символов (NumPy, если он
+установлен). Входы, попавшие в неподдерживаемый переход, досчитываются
+обычным запуском.
+"""
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Iterable
+
+try:
+    import numpy as np
+except ImportError:  # numpy - необязательная зависимость, без него таблицы обходятся в Python
+    np = None
+
+from .batch import run_batch
+from .cgml_signal import (
+    StateMachine,
+    StateMachineResult,
+    StateMachineRun,
+    RunSnapshot,
+    LIMIT_STOP_REASONS,
+    STOP_MAX_STEPS,
+)
+from .components import Reader, Counter, Impulse
+from .prefix import PrefixRunStats, advance_until_starved, find_reader
+
+# Компоненты, у которых observable_state описывает все состояние
+LOCKSTEP_COMPONENTS = (Reader, Counter, Impulse)
+
+UNSUPPORTED = 0  # состояние таблицы: вход досчитывается обычным запуском
+
+
+@dataclass
+class FlatReaderMachine:
+    """
+    Таблицы развернутой машины. Индексы: [состояние][символ].
+    outputs - различные кортежи событий, outputs[0] - пустой.
+    end_* - что происходит в состоянии, когда сообщение закончилось;
+    end_stop[s] is None - конец сообщения в s не поддерживается.
+    """
+    alphabet: dict[str, int]
+    next_state: list[list[int]] = field(default_factory=list)
+    output: list[list[int]] = field(default_factory=list)
+    steps: list[list[int]] = field(default_factory=list)
+    transitions: list[list[int]] = field(default_factory=list)
+    end_output: list[int] = field(default_factory=list)
+    end_pending: list[int] = field(default_factory=list)
+    end_steps: list[int] = field(default_factory=list)
+    end_transitions: list[int] = field(default_factory=list)
+    end_stop: list[str | None] = field(default_factory=list)
+    outputs: list[tuple[str, ...]] = field(default_factory=lambda: [()])
+    initial_state: int = UNSUPPORTED
+    initial_output: int = 0
+    initial_steps: int = 0
+    initial_transitions: int = 0
+
+    @property
+    def state_count(self) -> int:
+        return len(self.next_state)
+
+
+class _Flattener:
+    def __init__(self, sm: StateMachine, signals: list[str], alphabet: dict[str, int],
+                 max_states: int, probe_steps: int):
+        for comp in sm.components.values():
+            if not isinstance(comp.obj, LOCKSTEP_COMPONENTS):
+                raise ValueError(f'Component {comp.obj.name} is not supported by lockstep execution.')
+        self.sm = sm
+        sm.reset({'message': ''})
+        self.reader = find_reader(sm)
+        # Если условия или действия читают позицию Reader, она входит в ключ состояния
+        self.keep_index = _reads_attribute(sm, self.reader.name, 'index')
+        self.run = StateMachineRun(sm, signals, None, trace='called', start=False)
+        self.max_states = max_states
+        self.probe_steps = probe_steps
+        self.flat = FlatReaderMachine(alphabet)
+        self.output_ids: dict[tuple[str, ...], int] = {(): 0}
+        self.state_ids: dict[tuple, int] = {}
+        self.snapshots: list[RunSnapshot | None] = []
+        self.unexplored: deque[int] = deque()
+        self._add_state(None, None)  # UNSUPPORTED
+
+    def _add_state(self, snapshot: RunSnapshot | None, end: tuple | None) -> int:
+        """
+        Добавляет строку таблицы. snapshot - машина ждет символ (строка будет
+        разобрана в flatten); None - машина остановилась, символы ничего не меняют.
+        """
+        flat = self.flat
+        state = len(flat.next_state)
+        size = len(flat.alphabet)
+        flat.next_state.append([UNSUPPORTED if snapshot is not None else state] * size)
+        flat.output.append([0] * size)
+        flat.steps.append([0] * size)
+        flat.transitions.append([0] * size)
+        end_output, end_pending, end_steps, end_transitions, end_stop = end or (0, 0, 0, 0, None)
+        flat.end_output.append(end_output)
+        flat.end_pending.append(end_pending)
+        flat.end_steps.append(end_steps)
+        flat.end_transitions.append(end_transitions)
+        flat.end_stop.append(end_stop)
+        self.snapshots.append(snapshot)
+        if snapshot is not None:
+            self.unexplored.append(state)
+        return state
+
+    def _output_id(self, events) -> int:
+        events = tuple(events)
+        output = self.output_ids.get(events)
+        if output is None:
+            output = self.output_ids[events] = len(self.flat.outputs)
+            self.flat.outputs.append(events)
+        return output
+
+    def _state_key(self) -> tuple:
+        sm = self.sm
+        reader = self.reader
+        # Позиция Reader входит в ключ, только если ее читает схема (keep_index);
+        # иначе дальше машина зависит только от символов
+        return (
+            self.run.started,
+            sm.qhsm.current_,
+            sm.event_loop.pending(),
+            reader.current_char,
+            reader.index if self.keep_index else None,
+            tuple(comp.obj.observable_state() for comp in sm.components.values()
+                  if comp.obj is not reader),
+            tuple(sm.qhsm.history),
+        )
+
+    def _intern_state(self, key: tuple, make) -> int:
+        state = self.state_ids.get(key)
+        if state is None:
+            if len(self.flat.next_state) >= self.max_states:
+                return UNSUPPORTED
+            state = self.state_ids[key] = self._add_state(*make())
+        return state
+
+    def probe(self, snapshot: RunSnapshot, char: str) -> tuple[int, int, int, int]:
+        """
+        Переход из снимка: символ char (пустая строка - начало запуска).
+        Возвращает (состояние, вывод, шаги, переходы).
+        """
+        run = self.run
+        reader = self.reader
+        run.restore(snapshot)
+        called = self.sm.event_loop.called_events
+        # Трасса откатывается усечением, поэтому отсчет - от длины после restore
+        base = len(called)
+        steps, transitions = run.steps, run.transitions
+        run.step_limit = run.steps + self.probe_steps
+        reader.message = '\0' * reader.index + char
+        reader.available = reader.index + len(char)
+        try:
+            waiting = advance_until_starved(run, reader, PrefixRunStats(), snapshot)
+        except Exception:
+            # Ошибку в действии воспроизведет обычный запуск, если вход дойдет до нее
+            return UNSUPPORTED, 0, 0, 0
+        if waiting is None and run.stop_reason == STOP_MAX_STEPS:
+            return UNSUPPORTED, 0, 0, 0
+        output = self._output_id(called[base:])
+        steps, transitions = run.steps - steps, run.transitions - transitions
+        if waiting is None:
+            stop_reason = run.stop_reason
+            pending = self._output_id(self.sm.event_loop.pending())
+            state = self._intern_state(
+                ('halt', stop_reason, pending),
+                lambda: (None, (0, pending, 0, 0, stop_reason)))
+        else:
+            state = self._intern_state(self._state_key(), lambda: (waiting, self.probe_end(waiting)))
+        return state, output, steps, transitions
+
+    def probe_end(self, snapshot: RunSnapshot) -> tuple | None:
+        """Что делает машина из снимка, когда сообщение закончилось."""
+        run = self.run
+        reader = self.reader
+        run.restore(snapshot)
+        called = self.sm.event_loop.called_events
+        base = len(called)
+        steps, transitions = run.steps, run.transitions
+        run.step_limit = run.steps + self.probe_steps
+        reader.message = '\0' * reader.index
+        reader.available = None
+        try:
+            if not run.started:
+                run.start()
+            stop_reason = run.run_steps()
+        except Exception:
+            return None
+        if stop_reason == STOP_MAX_STEPS:
+            return None
+        return (self._output_id(called[base:]), self._output_id(self.sm.event_loop.pending()),
+                run.steps - steps, run.transitions - transitions, stop_reason)
+
+    def flatten(self) -> FlatReaderMachine:
+        flat = self.flat
+        (flat.initial_state, flat.initial_output,
+         flat.initial_steps, flat.initial_transitions) = self.probe(self.run.snapshot(), '')
+        while self.unexplored:
+            state = self.unexplored.popleft()
+            snapshot = self.snapshots[state]
+            for char, code in flat.alphabet.items():
+                (flat.next_state[state][code], flat.output[state][code],
+                 flat.steps[state][code], flat.transitions[state][code]) = self.probe(snapshot, char)
+        return flat
+
+
+def _reads_attribute(sm: StateMachine, component: str, attribute: str) -> bool:
+    """Упоминают ли условия или действия машины атрибут component.attribute."""
+    pattern = re.compile(rf'\b{re.escape(component)}\.{re.escape(attribute)}\b')
+    return any(pattern.search(text)
+               for text in (*sm.compiled_conditions, *sm.compiled_actions))
+
+
+def flatten_reader_machine(sm: StateMachine, signals: list[str], alphabet: Iterable[str],
+                           max_states: int = 4096, probe_steps: int = 10_000) -> FlatReaderMachine:
+    """
+    Разворачивает машину с одним Reader в таблицы переходов по символам alphabet.
+    Состояния перебираются в ширину, пока их не больше max_states; переходы
+    в остальные, переходы дольше probe_steps шагов и переходы с ошибкой в
+    действиях помечаются UNSUPPORTED. Машина sm после этого сбрасывается
+    перед обычными запусками (StateMachine.reset).
+    """
+    # Алфавит упорядочен по кодам символов - так его ищет _walk_numpy
+    codes = {char: code for code, char in enumerate(sorted(set(alphabet)))}
+    return _Flattener(sm, signals, codes, max_states, probe_steps).flatten()
+
+
+def _walk_numpy(flat: FlatReaderMachine, messages: list[str]):
+    size = len(flat.alphabet)
+    # Столбец size - заполнитель для коротких сообщений: состояние не меняется;
+    # столбец size + 1 - символ вне алфавита: вход досчитывается обычным запуском
+    next_state = np.empty((flat.state_count, size + 2), dtype=np.int32)
+    next_state[:, :size] = flat.next_state
+    next_state[:, size] = np.arange(flat.state_count)
+    next_state[:, size + 1] = UNSUPPORTED
+    output = np.zeros((flat.state_count, size + 2), dtype=np.int32)
+    output[:, :size] = flat.output
+    steps_table = np.zeros((flat.state_count, size + 2), dtype=np.int64)
+    steps_table[:, :size] = flat.steps
+    transitions_table = np.zeros((flat.state_count, size + 2), dtype=np.int64)
+    transitions_table[:, :size] = flat.transitions
+
+    count = len(messages)
+    lengths = np.fromiter(map(len, messages), dtype=np.int64, count=count)
+    width = int(lengths.max(initial=0))
+    # Все сообщения одной строкой: коды символов -> номера в алфавите -> матрица count x width
+    text = np.frombuffer(''.join(messages).encode('utf-32-le'), dtype=np.uint32)
+    letters = np.array([ord(char) for char in flat.alphabet], dtype=np.uint32)
+    rows = np.repeat(np.arange(count), lengths)
+    columns = np.arange(len(text)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    chars = np.full((count, width), size, dtype=np.int32)
+    codes = np.minimum(np.searchsorted(letters, text), max(size - 1, 0))
+    known = letters[codes] == text if size else np.zeros(len(text), dtype=bool)
+    chars[rows, columns] = np.where(known, codes, size + 1)
+    state = np.full(count, flat.initial_state, dtype=np.int32)
+    steps = np.full(count, flat.initial_steps, dtype=np.int64)
+    transitions = np.full(count, flat.initial_transitions, dtype=np.int64)
+    outputs = np.empty((count, width), dtype=np.int32)
+    for column in range(width):
+        char = chars[:, column]
+        outputs[:, column] = output[state, char]
+        steps += steps_table[state, char]
+        transitions += transitions_table[state, char]
+        state = next_state[state, char]
+    # В Python переносятся только непустые выводы
+    message_outputs = [[] for _ in range(count)]
+    rows, columns = np.nonzero(outputs)
+    for row, value in zip(rows.tolist(), outputs[rows, columns].tolist()):
+        message_outputs[row].append(value)
+    return state.tolist(), message_outputs, steps.tolist(), transitions.tolist()
+
+
+def _walk_python(flat: FlatReaderMachine, messages: list[str]):
+    states, outputs, steps, transitions = [], [], [], []
+    for message in messages:
+        state = flat.initial_state
+        message_steps = flat.initial_steps
+        message_transitions = flat.initial_transitions
+        message_outputs = []
+        for char in message:
+            code = flat.alphabet.get(char)
+            if code is None:
+                state = UNSUPPORTED
+                break
+            output = flat.output[state][code]
+            if output:
+                message_outputs.append(output)
+            message_steps += flat.steps[state][code]
+            message_transitions += flat.transitions[state][code]
+            state = flat.next_state[state][code]
+        states.append(state)
+        outputs.append(message_outputs)
+        steps.append(message_steps)
+        transitions.append(message_transitions)
+    return states, outputs, steps, transitions
+
+
+def run_lockstep(
+    sm: StateMachine,
+    messages: list[str],
+    signals: list[str],
+    max_steps: int | None = None,
+    flat: FlatReaderMachine | None = None,
+    **flatten_options
+) -> list[StateMachineResult]:
+    """
+    Запускает машину с одним Reader на всех messages одновременно по таблицам
+    flat (по умолчанию - flatten_reader_machine по алфавиту messages).
+    Результаты совпадают с run_state_machine(..., trace='called', timeout_sec=None):
+    called_signals, steps, transitions, stop_reason; components пустой.
+    Входы, которые попали в UNSUPPORTED или превысили max_steps, досчитываются
+    обычным запуском. Без numpy таблицы обходятся в Python.
+
+    Выигрыш есть, когда состояний у таблиц немного (задачи 9 и 10 - десятки).
+    Если состояние машины растет вместе со входом (счетчик, условия на
+    Reader1.index), разворачивание упирается в max_states и обходится дороже
+    самих запусков: у задачи 11 это 4096 состояний, и lockstep медленнее
+    run_batch. Для таких машин лучше run_batch или меньший max_states.
+    """
+    if flat is None:
+        flat = flatten_reader_machine(sm, signals, ''.join(messages), **flatten_options)
+    walk = _walk_numpy if np is not None else _walk_python
+    states, outputs, steps, transitions = walk(flat, messages)
+    results: list[StateMachineResult | None] = []
+    fallback = []
+    for index, state in enumerate(states):
+        stop_reason = flat.end_stop[state]
+        total_steps = steps[index] + flat.end_steps[state]
+        # Граница как в run_steps: запуск ровно из max_steps шагов не упирается в лимит
+        if stop_reason is None or (max_steps is not None and total_steps > max_steps):
+            fallback.append(index)
+            results.append(None)
+            continue
+        called = list(flat.outputs[flat.initial_output])
+        for output in outputs[index]:
+            called.extend(flat.outputs[output])
+        called.extend(flat.outputs[flat.end_output[state]])
+        results.append(StateMachineResult(
+            stop_reason in LIMIT_STOP_REASONS, list(flat.outputs[flat.end_pending[state]]),
+            called, {}, stop_reason=stop_reason, steps=total_steps,
+            transitions=transitions[index] + flat.end_transitions[state]))
+    if fallback:
+        items = run_batch(sm, [{'message': messages[index]} for index in fallback], signals,
+                          timeout_sec=None, trace='called', max_steps=max_steps)
+        for item in items:
+            item.result.components = {}
+            results[fallback[item.index]] = item.result
+    return results
@@ -0,0 +1,60 @@
+"""Поиск зацикливания машины состояний по повтору конфигурации."""
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .cgml_signal import StateMachine
+
+
+class LoopDetector:
+    """
+    Запоминает конфигурации машины в точках покоя (после каждого шага).
+    Машина детерминирована, поэтому повтор конфигурации означает,
+    что дальше она будет бесконечно проходить тот же цикл.
+    Части конфигурации, не изменившиеся с прошлого шага (поле садовника,
+    очередь событий), хранятся одним объектом на все шаги.
+    """
+
+    def __init__(self, sm: 'StateMachine'):
+        self.sm = sm
+        self.seen: dict[tuple, int] = {}
+        self.configurations: list[tuple] = []
+        self.state_ids: list[str] = []
+        self.cycle: list[str] | None = None
+
+    def mark(self) -> int:
+        return len(self.configurations)
+
+    def rewind(self, mark: int):
+        """Забывает конфигурации, записанные после отметки mark."""
+        while len(self.configurations) > mark:
+            del self.seen[self.configurations.pop()]
+        del self.state_ids[mark:]
+        self.cycle = None
+
+    def check(self) -> bool:
+        """Возвращает True, если текущая конфигурация уже встречалась."""
+        configuration = self.sm.configuration()
+        if self.configurations:
+            configuration = _share_unchanged(configuration, self.configurations[-1])
+        first_seen = self.seen.get(configuration)
+        if first_seen is not None:
+            # Подряд идущие шаги в одном состоянии схлопываем
+            self.cycle = []
+            for state_id in self.state_ids[first_seen:]:
+                name = self.sm.state_name(state_id)
+                if not self.cycle or self.cycle[-1] != name:
+                    self.cycle.append(name)
+            return True
+        self.seen[configuration] = len(self.state_ids)
+        self.configurations.append(configuration)
+        self.state_ids.append(configuration[0])
+        return False
+
+
+def _share_unchanged(new, old):
+    """new, в котором части, равные частям old, заменены объектами из old."""
+    if new == old:
+        return old
+    if isinstance(new, tuple) and isinstance(old, tuple) and len(new) == len(old):
+        return tuple(_share_unchanged(part, old_part) for part, old_part in zip(new, old))
+    return new
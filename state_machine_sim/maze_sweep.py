@@ -0,0 +1,134 @@
+"""
+Прогон машины садовника по множеству лабиринтов.
+
+Лабиринт задается размером и seed: Gardener(N, M, with_walls=True, seed=seed)
+строит одно и то же поле при любом порядке и в любом процессе, поэтому
+прогон воспроизводится и делится между процессами так же, как
+run_batch_parallel: схема передается процессу один раз, задачам достаются
+хеш и порция seed.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from .cgml_signal import StateMachine, StateMachineRun
+from .cgml_types import CGMLStateMachine
+from .components import Gardener, GardenerCrashException
+from .parallel import get_worker_machine, init_worker, machine_snapshot, snapshot_hash
+
+
+@dataclass
+class MazeRun:
+    size: tuple[int, int]  # (N, M) - ширина и высота поля
+    seed: int
+    crashed: bool
+    coverage: float  # доля свободных клеток, где побывал садовник
+    steps: int
+    stop_reason: str | None  # None, если садовник разбился
+
+
+@dataclass
+class MazeStats:
+    runs: int = 0
+    crashes: int = 0
+    coverage_sum: float = 0.0
+    steps_sum: int = 0
+
+    @property
+    def crash_rate(self) -> float:
+        return self.crashes / self.runs if self.runs else 0.0
+
+    @property
+    def mean_coverage(self) -> float:
+        return self.coverage_sum / self.runs if self.runs else 0.0
+
+    @property
+    def mean_steps(self) -> float:
+        return self.steps_sum / self.runs if self.runs else 0.0
+
+    def add(self, run: MazeRun):
+        self.runs += 1
+        self.crashes += run.crashed
+        self.coverage_sum += run.coverage
+        self.steps_sum += run.steps
+
+
+@dataclass
+class SweepResult:
+    total: MazeStats = field(default_factory=MazeStats)
+    by_size: dict[tuple[int, int], MazeStats] = field(default_factory=dict)
+    runs: list[MazeRun] = field(default_factory=list)  # пустой, если keep_runs=False
+
+
+def run_maze(sm: StateMachine, size: tuple[int, int], seed: int, signals: list[str],
+             with_walls: bool = True, **run_options) -> MazeRun:
+    """Запускает собранную машину садовника в лабиринте size с полем по seed."""
+    gardener = Gardener(*size, with_walls=with_walls, seed=seed)
+    sm.reset({'gardener': gardener})
+    run = StateMachineRun(sm, signals, **run_options)
+    crashed = False
+    try:
+        run.stop_reason = run.run_steps()
+    except GardenerCrashException:
+        crashed = True
+    return MazeRun(size, seed, crashed, gardener.coverage(), run.steps,
+                   None if crashed else run.stop_reason)
+
+
+def _run_maze_chunk(key: str, size: tuple[int, int], seeds: range, signals: list[str],
+                    with_walls: bool, run_options: dict) -> list[MazeRun]:
+    sm = get_worker_machine(key, {'gardener': Gardener(*size)})
+    return [run_maze(sm, size, seed, signals, with_walls, **run_options) for seed in seeds]
+
+
+def sweep_mazes(
+    cgml_sm: CGMLStateMachine,
+    sizes: Iterable[tuple[int, int]],
+    count: int,
+    signals: list[str] | None = None,
+    base_seed: int = 0,
+    with_walls: bool = True,
+    workers: int | None = None,
+    chunk_size: int | None = None,
+    keep_runs: bool = False,
+    **run_options
+) -> SweepResult:
+    """
+    Запускает машину в count лабиринтах каждого размера из sizes
+    (seed от base_seed до base_seed + count - 1) в пуле из workers процессов
+    и собирает частоту аварий, покрытие и число шагов по размерам и в целом.
+    run_options передаются в StateMachineRun; без max_steps или timeout_sec
+    садовник, который ходит по кругу, не остановится.
+    """
+    sizes = [tuple(size) for size in sizes]
+    signals = signals if signals is not None else []
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, count * len(sizes) // (workers * 4))
+    snapshot = machine_snapshot(cgml_sm)
+    key = snapshot_hash(snapshot)
+    tasks = [
+        (size, range(base_seed + start, base_seed + min(start + chunk_size, count)))
+        for size in sizes
+        for start in range(0, count, chunk_size)
+    ]
+    result = SweepResult(by_size={size: MazeStats() for size in sizes})
+    with ProcessPoolExecutor(workers, initializer=init_worker,
+                             initargs=(key, snapshot)) as pool:
+        chunks = pool.map(
+            _run_maze_chunk,
+            [key] * len(tasks),
+            [size for size, _ in tasks],
+            [seeds for _, seeds in tasks],
+            [signals] * len(tasks),
+            [with_walls] * len(tasks),
+            [run_options] * len(tasks),
+        )
+        for chunk in chunks:
+            for run in chunk:
+                result.total.add(run)
+                result.by_size[run.size].add(run)
+                if keep_runs:
+                    result.runs.append(run)
+    return result
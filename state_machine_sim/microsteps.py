@@ -0,0 +1,163 @@
+"""
+Трассировка микрошагов машины: обработка события, переход к родителю
+(Q_SUPER), проверка условия, действие, выход и вход в состояние.
+
+Записи - четыре целых числа (вид, элемент, строка, значение) в заранее
+выделенном кольцевом буфере; строки и элементы хранятся как номера и
+расшифровываются только в records/to_text/to_json. Пока трассировщик не
+подключен (StateMachine.set_tracer), машина платит одну проверку на None.
+"""
+import json
+from array import array
+
+from .cgml_signal import Signal, StateMachine
+
+DISPATCH = 0  # element - активное состояние, text - событие
+SUPER = 1  # element - состояние, событие передается его родителю value
+GUARD = 2  # element - состояние, text - условие, value - результат
+ACTION = 3  # element - состояние, text - действия
+EXIT = 4
+ENTRY = 5
+
+KIND_NAMES = ('dispatch', 'super', 'guard', 'action', 'exit', 'entry')
+
+_FIELDS = 4
+_NONE = -1
+
+
+class MicrostepHooks:
+    """
+    Точки наблюдения за машиной. state - обработчик состояния (как в QHsm),
+    element - элемент машины, signal - Signal с условием, действием и id перехода.
+    """
+
+    def dispatch(self, state, event: str):
+        ...
+
+    def dispatch_done(self, result: int):
+        ...
+
+    def super_hop(self, state, parent):
+        ...
+
+    def guard(self, element, signal: Signal, passed: bool):
+        ...
+
+    def action(self, element, signal: Signal):
+        ...
+
+    def action_done(self, element, signal: Signal):
+        ...
+
+    def exit(self, state):
+        ...
+
+    def entry(self, state):
+        ...
+
+
+class MicrostepTracer(MicrostepHooks):
+    """Кольцевой буфер последних capacity микрошагов машины sm."""
+
+    def __init__(self, sm: StateMachine, capacity: int = 65536):
+        if capacity <= 0:
+            raise ValueError('Tracer capacity must be positive.')
+        self.sm = sm
+        self.capacity = capacity
+        self.records = array('q', bytes(8 * _FIELDS * capacity))
+        self.count = 0  # сколько записей сделано всего, в буфере - последние capacity
+        self.element_ids: list[str] = []
+        self.element_index: dict = {}
+        for element, element_id in sm.element_ids.items():
+            # Ключ - и сам элемент, и его обработчик: QHsm знает только обработчики
+            self.element_index[element] = self.element_index[element.execute_signal] = len(self.element_ids)
+            self.element_ids.append(element_id)
+        self.strings: list[str] = []
+        self.string_index: dict[str, int] = {}
+
+    def _string(self, text: str) -> int:
+        index = self.string_index.get(text)
+        if index is None:
+            index = self.string_index[text] = len(self.strings)
+            self.strings.append(text)
+        return index
+
+    def _record(self, kind: int, element, text: int, value: int):
+        base = (self.count % self.capacity) * _FIELDS
+        records = self.records
+        records[base] = kind
+        records[base + 1] = self.element_index.get(element, _NONE)
+        records[base + 2] = text
+        records[base + 3] = value
+        self.count += 1
+
+    def dispatch(self, state, event: str):
+        self._record(DISPATCH, state, self._string(event), 0)
+
+    def super_hop(self, state, parent):
+        self._record(SUPER, state, _NONE, self.element_index.get(parent, _NONE))
+
+    def guard(self, element, signal: Signal, passed: bool):
+        if signal.condition:
+            # Переходы без условия не пишем
+            self._record(GUARD, element, self._string(signal.condition), int(passed))
+
+    def action(self, element, signal: Signal):
+        self._record(ACTION, element, self._string(signal.action or ''), 0)
+
+    def exit(self, state):
+        self._record(EXIT, state, _NONE, 0)
+
+    def entry(self, state):
+        self._record(ENTRY, state, _NONE, 0)
+
+    def clear(self):
+        self.count = 0
+
+    def raw_records(self) -> list[tuple[int, int, int, int]]:
+        """Записи буфера от старых к новым, без расшифровки."""
+        start = max(0, self.count - self.capacity)
+        records = self.records
+        result = []
+        for number in range(start, self.count):
+            base = (number % self.capacity) * _FIELDS
+            result.append(tuple(records[base:base + _FIELDS]))
+        return result
+
+    def _element_name(self, index: int) -> str | None:
+        if index == _NONE:
+            return None
+        return self.sm.state_name(self.element_ids[index])
+
+    def records_as_dicts(self) -> list[dict]:
+        decoded = []
+        for kind, element, text, value in self.raw_records():
+            record = {'kind': KIND_NAMES[kind], 'state': self._element_name(element)}
+            if text != _NONE:
+                record['event' if kind == DISPATCH else 'text'] = self.strings[text]
+            if kind == SUPER:
+                record['parent'] = self._element_name(value)
+            elif kind == GUARD:
+                record['passed'] = bool(value)
+            decoded.append(record)
+        return decoded
+
+    def to_text(self) -> str:
+        lines = []
+        for record in self.records_as_dicts():
+            kind = record['kind']
+            if kind == 'dispatch':
+                lines.append(f"dispatch {record['event']} in {record['state']}")
+            elif kind == 'super':
+                lines.append(f"super {record['state']} -> {record['parent']}")
+            elif kind == 'guard':
+                lines.append(f"guard [{record['text']}] = {record['passed']} in {record['state']}")
+            elif kind == 'action':
+                action = ' '.join(record['text'].split())
+                lines.append(f"action {action} in {record['state']}")
+            else:
+                lines.append(f"{kind} {record['state']}")
+        return '\n'.join(lines)
+
+    def to_json(self) -> str:
+        return json.dumps(self.records_as_dicts(), ensure_ascii=False)
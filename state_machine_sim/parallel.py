@@ -0,0 +1,107 @@
+"""
+Запуск одной машины на множестве входов в пуле процессов.
+
+Схема передается каждому процессу один раз - в виде хеша и снимка
+(pickle CGMLStateMachine). Процесс собирает StateMachine при первом
+обращении и дальше переиспользует ее через run_batch; задачам достаются
+только хеш и порция входов.
+"""
+import hashlib
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator
+
+from .batch import BatchItem, run_batch
+from .cgml_signal import StateMachine, StateMachineResult
+from .cgml_types import CGMLStateMachine
+
+# Снимки схем и собранные машины в процессе-исполнителе, ключ - хеш снимка
+_worker_snapshots: dict[str, bytes] = {}
+_worker_machines: dict[str, StateMachine] = {}
+
+
+def machine_snapshot(cgml_sm: CGMLStateMachine) -> bytes:
+    """Снимок схемы для передачи в другой процесс."""
+    return pickle.dumps(cgml_sm, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def snapshot_hash(snapshot: bytes) -> str:
+    return hashlib.sha256(snapshot).hexdigest()
+
+
+def init_worker(key: str, snapshot: bytes):
+    """Инициализатор пула процессов: запоминает снимок схемы под ключом key."""
+    _worker_snapshots[key] = snapshot
+
+
+def get_worker_machine(key: str, sm_parameters: dict) -> StateMachine:
+    """Машина схемы key в процессе-исполнителе; собирается при первом обращении."""
+    sm = _worker_machines.get(key)
+    if sm is None:
+        cgml_sm = pickle.loads(_worker_snapshots[key])
+        sm = StateMachine(cgml_sm, sm_parameters)
+        _worker_machines[key] = sm
+    return sm
+
+
+def _detach_result(result: StateMachineResult) -> StateMachineResult:
+    # Живые компоненты остаются в процессе-исполнителе
+    result.components = {}
+    return result
+
+
+def _run_chunk(key: str, start: int, chunk: list[dict], signals: list[str],
+               run_options: dict) -> list[tuple[int, StateMachineResult]]:
+    sm = get_worker_machine(key, chunk[0])
+    return [
+        (start + item.index, _detach_result(item.result))
+        for item in run_batch(sm, chunk, signals, **run_options)
+    ]
+
+
+def run_batch_parallel(
+    cgml_sm: CGMLStateMachine,
+    sm_parameters: list[dict],
+    signals: list[str],
+    check: Callable[[StateMachineResult], bool] | None = None,
+    stop_on_first_failure: bool = False,
+    workers: int | None = None,
+    chunk_size: int | None = None,
+    **run_options
+) -> Iterator[BatchItem]:
+    """
+    Параллельный вариант run_batch. Входы делятся на порции по chunk_size
+    и раздаются workers процессам; результаты отдаются в порядке входов.
+
+    check(result) -> bool выполняется в вызывающем процессе; при
+    stop_on_first_failure обработка останавливается на первом непрошедшем
+    входе, а еще не начатые порции отменяются.
+
+    sm_parameters и run_options должны сериализоваться pickle (trace_sink -
+    функция уровня модуля). В результатах components пустой: объекты
+    компонентов не передаются между процессами.
+    """
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, len(sm_parameters) // (workers * 4))
+    snapshot = machine_snapshot(cgml_sm)
+    key = snapshot_hash(snapshot)
+    with ProcessPoolExecutor(workers, initializer=init_worker,
+                             initargs=(key, snapshot)) as pool:
+        futures = [
+            pool.submit(_run_chunk, key, start, sm_parameters[start:start + chunk_size],
+                        signals, run_options)
+            for start in range(0, len(sm_parameters), chunk_size)
+        ]
+        try:
+            for future in futures:
+                for index, result in future.result():
+                    passed = check(result) if check is not None else None
+                    yield BatchItem(index, result, passed)
+                    if stop_on_first_failure and passed is False:
+                        return
+        finally:
+            # Остановка или закрытый генератор: оставшиеся порции не нужны
+            for future in futures:
+                future.cancel()
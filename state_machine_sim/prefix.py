@@ -0,0 +1,211 @@
+"""
+Общий прогон сообщений Reader с одинаковыми префиксами.
+
+Сообщения складываются в префиксное дерево. Машина запускается один раз
+и идет по дереву в глубину: когда считыватель доходит до конца известного
+префикса (InputStarved), запуск откатывается к снимку перед этим шагом и
+продолжается отдельно для каждого следующего символа. Общие префиксы
+симулируются один раз. Цепочки без ветвлений проходятся целиком, без
+снимков; если общих символов меньше, чем точек ветвления, сообщения
+запускаются по отдельности.
+"""
+from dataclasses import dataclass, field
+
+from .cgml_signal import (
+    StateMachine, StateMachineResult, StateMachineRun, RunSnapshot, run_state_machine)
+from .components import InputStarved, Reader
+
+
+@dataclass
+class PrefixRunStats:
+    messages: int = 0
+    steps_executed: int = 0  # шаги общего прогона, включая откаченные
+    steps_separate: int = 0  # сумма шагов отдельных запусков тех же сообщений
+
+    @property
+    def steps_saved(self) -> int:
+        return self.steps_separate - self.steps_executed
+
+
+@dataclass
+class _TrieNode:
+    sample: str  # любое сообщение, проходящее через узел
+    children: dict[str, '_TrieNode'] = field(default_factory=dict)
+    ends: list[int] = field(default_factory=list)  # сообщения, которые кончаются здесь
+    subtree: list[int] = field(default_factory=list)  # все сообщения поддерева
+
+
+def build_prefix_trie(messages: list[str]) -> _TrieNode:
+    root = _TrieNode(messages[0] if messages else '')
+    for index, message in enumerate(messages):
+        node = root
+        node.subtree.append(index)
+        for char in message:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _TrieNode(message)
+            node = child
+            node.subtree.append(index)
+        node.ends.append(index)
+    return root
+
+
+def descend_chain(node: _TrieNode, depth: int) -> tuple[_TrieNode, int]:
+    """
+    Спускается по цепочке узлов с одним ребенком, где не кончается ни одно
+    сообщение: внутри цепочки ветвиться не нужно, и снимок там не берется.
+    """
+    while not node.ends and len(node.children) == 1:
+        node = next(iter(node.children.values()))
+        depth += 1
+    return node, depth
+
+
+def sharing_pays_off(root: _TrieNode) -> bool:
+    """
+    Окупается ли общий прогон: в каждой точке ветвления (и конце сообщения)
+    один шаг выполняется и откатывается, а каждый символ узла дерева
+    симулируется один раз вместо len(subtree) раз.
+    """
+    shared = branches = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node is not root:
+            shared += len(node.subtree) - 1
+        if node.ends or len(node.children) != 1:
+            branches += 1
+        stack.extend(node.children.values())
+    return shared > branches
+
+
+def find_reader(sm: StateMachine) -> Reader:
+    readers = [comp.obj for comp in sm.components.values() if isinstance(comp.obj, Reader)]
+    if len(readers) != 1:
+        raise ValueError('Prefix sharing needs a machine with exactly one Reader.')
+    return readers[0]
+
+
+def advance_until_starved(run: StateMachineRun, reader: Reader, stats: PrefixRunStats,
+             start: RunSnapshot, snapshot_every_step: bool = False) -> RunSnapshot | None:
+    """
+    Выполняет шаги, пока хватает входа. Возвращает снимок перед шагом,
+    которому не хватило символа, или None, если запуск остановился сам.
+    Снимок берется, только когда известные символы кончились; если шаг
+    прочитал несколько символов подряд и снимка нет, проход повторяется
+    от start со снимком на каждом шаге.
+    """
+    while True:
+        snapshot = None
+        if snapshot_every_step or not run.started or reader.index >= reader.available:
+            snapshot = run.snapshot()
+        steps_before = run.steps
+        try:
+            if not run.started:
+                run.start()
+                continue
+            stop_reason = run.run_steps(1)
+        except InputStarved:
+            stats.steps_executed += 1
+            if snapshot is None:
+                # Вход ветки подставлен после снимка start: restore его не откатывает
+                message, available = reader.message, reader.available
+                run.restore(start)
+                reader.message, reader.available = message, available
+                return advance_until_starved(run, reader, stats, start, snapshot_every_step=True)
+            run.restore(snapshot)
+            return snapshot
+        stats.steps_executed += run.steps - steps_before
+        if stop_reason is not None:
+            run.stop_reason = stop_reason
+            return None
+
+
+def _detach_result(run: StateMachineRun) -> StateMachineResult:
+    result = run.result()
+    # Трасса и компоненты продолжат меняться на других ветках дерева
+    result.called_signals = list(result.called_signals)
+    result.components = {}
+    return result
+
+
+def run_prefix_shared(
+    sm: StateMachine,
+    messages: list[str],
+    signals: list[str],
+    sm_parameters: dict | None = None,
+    **run_options
+) -> tuple[list[StateMachineResult], PrefixRunStats]:
+    """
+    Запускает машину с одним Reader на всех messages, симулируя общие
+    префиксы один раз. Результаты совпадают с отдельными запусками
+    run_state_machine (components в них пустой). sm_parameters - параметры
+    остальных компонентов. Ограничение timeout_sec общее на весь прогон,
+    для детерминированного ограничения на сообщение используйте max_steps.
+    Если общих префиксов почти нет (sharing_pays_off), сообщения
+    запускаются по отдельности.
+    """
+    if run_options.get('trace') == 'stream':
+        raise ValueError('Trace mode "stream" cannot be rewound for prefix sharing.')
+    stats = PrefixRunStats(messages=len(messages))
+    results: list[StateMachineResult | None] = [None] * len(messages)
+    if not messages:
+        return [], stats
+    sm.reset({**(sm_parameters or {}), 'message': ''})
+    reader = find_reader(sm)
+    root = build_prefix_trie(messages)
+    if not sharing_pays_off(root):
+        for index, message in enumerate(messages):
+            sm.reset({**(sm_parameters or {}), 'message': message})
+            result = run_state_machine(sm, signals, **run_options)
+            result.components = {}
+            results[index] = result
+            stats.steps_executed += result.steps
+        stats.steps_separate = stats.steps_executed
+        return results, stats
+
+    def finish(node: _TrieNode, snapshot: RunSnapshot):
+        for index in node.ends:
+            run.restore(snapshot)
+            reader.message = messages[index]
+            reader.available = None
+            steps_before = run.steps
+            run.stop_reason = run.run_steps()
+            stats.steps_executed += run.steps - steps_before
+            results[index] = _detach_result(run)
+
+    def share(node: _TrieNode):
+        result = _detach_result(run)
+        for index in node.subtree:
+            results[index] = result
+
+    run = StateMachineRun(sm, signals, start=False, **run_options)
+    root, depth = descend_chain(root, 0)
+    reader.message = root.sample
+    reader.available = depth
+    initial = run.snapshot()
+    root_snapshot = advance_until_starved(run, reader, stats, initial)
+    if root_snapshot is None:
+        share(root)
+    else:
+        finish(root, root_snapshot)
+        stack = [(root_snapshot, depth, iter(root.children.values()))]
+        while stack:
+            snapshot, depth, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                continue
+            child, child_depth = descend_chain(child, depth + 1)
+            run.restore(snapshot)
+            reader.message = child.sample
+            reader.available = child_depth
+            child_snapshot = advance_until_starved(run, reader, stats, snapshot)
+            if child_snapshot is None:
+                share(child)
+                continue
+            finish(child, child_snapshot)
+            stack.append((child_snapshot, child_depth, iter(child.children.values())))
+
+    stats.steps_separate = sum(result.steps for result in results)
+    return results, stats
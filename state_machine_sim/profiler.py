@@ -0,0 +1,150 @@
+"""
+Профилирование запуска по состояниям и переходам.
+
+Profiler подключается к машине как обработчик микрошагов
+(StateMachine.set_tracer) и собирает счетчики: сколько событий обработано
+в состоянии, сколько раз событие ушло к родителю (Q_SUPER), сколько
+проверено условий и сколько времени заняли обработка и действия.
+Результат выгружается в JSON или в формат collapsed stacks для flamegraph,
+где стек - путь состояния в иерархии.
+"""
+import json
+from dataclasses import dataclass, asdict
+from time import perf_counter_ns
+
+from .cgml_signal import Signal, StateMachine
+from .microsteps import MicrostepHooks
+
+
+@dataclass
+class StateProfile:
+    dispatches: int = 0  # событий обработано, пока состояние активно
+    super_hops: int = 0  # событий передано родителю
+    guard_evaluations: int = 0  # условий проверено в состоянии
+    actions: int = 0  # действий выполнено в состоянии
+    action_ns: int = 0  # время этих действий
+    dispatch_ns: int = 0  # время обработки событий, пока состояние активно
+    self_ns: int = 0  # dispatch_ns без времени действий
+
+
+@dataclass
+class TransitionProfile:
+    guard_evaluations: int = 0
+    guard_passes: int = 0
+    fired: int = 0  # сколько раз выполнены действия перехода
+    action_ns: int = 0
+
+
+class Profiler(MicrostepHooks):
+    """Счетчики по id состояний и переходов машины sm; копятся между запусками."""
+
+    def __init__(self, sm: StateMachine):
+        self.sm = sm
+        self._elements = {element_id: element for element, element_id in sm.element_ids.items()}
+        self.states: dict[str, StateProfile] = {}
+        self.transitions: dict[str, TransitionProfile] = {}
+        self._dispatch_state = None
+        self._dispatch_start = 0
+        self._dispatch_actions_ns = 0
+        self._action_start = 0
+
+    def _element_id(self, element) -> str:
+        # QHsm передает обработчики, State - сами элементы
+        element = getattr(element, '__self__', element)
+        return self.sm.element_ids[element]
+
+    def _state(self, element) -> StateProfile:
+        state_id = self._element_id(element)
+        profile = self.states.get(state_id)
+        if profile is None:
+            profile = self.states[state_id] = StateProfile()
+        return profile
+
+    def _transition(self, signal: Signal) -> TransitionProfile:
+        profile = self.transitions.get(signal.id)
+        if profile is None:
+            profile = self.transitions[signal.id] = TransitionProfile()
+        return profile
+
+    def dispatch(self, state, event: str):
+        self._state(state).dispatches += 1
+        self._dispatch_state = state
+        self._dispatch_actions_ns = 0
+        self._dispatch_start = perf_counter_ns()
+
+    def dispatch_done(self, result: int):
+        elapsed = perf_counter_ns() - self._dispatch_start
+        profile = self._state(self._dispatch_state)
+        profile.dispatch_ns += elapsed
+        profile.self_ns += elapsed - self._dispatch_actions_ns
+        self._dispatch_state = None
+
+    def super_hop(self, state, parent):
+        self._state(state).super_hops += 1
+
+    def guard(self, element, signal: Signal, passed: bool):
+        if not signal.condition:
+            return
+        self._state(element).guard_evaluations += 1
+        transition = self._transition(signal)
+        transition.guard_evaluations += 1
+        transition.guard_passes += passed
+
+    def action(self, element, signal: Signal):
+        self._action_start = perf_counter_ns()
+
+    def action_done(self, element, signal: Signal):
+        elapsed = perf_counter_ns() - self._action_start
+        profile = self._state(element)
+        profile.actions += 1
+        profile.action_ns += elapsed
+        transition = self._transition(signal)
+        transition.fired += 1
+        transition.action_ns += elapsed
+        if self._dispatch_state is not None:
+            self._dispatch_actions_ns += elapsed
+
+    def clear(self):
+        self.states.clear()
+        self.transitions.clear()
+
+    def state_path(self, state_id: str) -> list[str]:
+        """Имена состояний от верхнего уровня до state_id."""
+        chain = self.sm.qhsm.chain(self._elements[state_id].execute_signal)
+        return [self.sm.state_name(self._element_id(handler)) for handler in reversed(chain)]
+
+    def to_dict(self) -> dict:
+        return {
+            'states': {
+                state_id: {'name': self.sm.state_name(state_id), **asdict(profile)}
+                for state_id, profile in self.states.items()
+            },
+            'transitions': {
+                transition_id: asdict(profile)
+                for transition_id, profile in self.transitions.items()
+            },
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    def to_collapsed(self) -> str:
+        """
+        Строки 'Верхнее;Вложенное;Состояние мкс' для flamegraph.pl и speedscope.
+        Собственное время обработки - в кадре состояния, время действий - в
+        дочернем кадре [id перехода] состояния, где действие задано.
+        """
+        lines = []
+        for state_id, profile in self.states.items():
+            if profile.self_ns >= 1000:
+                lines.append(f"{';'.join(self.state_path(state_id))} {profile.self_ns // 1000}")
+        seen = set()
+        for state_id, signal in self.sm.iter_signals():
+            profile = self.transitions.get(signal.id)
+            # Варианты одного события с разными условиями делят id
+            if profile is None or profile.action_ns < 1000 or signal.id in seen:
+                continue
+            seen.add(signal.id)
+            path = ';'.join(self.state_path(state_id))
+            lines.append(f'{path};[{signal.id}] {profile.action_ns // 1000}')
+        return '\n'.join(lines)
@@ -2,8 +2,6 @@ from typing import Callable, Optional
 
 # qhsm.py
 
-Q_MAX_DEPTH = 8
-
 # Signals as string names
 QEP_EMPTY_SIG_ = "QEP_EMPTY_SIG"
 Q_ENTRY_SIG = "entry"
@@ -20,18 +18,60 @@ Q_RET_IGNORED = 3
 Q_RET_TRAN = 4
 
 
+Handler = Callable[["QHsm", str], int]
+
+
 class QHsm:
-    def __init__(self, initial: Optional[Callable[["QHsm", str], int]] = None):
+    def __init__(self, initial: Optional[Handler] = None):
+        # Состояние -> цепочка (состояние, родитель, ..., верхний уровень), см. set_hierarchy
+        self.chains: dict[Handler, tuple[Handler, ...]] = {}
+        # Обработчик микрошагов (microsteps.MicrostepHooks) или None
+        self.tracer = None
+        # Неглубокая история: history[i] - последнее активное прямое подсостояние
+        # составного состояния i; history_slots - состояние -> номер его родителя
+        self.history: list[Optional[Handler]] = []
+        self.history_slots: dict[Handler, int] = {}
         if initial is None:
             return
-        self.current_: Callable[["QHsm", str], int] = initial
-        self.effective_: Callable[["QHsm", str], int] = initial
-        self.target_: Optional[Callable[["QHsm", str], int]] = None
-
-    def post_init(self, initial: Callable[["QHsm", str], int]):
-        self.current_: Callable[["QHsm", str], int] = initial
-        self.effective_: Callable[["QHsm", str], int] = initial
-        self.target_: Optional[Callable[["QHsm", str], int]] = None
+        self.current_: Handler = initial
+        self.effective_: Handler = initial
+        self.target_: Optional[Handler] = None
+
+    def post_init(self, initial: Handler):
+        self.current_: Handler = initial
+        self.effective_: Handler = initial
+        self.target_: Optional[Handler] = None
+        self.history = [None] * len(self.history)
+
+    def set_history_slots(self, slots: dict[Handler, int], size: int):
+        """
+        Включает запись неглубокой истории: при выходе из состояния s оно
+        запоминается в history[slots[s]]. size - число составных состояний.
+        """
+        self.history_slots = slots
+        self.history = [None] * size
+
+    def set_hierarchy(self, parents: dict[Handler, Optional[Handler]]):
+        """
+        Предвычисляет цепочки предков по словарю состояние -> родитель
+        (None - верхний уровень). Глубина вложенности не ограничена;
+        do_transition ищет общего предка по цепочкам, не опрашивая обработчики.
+        """
+        chains = {}
+        for state in parents:
+            chain = [state]
+            parent = parents[state]
+            while parent is not None:
+                if len(chain) > len(parents):
+                    raise ValueError('State hierarchy contains a cycle.')
+                chain.append(parent)
+                parent = parents.get(parent)
+            chains[state] = tuple(chain)
+        self.chains = chains
+
+    def chain(self, state: Handler) -> tuple[Handler, ...]:
+        # Состояние вне иерархии считается состоянием верхнего уровня
+        return self.chains.get(state) or (state,)
 
 
 def QHsm_top(me: "QHsm", event: str) -> int:
@@ -46,57 +86,55 @@ standard_events = [
 ]
 
 
+def _exit_state(me: QHsm, state: Handler, tracer) -> None:
+    if tracer is not None:
+        tracer.exit(state)
+    slot = me.history_slots.get(state)
+    if slot is not None:
+        me.history[slot] = state
+    state(me, Q_EXIT_SIG)
+
+
 def do_transition(me: QHsm) -> None:
+    """
+    Выполняет переход из current_ в target_, заданный в состоянии effective_
+    (current_ или его предке): выход из состояний до общего предка и вход
+    от него до target_. Переход в себя выходит из состояния и входит снова,
+    переход во вложенное состояние из effective_ не выходит из effective_.
+    """
     source = me.current_
     effective = me.effective_
     target = me.target_
+    tracer = me.tracer
 
-    while source != effective:
-        source(me, standard_events[2])  # Q_EXIT_SIG
-        source(me, standard_events[0])  # QEP_EMPTY_SIG
-        source = me.effective_
-
-    if source == target:
-        source(me, standard_events[2])  # Q_EXIT_SIG
-        target(me, standard_events[1])  # Q_ENTRY_SIG
-        me.current_ = target
-        me.effective_ = target
-        me.target_ = None
-        return
-
-    path: list[Optional[Callable[[QHsm, str], int]]] = [None] * Q_MAX_DEPTH
-    top = 0
-    lca = -1
-
-    path[0] = target
-    while target != QHsm_top:
-        if target is not None:
-            target(me, standard_events[0])  # QEP_EMPTY_SIG
-            target = me.effective_
-            top += 1
-            path[top] = target
-            if target == source:
-                lca = top
-                break
-        else:
+    # Выход из вложенных состояний до состояния, где задан переход
+    for state in me.chain(source):
+        if state == effective:
             break
-
-    while lca == -1:
-        source(me, standard_events[2])  # Q_EXIT_SIG
-        source(me, standard_events[0])  # QEP_EMPTY_SIG
-        source = me.effective_
-        for i in range(top + 1):
-            if path[i] == source:
-                lca = i
+        _exit_state(me, state, tracer)
+
+    target_chain = me.chain(target)
+    if effective == target:
+        _exit_state(me, effective, tracer)
+        enter_from = 1
+    else:
+        # Предок target на глубине d - target_chain[len(target_chain) - 1 - d]
+        effective_chain = me.chain(effective)
+        offset = len(target_chain) - len(effective_chain)
+        enter_from = len(target_chain)
+        for index, state in enumerate(effective_chain):
+            position = offset + index
+            if 0 <= position and target_chain[position] == state and (
+                    position > 0 or index == 0):
+                # state - общий предок; target внутри effective - выхода нет
+                enter_from = position
                 break
+            _exit_state(me, state, tracer)
 
-    target = path[lca]
-    if lca == 0 and target is not None:
-        target(me, standard_events[1])  # Q_ENTRY_SIG
-    for i in range(lca - 1, -1, -1):
-        target = path[i]
-        if target is not None:
-            target(me, standard_events[1])  # Q_ENTRY_SIG
+    for index in range(enter_from - 1, -1, -1):
+        if tracer is not None:
+            tracer.entry(target_chain[index])
+        target_chain[index](me, Q_ENTRY_SIG)
 
     me.current_ = target
     me.effective_ = target
@@ -116,6 +154,8 @@ def QMsm_init(me: QHsm, event: str) -> None:
 
 
 def QMsm_dispatch(me: QHsm, event: str) -> int:
+    if me.tracer is not None:
+        return _traced_dispatch(me, event, me.tracer)
     result = me.current_(me, event)
     while result == Q_RET_SUPER:
         result = me.effective_(me, event)
@@ -126,6 +166,23 @@ def QMsm_dispatch(me: QHsm, event: str) -> int:
     return result
 
 
+def _traced_dispatch(me: QHsm, event: str, tracer) -> int:
+    """QMsm_dispatch с записью обработки и переходов к родителю в tracer."""
+    tracer.dispatch(me.current_, event)
+    handler = me.current_
+    result = handler(me, event)
+    while result == Q_RET_SUPER:
+        tracer.super_hop(handler, me.effective_)
+        handler = me.effective_
+        result = handler(me, event)
+    if result == Q_RET_TRAN:
+        do_transition(me)
+    elif result in (Q_RET_HANDLED, Q_RET_UNHANDLED, Q_RET_IGNORED):
+        me.effective_ = me.current_
+    tracer.dispatch_done(result)
+    return result
+
+
 def QMsm_simple_dispatch(me: QHsm, signal: str) -> int:
     return QMsm_dispatch(me, signal)
 
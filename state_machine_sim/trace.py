@@ -0,0 +1,137 @@
+"""Варианты записи трассы запуска: какие события хранить в StateMachineResult."""
+from collections import deque
+from typing import Callable, Iterable
+
+# sink(event, called): called=True для событий, вызванных пользователем
+TraceSink = Callable[[str, bool], None]
+
+TRACE_MODES = ('full', 'last', 'called', 'stream')
+
+
+class Trace:
+    """
+    Базовая трасса: хранит только вызванные события.
+    Вызванные события (called_signals) ограничены так же, как обработанные:
+    в режимах full и called они хранятся целиком - по ним проверяют решения,
+    в last - последние size, в stream - только отдаются в sink.
+    """
+
+    def __init__(self):
+        self.called_signals: list[str] = []
+
+    def dispatched(self, event: str):
+        ...
+
+    def called(self, event: str):
+        self.called_signals.append(event)
+
+    def signals(self, pending: Iterable[str]) -> list[str]:
+        """Список signals для результата; pending - необработанный остаток очереди."""
+        return list(pending)
+
+    def called_result(self) -> list[str]:
+        """Список called_signals для результата."""
+        return self.called_signals
+
+    def mark(self):
+        """Отметка для rewind: списки только растут, поэтому хватает их длин."""
+        return len(self.called_signals)
+
+    def rewind(self, mark):
+        """Откатывает трассу к отметке mark (см. StateMachineRun.restore)."""
+        del self.called_signals[mark:]
+
+
+class FullTrace(Trace):
+    """Все обработанные события."""
+
+    def __init__(self):
+        super().__init__()
+        self.history: list[str] = []
+
+    def dispatched(self, event: str):
+        self.history.append(event)
+
+    def signals(self, pending: Iterable[str]) -> list[str]:
+        return self.history + list(pending)
+
+    def mark(self):
+        return len(self.history), len(self.called_signals)
+
+    def rewind(self, mark):
+        history_len, called_len = mark
+        del self.history[history_len:]
+        del self.called_signals[called_len:]
+
+
+class LastTrace(Trace):
+    """Хранит только последние size обработанных и последние size вызванных событий."""
+
+    def __init__(self, size: int):
+        super().__init__()
+        self.history: deque[str] = deque(maxlen=size)
+        self.called_signals: deque[str] = deque(maxlen=size)
+
+    def dispatched(self, event: str):
+        self.history.append(event)
+
+    def signals(self, pending: Iterable[str]) -> list[str]:
+        tail = deque(self.history, maxlen=self.history.maxlen)
+        tail.extend(pending)
+        return list(tail)
+
+    def called_result(self) -> list[str]:
+        return list(self.called_signals)
+
+    def mark(self):
+        # Кольцевые буферы ограничены по размеру, их дешево скопировать
+        return tuple(self.history), tuple(self.called_signals)
+
+    def rewind(self, mark):
+        history, called = mark
+        self.history.clear()
+        self.history.extend(history)
+        self.called_signals.clear()
+        self.called_signals.extend(called)
+
+
+class CalledTrace(Trace):
+    """Хранит только вызванные события."""
+
+
+class StreamTrace(Trace):
+    """
+    Отдает каждое событие в sink и ничего не хранит: called_signals
+    результата пустой. При откате уже отданные в sink события не отзываются.
+    """
+
+    def __init__(self, sink: TraceSink):
+        super().__init__()
+        self.sink = sink
+
+    def dispatched(self, event: str):
+        self.sink(event, False)
+
+    def called(self, event: str):
+        self.sink(event, True)
+
+
+def make_trace(mode: str = 'full', size: int = 1000, sink: TraceSink | None = None) -> Trace:
+    """
+    Создает трассу по названию режима:
+    full - все события, last - последние size событий,
+    called - только вызванные, stream - передавать события в sink.
+    """
+    if mode == 'full':
+        return FullTrace()
+    if mode == 'last':
+        if size <= 0:
+            raise ValueError('Trace size must be positive.')
+        return LastTrace(size)
+    if mode == 'called':
+        return CalledTrace()
+    if mode == 'stream':
+        if sink is None:
+            raise ValueError('Trace mode "stream" requires a sink.')
+        return StreamTrace(sink)
+    raise ValueError(f'Unknown trace mode: {mode}. Expected one of {TRACE_MODES}.')
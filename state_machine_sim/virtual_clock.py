@@ -0,0 +1,65 @@
+"""Виртуальное время запуска: таймеры компонентов без реального ожидания."""
+import heapq
+
+
+class VirtualClock:
+    """
+    Дискретные часы в миллисекундах. Таймеры лежат в куче (срок, номер, событие);
+    когда очередь событий пуста, время перескакивает к ближайшему сроку
+    (см. EventLoop.get_event). Номер сохраняет порядок таймеров с одним сроком
+    и служит ручкой для cancel.
+    """
+
+    def __init__(self):
+        self.now = 0
+        self.timers: list[tuple[int, int, str]] = []
+        self.next_id = 0
+        self.cancelled: set[int] = set()
+
+    def schedule(self, delay: int, event: str) -> int:
+        """Ставит event через delay мс. Возвращает ручку таймера."""
+        if delay < 0:
+            raise ValueError('Timer delay must not be negative.')
+        timer_id = self.next_id
+        self.next_id += 1
+        heapq.heappush(self.timers, (self.now + delay, timer_id, event))
+        return timer_id
+
+    def cancel(self, timer_id: int):
+        # Отмененный таймер остается в куче и пропускается при срабатывании
+        self.cancelled.add(timer_id)
+
+    def pop_due(self) -> str | None:
+        """Переводит время на ближайший срок и возвращает событие таймера."""
+        while self.timers:
+            deadline, timer_id, event = heapq.heappop(self.timers)
+            if timer_id in self.cancelled:
+                self.cancelled.discard(timer_id)
+                continue
+            self.now = deadline
+            return event
+        return None
+
+    def peek_due(self) -> str | None:
+        """Событие ближайшего таймера без перевода времени."""
+        for deadline, timer_id, event in sorted(self.timers):
+            if timer_id not in self.cancelled:
+                return event
+        return None
+
+    def pending(self) -> tuple[tuple[int, str], ...]:
+        """Оставшиеся таймеры относительно текущего времени - для конфигурации машины."""
+        return tuple(
+            (deadline - self.now, event)
+            for deadline, timer_id, event in sorted(self.timers)
+            if timer_id not in self.cancelled
+        )
+
+    def snapshot(self) -> tuple:
+        return self.now, tuple(self.timers), self.next_id, frozenset(self.cancelled)
+
+    def restore(self, snapshot: tuple):
+        self.now, timers, self.next_id, cancelled = snapshot
+        # Кортеж кучи остается кучей
+        self.timers = list(timers)
+        self.cancelled = set(cancelled)
@@ -0,0 +1,18 @@
+"""Общие помощники тестов: загрузка схем из каталога tests."""
+import os
+
+from state_machine_sim.cgml_types import CGMLStateMachine
+from state_machine_sim.simple_parser import CGMLParser
+
+TESTS_DIR = os.path.dirname(__file__)
+
+
+def parse_cgml_sm(xml: str) -> CGMLStateMachine:
+    """Первая машина состояний из текста схемы."""
+    return list(CGMLParser().parse_cgml(xml).state_machines.values())[0]
+
+
+def load_cgml_sm(name: str = "from_ide.graphml") -> CGMLStateMachine:
+    """Первая машина состояний из файла схемы name в каталоге tests."""
+    with open(os.path.join(TESTS_DIR, name), encoding="utf-8") as f:
+        return parse_cgml_sm(f.read())
@@ -0,0 +1,125 @@
+import pytest
+
+from state_machine_sim.cgml_signal import StateMachine, _split_arguments, run_state_machine
+from tests.helpers import parse_cgml_sm
+
+# Сумма цифр сообщения: аргумент Counter1.add - символ, прочитанный Reader1
+DIGIT_SUM_GRAPHML = '''<?xml version="1.0" encoding="UTF-8"?>
+<graphml xmlns="http://graphml.graphdrawing.org/xmlns">
+  <data key="gFormat">Cyberiada-GraphML-1.0</data>
+  <key attr.name="name" attr.type="string" for="node" id="dName"></key>
+  <key attr.name="data" attr.type="string" for="node" id="dData"></key>
+  <key attr.name="data" attr.type="string" for="edge" id="dData"></key>
+  <graph id="Machine1">
+    <data key="dStateMachine"></data>
+    <node id="coreMeta"><data key="dNote">formal</data><data key="dName">CGML_META</data>
+      <data key="dData">platform/ junior-reader
+
+standardVersion/ 1.0
+
+</data></node>
+    <node id="sum"><data key="dName">Счет</data>
+      <data key="dData">entry/
+Counter1.clear()
+Reader1.read()
+
+Reader1.char_accepted/
+Counter1.add(Reader1.current_char)
+Reader1.read()
+
+Reader1.line_finished[Counter1.value &gt; 10]/
+Impulse1.impulseA()
+
+</data></node>
+    <node id="init"><data key="dVertex">initial</data></node>
+    <node id="cReader1"><data key="dNote">formal</data><data key="dName">CGML_COMPONENT</data>
+      <data key="dData">id/ Reader1
+
+type/ Reader
+
+</data></node>
+    <node id="cCounter1"><data key="dNote">formal</data><data key="dName">CGML_COMPONENT</data>
+      <data key="dData">id/ Counter1
+
+type/ Counter
+
+</data></node>
+    <node id="cImpulse1"><data key="dNote">formal</data><data key="dName">CGML_COMPONENT</data>
+      <data key="dData">id/ Impulse1
+
+type/ Impulse
+
+</data></node>
+    <edge id="e0" source="init" target="sum"></edge>
+  </graph>
+</graphml>'''
+
+
+def digit_sum_machine(message=''):
+    cgml_sm = parse_cgml_sm(DIGIT_SUM_GRAPHML)
+    return StateMachine(cgml_sm, {'message': message})
+
+
+@pytest.mark.parametrize('message, called', [
+    ('', []),
+    ('55', []),
+    ('974', ['impulseA']),
+])
+def test_attribute_argument_is_read_on_call(message, called):
+    sm = digit_sum_machine(message)
+    result = run_state_machine(sm, [], None)
+    assert sm.components['Counter1'].obj.value == sum(map(int, message))
+    assert result.called_signals == called
+
+
+@pytest.mark.parametrize('arg, expected', [
+    ('5', 5),
+    ('-3', -3),
+    ('2.5', 2.5),
+    ('"текст"', 'текст'),
+    ("'1'", '1'),
+    ('текст', 'текст'),
+])
+def test_literal_arguments_are_typed(arg, expected):
+    is_constant, value = digit_sum_machine()._compile_argument(arg)
+    assert is_constant
+    assert value == expected and type(value) is type(expected)
+
+
+def test_constant_arguments_compile_to_partial():
+    sm = digit_sum_machine()
+    counter = sm.components['Counter1'].obj
+    [call] = sm.compile_action('Counter1.sub(2)')
+    assert call.func == counter.sub and call.args == (2,)
+    sm.intepreter_action('Counter1.sub(2)')
+    assert counter.value == -2
+
+
+@pytest.mark.parametrize('args, expected', [
+    ('1, 2', ['1', '2']),
+    ('"а, б", 3', ['"а, б"', '3']),
+    ("',' ,\"'\"", ["','", '"\'"']),
+])
+def test_quoted_commas_do_not_split_arguments(args, expected):
+    assert _split_arguments(args) == expected
+    [call] = digit_sum_machine().compile_action(f'Counter1.set({args})')
+    assert len(call.args) == len(expected)
+
+
+@pytest.mark.parametrize('action, value', [
+    ('Counter1.add(3)', 3),
+    ('Counter1.add("4")', 4),
+    ('Counter1.set(2.0)', 2),
+])
+def test_counter_takes_integers(action, value):
+    sm = digit_sum_machine()
+    sm.intepreter_action(action)
+    assert sm.components['Counter1'].obj.value == value
+
+
+@pytest.mark.parametrize('action', ['Counter1.add(2.5)', 'Counter1.set("2.5")'])
+def test_counter_rejects_fractions(action):
+    sm = digit_sum_machine()
+    with pytest.raises(ValueError):
+        sm.intepreter_action(action)
+    assert sm.components['Counter1'].obj.value == 0
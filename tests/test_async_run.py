@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from state_machine_sim.cgml_signal import (
+    StateMachine,
+    run_state_machine,
+    run_state_machine_async,
+    STOP_FINISHED,
+    STOP_TIMEOUT,
+)
+from state_machine_sim.components import Timer
+from state_machine_sim.event_loop import EventLoop
+from tests.helpers import load_cgml_sm
+
+
+def test_async_sessions_match_sync_runs():
+    cgml_sm = load_cgml_sm("from_ide.graphml")
+    messages = ['АБВГ' * i for i in range(1, 40)]
+    expected = [
+        run_state_machine(StateMachine(cgml_sm, {'message': m}), [], 10).called_signals
+        for m in messages
+    ]
+
+    async def main():
+        return await asyncio.gather(*(
+            run_state_machine_async(
+                StateMachine(cgml_sm, {'message': m}), [], 10, yield_every=4)
+            for m in messages
+        ))
+
+    results = asyncio.run(main())
+    assert [r.called_signals for r in results] == expected
+    assert all(r.stop_reason == STOP_FINISHED for r in results)
+
+
+def test_async_timeout_stops_endless_machine():
+    sm = StateMachine(load_cgml_sm("PingPong.graphml"), {})
+    result = asyncio.run(run_state_machine_async(sm, [], 0.05))
+    assert result.stop_reason == STOP_TIMEOUT
+    assert result.timeout
+
+
+def test_async_timer_is_awaited():
+    # Таймер Blinker ждет 1000 мс: до таймаута запуск не должен считаться законченным
+    sm = StateMachine(load_cgml_sm("CyberiadaFormat-Blinker.graphml"), {})
+    result = asyncio.run(run_state_machine_async(sm, [], 0.05))
+    assert result.stop_reason == STOP_TIMEOUT
+    assert 'Timer1.timeout' not in result.signals
+
+
+def test_async_run_can_be_cancelled():
+    sm = StateMachine(load_cgml_sm("PingPong.graphml"), {})
+
+    async def main():
+        task = asyncio.ensure_future(run_state_machine_async(sm, [], None))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await task
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(main())
+
+
+def test_async_timer_restart_and_stop_cancel_pending_wait():
+    loop = EventLoop()
+    loop.asynchronous = True
+    timer = Timer('Timer1')
+    timer.event_loop = loop
+
+    async def main():
+        first = timer.start(10)
+        # Перезапуск: прежнее ожидание не должно сработать
+        second = timer.start(30)
+        await asyncio.sleep(0.05)
+        assert first.cancelled()
+        assert loop.pending() == ('Timer1.timeout',)
+        loop.get_event()
+        timer.start(10)
+        timer.stop()
+        await asyncio.sleep(0.03)
+        return second
+
+    assert not asyncio.run(main()).cancelled()
+    assert loop.pending() == ()
+    assert timer.task is None
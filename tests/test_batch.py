@@ -0,0 +1,27 @@
+from state_machine_sim.batch import run_batch
+from state_machine_sim.cgml_signal import StateMachine, run_state_machine
+from tests.helpers import load_cgml_sm
+
+
+def test_batch_matches_fresh_machines():
+    cgml_sm = load_cgml_sm()
+    messages = ['АААБББАВС', 'БББ', '', 'АБВГДА' * 20]
+    expected = [
+        run_state_machine(StateMachine(cgml_sm, {'message': m}), [], 10).called_signals
+        for m in messages
+    ]
+    sm = StateMachine(cgml_sm, {'message': ''})
+    items = list(run_batch(sm, [{'message': m} for m in messages], [], timeout_sec=10))
+    assert [item.index for item in items] == list(range(len(messages)))
+    assert [item.result.called_signals for item in items] == expected
+
+
+def test_batch_stops_on_first_failure():
+    sm = StateMachine(load_cgml_sm(), {'message': ''})
+    parameters = [{'message': m} for m in ('А', 'Б', 'А')]
+    items = list(run_batch(
+        sm, parameters, [],
+        check=lambda result: result.called_signals == ['impulseA'],
+        stop_on_first_failure=True,
+    ))
+    assert [item.passed for item in items] == [True, False]
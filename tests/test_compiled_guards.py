@@ -0,0 +1,58 @@
+import pytest
+
+from state_machine_sim.cgml_signal import StateMachine
+from state_machine_sim.components import Gardener
+from tests.helpers import load_cgml_sm
+
+
+@pytest.mark.parametrize('condition, expected', [
+    ('', True),
+    ('3 > 2', True),
+    ('2.5 >= 3', False),
+    ('Reader1.current_char == Б', True),
+    ('Reader1.current_char != Б', False),
+    ('Reader1.index <= 1', True),
+    ('Unknown1.value == 0', False),
+    ('а == а', True),
+    ('просто текст', True),
+])
+def test_conditions_match_interpretation(condition, expected):
+    sm = StateMachine(load_cgml_sm('from_ide.graphml'), {'message': 'Б'})
+    sm.components['Reader1'].obj.read()
+    assert sm.compile_condition(condition)() is expected
+    assert sm.intepreter_condition(condition) is expected
+
+
+@pytest.mark.parametrize('condition', [
+    'Reader1.missing == 0',
+    'Reader1.message == А',
+])
+def test_undeclared_attribute_is_rejected(condition):
+    sm = StateMachine(load_cgml_sm('from_ide.graphml'), {'message': 'Б'})
+    with pytest.raises(ValueError):
+        sm.compile_condition(condition)
+
+
+def test_gardener_guards_read_live_values():
+    gardener = Gardener(3, 3)
+    sm = StateMachine(load_cgml_sm('GardenerWalker.graphml'), {'gardener': gardener})
+    sensor = sm.components['Sensor1'].obj
+    wall_ahead = sm.compile_condition('Sensor1.wall_straight == 1')
+    sensor.search_walls()
+    # Садовник в углу смотрит на юг: впереди свободно
+    assert not wall_ahead()
+    gardener.orientation = gardener.NORTH
+    sensor.search_walls()
+    assert wall_ahead()
+    # После reset условие читает атрибуты с новым садовником
+    planted = Gardener(3, 3)
+    planted.plant(planted.ROSE)
+    sm.reset({'gardener': planted})
+    assert sm.compile_condition('Sensor1.flower == Sensor1.rose')()
+
+
+def test_constant_attributes_are_folded():
+    sm = StateMachine(load_cgml_sm('GardenerWalker.graphml'), {'gardener': Gardener(3, 3)})
+    guard = sm.compile_condition('Sensor1.rose == 1')
+    assert guard.func.__name__ == '_constant'
+    assert guard()
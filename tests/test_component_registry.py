@@ -0,0 +1,90 @@
+import os
+import subprocess
+import sys
+from importlib.metadata import EntryPoint
+
+import pytest
+
+from state_machine_sim.cgml_signal import StateMachine, run_state_machine
+from state_machine_sim.components import Counter
+from state_machine_sim.components import registry
+from tests.helpers import TESTS_DIR, load_cgml_sm, parse_cgml_sm
+from tests.test_deep_hierarchy import deep_graphml
+
+
+@pytest.fixture
+def clean_registry(monkeypatch):
+    monkeypatch.setattr(registry, '_targets', dict(registry._targets))
+    monkeypatch.setattr(registry, '_classes', {})
+    monkeypatch.setattr(registry, '_entry_points_loaded', False)
+
+
+def test_only_used_components_are_imported():
+    code = (
+        "import sys\n"
+        "from state_machine_sim.cgml_signal import StateMachine\n"
+        "from state_machine_sim.simple_parser import CGMLParser\n"
+        f"xml = open({os.path.join(TESTS_DIR, 'TestImpulse.graphml')!r}, encoding='utf-8').read()\n"
+        "cgml_sm = list(CGMLParser().parse_cgml(xml).state_machines.values())[0]\n"
+        "StateMachine(cgml_sm, {})\n"
+        "print(sorted(m.rsplit('.', 1)[1] for m in sys.modules"
+        " if m.startswith('state_machine_sim.components.')))\n"
+    )
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                            check=True, cwd=os.path.join(TESTS_DIR, '..')).stdout
+    assert output.strip() == "['base', 'impulse', 'registry']"
+
+
+def test_register_custom_component(clean_registry):
+    class DoubleCounter(Counter):
+        actions = ('add',)
+
+        def add(self):
+            self.value += 2
+
+    registry.register_component('DoubleCounter', DoubleCounter)
+    with pytest.raises(ValueError):
+        registry.register_component('DoubleCounter', DoubleCounter)
+    assert 'DoubleCounter' in registry.component_types()
+    xml = deep_graphml(3).replace('type/ Counter', 'type/ DoubleCounter')
+    cgml_sm = parse_cgml_sm(xml)
+    sm = StateMachine(cgml_sm, {})
+    run_state_machine(sm, [], None)
+    assert sm.components['Counter1'].obj.value == 6
+
+
+def test_entry_point_components_are_loaded_lazily(clean_registry, monkeypatch):
+    entry_point = EntryPoint(name='PluginCounter',
+                             value='state_machine_sim.components.counter:Counter',
+                             group=registry.ENTRY_POINT_GROUP)
+    monkeypatch.setattr(registry, 'entry_points', lambda group: [entry_point])
+    assert registry.component_class('PluginCounter') is Counter
+    with pytest.raises(ValueError):
+        registry.component_class('NoSuchComponent')
+
+
+def test_undeclared_action_fails_when_executed():
+    cgml_sm = load_cgml_sm()
+    sm = StateMachine(cgml_sm, {'message': 'А'})
+    calls = sm.compile_action('Reader1.reset()')
+    with pytest.raises(ValueError):
+        calls[0]()
+    # Действия неизвестных компонентов пропускаются, как раньше
+    assert sm.compile_action('Unknown1.read()') == []
+    assert run_state_machine(sm, [], None).stop_reason == 'finished'
+
+
+def test_declared_events():
+    reader = registry.component_class('Reader')
+    assert reader.event_names('Reader1') == ('Reader1.char_accepted', 'Reader1.line_finished')
+    assert registry.component_class('Impulse').event_names('Impulse1') == (
+        'impulseA', 'impulseB', 'impulseC')
+
+
+def test_undeclared_event_is_rejected_when_built():
+    with open(os.path.join(TESTS_DIR, 'ReaderIndex.graphml'), encoding='utf-8') as f:
+        xml = f.read().replace('Reader1.char_accepted', 'Reader1.char_read')
+    with pytest.raises(ValueError):
+        StateMachine(parse_cgml_sm(xml), {'message': 'А'})
+    # События Impulse общие, триггеры с префиксом не проверяются
+    StateMachine(load_cgml_sm('TestImpulse.graphml'), {})
@@ -0,0 +1,45 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from state_machine_sim.cgml_signal import StateMachine, run_state_machine
+from state_machine_sim.event_loop import EventLoop, current_event_loop
+from tests.helpers import load_cgml_sm
+
+
+def run_trace(cgml_sm, message):
+    result = run_state_machine(StateMachine(cgml_sm, {'message': message}), [], 10)
+    return list(result.signals), list(result.called_signals)
+
+
+def test_static_api_uses_current_loop():
+    loop = EventLoop()
+    with loop.activate():
+        EventLoop.add_event('impulseA', True)
+        assert current_event_loop() is loop
+    assert loop.events == ['impulseA']
+    assert loop.called_events == ['impulseA']
+    assert current_event_loop() is not loop
+
+
+def test_static_event_lists_read_current_loop():
+    loop = EventLoop()
+    with loop.activate():
+        EventLoop.add_event('impulseA', True)
+        EventLoop.add_event('impulseB')
+        assert EventLoop.events == ['impulseA', 'impulseB']
+        assert EventLoop.called_events == ['impulseA']
+    assert isinstance(EventLoop.events, list)
+
+
+def test_machines_run_concurrently_in_threads():
+    cgml_sm = load_cgml_sm()
+    rnd = random.Random(0)
+    messages = [
+        ''.join(rnd.choice('АБВГ') for _ in range(rnd.randint(1, 300)))
+        for _ in range(64)
+    ]
+    expected = [run_trace(cgml_sm, message) for message in messages]
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        traces = list(pool.map(lambda m: run_trace(cgml_sm, m), messages))
+    assert traces == expected
@@ -0,0 +1,110 @@
+from state_machine_sim.cgml_signal import StateMachine, run_state_machine
+from state_machine_sim.qhsm import (
+    QHsm, QMsm_dispatch, Q_HANDLED, Q_SUPER, Q_TRAN, Q_UNHANDLED, Q_RET_TRAN,
+)
+from tests.helpers import parse_cgml_sm
+
+DEPTH = 64
+
+
+def make_chain(depth, log):
+    """Цепочка вложенных состояний s0 > s1 > ... и состояние other верхнего уровня."""
+    transitions = {}
+    handlers = {}
+
+    def make_handler(name, parent):
+        def handler(me, event):
+            if event in ('entry', 'exit'):
+                log.append((event, name))
+                return Q_HANDLED()
+            target = transitions.get((name, event))
+            if target is not None:
+                return Q_TRAN(me, handlers[target])
+            if parent is not None:
+                return Q_SUPER(me, handlers[parent])
+            return Q_UNHANDLED()
+        return handler
+
+    parents = {'other': None, 's0': None}
+    for level in range(1, depth):
+        parents[f's{level}'] = f's{level - 1}'
+    for name, parent in parents.items():
+        handlers[name] = make_handler(name, parent)
+    qhsm = QHsm(handlers[f's{depth - 1}'])
+    qhsm.set_hierarchy({handlers[name]: handlers[parent] if parent else None
+                        for name, parent in parents.items()})
+    return qhsm, handlers, transitions
+
+
+def test_transition_out_of_deep_state_exits_every_level():
+    log = []
+    qhsm, handlers, transitions = make_chain(DEPTH, log)
+    transitions[('s0', 'go')] = 'other'
+    assert QMsm_dispatch(qhsm, 'go') == Q_RET_TRAN
+    assert log == [('exit', f's{level}') for level in range(DEPTH - 1, -1, -1)] + [('entry', 'other')]
+    assert qhsm.current_ == handlers['other']
+
+
+def test_transition_into_deep_state_enters_every_level():
+    log = []
+    qhsm, handlers, transitions = make_chain(DEPTH, log)
+    qhsm.post_init(handlers['other'])
+    transitions[('other', 'go')] = f's{DEPTH - 1}'
+    QMsm_dispatch(qhsm, 'go')
+    assert log == [('exit', 'other')] + [('entry', f's{level}') for level in range(DEPTH)]
+
+
+def test_transition_between_siblings_stops_at_common_ancestor():
+    log = []
+    qhsm, handlers, transitions = make_chain(DEPTH, log)
+    # Из самого глубокого состояния в его предка на уровне 10: внешний переход
+    transitions[(f's{DEPTH - 1}', 'up')] = 's10'
+    QMsm_dispatch(qhsm, 'up')
+    assert log == ([('exit', f's{level}') for level in range(DEPTH - 1, 9, -1)]
+                   + [('entry', 's10')])
+    assert qhsm.current_ == handlers['s10']
+
+
+def deep_graphml(depth):
+    def state(level):
+        inner = state(level + 1) if level + 1 < depth else ''
+        graph = f'<graph id="n{level}:">{inner}</graph>' if inner else ''
+        return (f'<node id="n{level}"><data key="dName">S{level}</data>'
+                f'<data key="dData">entry/\nCounter1.add()\n\n</data>{graph}</node>')
+
+    return f'''<?xml version="1.0" encoding="UTF-8"?>
+<graphml xmlns="http://graphml.graphdrawing.org/xmlns">
+  <data key="gFormat">Cyberiada-GraphML-1.0</data>
+  <key attr.name="name" attr.type="string" for="node" id="dName"></key>
+  <key attr.name="data" attr.type="string" for="node" id="dData"></key>
+  <key attr.name="data" attr.type="string" for="edge" id="dData"></key>
+  <graph id="Machine1">
+    <data key="dStateMachine"></data>
+    <node id="coreMeta"><data key="dNote">formal</data><data key="dName">CGML_META</data>
+      <data key="dData">platform/ junior-reader
+
+standardVersion/ 1.0
+
+</data></node>
+    {state(0)}
+    <node id="init"><data key="dVertex">initial</data></node>
+    <node id="cCounter1"><data key="dNote">formal</data><data key="dName">CGML_COMPONENT</data>
+      <data key="dData">id/ Counter1
+
+type/ Counter
+
+</data></node>
+    <edge id="e0" source="init" target="n{depth - 1}"></edge>
+  </graph>
+</graphml>'''
+
+
+def test_machine_with_deep_nesting_enters_all_levels():
+    xml = deep_graphml(DEPTH)
+    cgml_sm = parse_cgml_sm(xml)
+    sm = StateMachine(cgml_sm, {})
+    assert len(sm.qhsm.chain(sm.states[f'n{DEPTH - 1}'].execute_signal)) == DEPTH
+    run_state_machine(sm, [], None)
+    assert sm.current_state_id() == f'n{DEPTH - 1}'
+    # Вход в каждый уровень прибавляет единицу
+    assert sm.components['Counter1'].obj.value == DEPTH
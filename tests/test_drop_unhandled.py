@@ -0,0 +1,23 @@
+from state_machine_sim.cgml_signal import StateMachine, run_state_machine
+from tests.helpers import load_cgml_sm
+
+
+def test_handled_signals():
+    sm = StateMachine(load_cgml_sm(), {'message': 'АБВ'})
+    assert 'Reader1.char_accepted' in sm.handled_signals
+    assert 'noconditionTransition' in sm.handled_signals
+    assert 'impulseA' not in sm.handled_signals
+
+
+def test_drop_keeps_called_signals():
+    cgml_sm = load_cgml_sm()
+    message = 'АААБББАВС'
+    full = run_state_machine(StateMachine(cgml_sm, {'message': message}), [], 10)
+    full_called = list(full.called_signals)
+    full_signals = list(full.signals)
+
+    sm = StateMachine(cgml_sm, {'message': message})
+    dropped = run_state_machine(sm, [], 10, drop_unhandled=True)
+    assert dropped.called_signals == full_called
+    assert dropped.dropped_signals == len(full_signals) - len(dropped.signals)
+    assert dropped.signals == [s for s in full_signals if s in sm.handled_signals]
@@ -0,0 +1,51 @@
+import random
+
+from state_machine_sim.event_loop import EventLoop
+from state_machine_sim.trace import make_trace
+
+
+class ListEventLoop:
+    """Прежняя реализация: вставка в список по курсору."""
+
+    def __init__(self):
+        self.events = []
+        self.current_event_idx = 0
+        self.insert_event_idx = 0
+
+    def add_event(self, event):
+        self.insert_event_idx += 1
+        self.events.insert(self.insert_event_idx, event)
+
+    def get_event(self):
+        if self.current_event_idx < len(self.events):
+            event = self.events[self.current_event_idx]
+            self.current_event_idx += 1
+            self.insert_event_idx = self.current_event_idx
+            return event
+        return None
+
+
+def test_queue_order_matches_list_cursor():
+    rnd = random.Random(1)
+    for _ in range(200):
+        old, new = ListEventLoop(), EventLoop()
+        for i in range(rnd.randint(0, 5)):
+            old.add_event(f'ext{i}')
+            new.add_event(f'ext{i}')
+        counter = 0
+        for _ in range(rnd.randint(1, 50)):
+            assert new.get_event() == old.get_event()
+            for _ in range(rnd.choice([0, 0, 1, 1, 2, 3])):
+                counter += 1
+                old.add_event(f'e{counter}')
+                new.add_event(f'e{counter}')
+        assert new.events == old.events
+
+
+def test_called_only_trace():
+    loop = EventLoop(make_trace('called'))
+    for i in range(3):
+        loop.add_event(f'e{i}', i == 1)
+    assert loop.get_event() == 'e0'
+    assert loop.events == ['e1', 'e2']
+    assert loop.called_events == ['e1']
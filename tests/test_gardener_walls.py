@@ -0,0 +1,89 @@
+from collections import deque
+
+import pytest
+
+from state_machine_sim.components import Gardener, GardenerCrashException
+
+
+def reachable_cells(gardener: Gardener) -> int:
+    field = gardener.field
+    seen = {(0, 0)}
+    queue = deque([(0, 0)])
+    while queue:
+        x, y = queue.popleft()
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if (0 <= nx < gardener.N and 0 <= ny < gardener.M
+                    and field[ny][nx] != -1 and (nx, ny) not in seen):
+                seen.add((nx, ny))
+                queue.append((nx, ny))
+    return len(seen)
+
+
+@pytest.mark.parametrize('size', [(1, 1), (2, 1), (7, 5), (40, 25), (120, 90)])
+@pytest.mark.parametrize('wall_fraction', [0.2, 0.5, 0.9])
+def test_walls_keep_field_connected(size, wall_fraction):
+    gardener = Gardener(*size, seed=7)
+    gardener.generate_walls(wall_fraction)
+    walls = sum(cell == -1 for row in gardener.field for cell in row)
+    free = size[0] * size[1] - walls
+    assert walls == min(int(size[0] * size[1] * wall_fraction), size[0] * size[1] - 1)
+    assert gardener.field[0][0] == 0
+    assert reachable_cells(gardener) == free
+
+
+def test_walls_skip_flowers_and_respect_limit():
+    gardener = Gardener(10, 10, seed=3)
+    gardener.field[4][4] = gardener.ROSE
+    gardener.generate_walls(0.9)
+    assert gardener.field[4][4] == gardener.ROSE
+    assert reachable_cells(gardener) == sum(cell != -1 for row in gardener.field for cell in row)
+    limited = Gardener(10, 10, seed=3)
+    limited.generate_walls(0.5, max_attempts=5)
+    assert sum(cell == -1 for row in limited.field for cell in row) == 5
+
+
+def wall_ahead(gardener: Gardener, x: int, y: int, direction: int) -> bool:
+    dx, dy = {gardener.SOUTH: (0, 1), gardener.NORTH: (0, -1),
+              gardener.WEST: (-1, 0), gardener.EAST: (1, 0)}[direction]
+    nx, ny = x + dx, y + dy
+    return not (0 <= nx < gardener.N and 0 <= ny < gardener.M) or gardener.field[ny][nx] == -1
+
+
+def test_wall_masks_match_field():
+    gardener = Gardener(9, 6, with_walls=True, seed=5)
+    gardener.set_wall(8, 5)
+    gardener.set_wall(3, 3, wall=False)
+    left = {gardener.NORTH: gardener.WEST, gardener.WEST: gardener.SOUTH,
+            gardener.SOUTH: gardener.EAST, gardener.EAST: gardener.NORTH}
+    for y in range(gardener.M):
+        for x in range(gardener.N):
+            for orientation in (gardener.SOUTH, gardener.NORTH, gardener.WEST, gardener.EAST):
+                gardener.x, gardener.y, gardener.orientation = x, y, orientation
+                gardener.update_walls()
+                assert gardener.wall_straight() == wall_ahead(gardener, x, y, orientation)
+                assert gardener.wall_left() == wall_ahead(gardener, x, y, left[orientation])
+
+
+def test_field_rows_write_through():
+    gardener = Gardener(4, 3)
+    gardener.field[2][1] = gardener.MINT
+    gardener.x, gardener.y = 1, 2
+    assert gardener.get_current_flower() == gardener.MINT
+    gardener.field = [[0, -1, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]]
+    gardener.x, gardener.y, gardener.orientation = 0, 0, gardener.EAST
+    gardener.update_walls()
+    assert gardener.wall_straight()
+
+
+def test_wall_written_through_field_updates_masks():
+    gardener = Gardener(3, 3)
+    # Садовник в (0, 0) смотрит на юг; стена в (0, 1) прямо перед ним
+    gardener.field[1][0] = -1
+    assert gardener.wall_mask[0] >> gardener.SOUTH & 1
+    with pytest.raises(GardenerCrashException):
+        gardener.step(gardener.SOUTH)
+    gardener.field[1][0] = gardener.ROSE
+    assert not gardener.wall_mask[0] >> gardener.SOUTH & 1
+    gardener.step(gardener.SOUTH)
+    assert (gardener.x, gardener.y) == (0, 1)
+    assert gardener.get_current_flower() == gardener.ROSE
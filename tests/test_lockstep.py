@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+from state_machine_sim import lockstep
+from state_machine_sim.cgml_signal import StateMachine, run_state_machine
+from state_machine_sim.lockstep import flatten_reader_machine, run_lockstep
+from tests.helpers import load_cgml_sm
+
+
+def make_messages():
+    rnd = random.Random(0)
+    return [''.join(rnd.choice('АБВГД') for _ in range(rnd.randint(0, 15))) for _ in range(200)]
+
+
+def summary(results):
+    return [(r.signals, r.called_signals, r.steps, r.transitions, r.stop_reason) for r in results]
+
+
+def scalar_results(cgml_sm, messages):
+    return summary(
+        run_state_machine(StateMachine(cgml_sm, {'message': m}), [], None, trace='called')
+        for m in messages
+    )
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_lockstep_matches_scalar_runs(monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(lockstep, "np", None)
+    cgml_sm = load_cgml_sm()
+    messages = make_messages()
+    results = run_lockstep(StateMachine(cgml_sm, {'message': ''}), messages, [])
+    assert summary(results) == scalar_results(cgml_sm, messages)
+
+
+def test_lockstep_falls_back_for_unexplored_states():
+    cgml_sm = load_cgml_sm()
+    messages = make_messages()
+    sm = StateMachine(cgml_sm, {'message': ''})
+    flat = flatten_reader_machine(sm, [], ''.join(messages), max_states=3)
+    assert flat.state_count == 3
+    results = run_lockstep(sm, messages, [], flat=flat)
+    assert summary(results) == scalar_results(cgml_sm, messages)
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_lockstep_falls_back_for_chars_outside_alphabet(monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(lockstep, "np", None)
+    cgml_sm = load_cgml_sm()
+    sm = StateMachine(cgml_sm, {'message': ''})
+    flat = flatten_reader_machine(sm, [], 'АБ')
+    # В и Я вне алфавита таблиц: Я идет после всех его букв
+    messages = ['АВВВБ', 'ВВВ', 'АБЯ', 'Я', 'АБ', '']
+    results = run_lockstep(sm, messages, [], flat=flat)
+    assert summary(results) == scalar_results(cgml_sm, messages)
+
+
+def test_lockstep_keys_states_by_index_when_guards_read_it():
+    cgml_sm = load_cgml_sm("ReaderIndex.graphml")
+    messages = ['АБВ', 'АБ', 'А', '', 'ББББ', 'АААААА']
+    results = run_lockstep(StateMachine(cgml_sm, {'message': ''}), messages, [])
+    assert summary(results) == scalar_results(cgml_sm, messages)
+
+
+def test_lockstep_run_ending_exactly_at_max_steps():
+    cgml_sm = load_cgml_sm()
+    messages = ['АБВ', 'ААА']
+    # 6 и 8 - ровно столько шагов делают запуски этих сообщений
+    for max_steps in (None, 5, 6, 7, 8):
+        expected = summary(
+            run_state_machine(StateMachine(cgml_sm, {'message': m}), [], None,
+                              trace='called', max_steps=max_steps)
+            for m in messages)
+        results = run_lockstep(StateMachine(cgml_sm, {'message': ''}), messages, [],
+                               max_steps=max_steps)
+        assert summary(results) == expected
+
+
+def test_lockstep_rejects_unsupported_components():
+    cgml_sm = load_cgml_sm("PingPong.graphml")
+    with pytest.raises(ValueError):
+        flatten_reader_machine(StateMachine(cgml_sm, {}), [], 'А')
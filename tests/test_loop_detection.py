@@ -0,0 +1,42 @@
+from state_machine_sim.cgml_signal import (
+    StateMachine, StateMachineRun, run_state_machine, STOP_LOOP, STOP_FINISHED)
+from state_machine_sim.components import Gardener
+from tests.helpers import load_cgml_sm
+
+
+def test_ping_pong_is_detected():
+    sm = StateMachine(load_cgml_sm("PingPong.graphml"), {})
+    result = run_state_machine(sm, [], None, detect_loops=True)
+    assert result.stop_reason == STOP_LOOP
+    assert result.timeout
+    assert result.loop_cycle == ['Пинг', 'Понг']
+    assert result.steps < 10
+
+
+def test_reader_run_is_not_a_loop():
+    sm = StateMachine(load_cgml_sm("from_ide.graphml"), {'message': 'АААА'})
+    result = run_state_machine(sm, [], None, detect_loops=True)
+    assert result.stop_reason == STOP_FINISHED
+    assert result.loop_cycle is None
+    assert result.called_signals == ['impulseA'] * 4
+
+
+def test_planted_flower_is_part_of_configuration():
+    # Состояние повторяется, но поле уже другое: второй осмотр видит цветок
+    sm = StateMachine(load_cgml_sm("GardenerPlant.graphml"), {'gardener': Gardener(3, 3)})
+    result = run_state_machine(sm, [], None, detect_loops=True)
+    assert result.stop_reason != STOP_LOOP
+    assert result.loop_cycle is None
+    assert result.called_signals == ['impulseA']
+
+
+def test_unchanged_field_is_stored_once():
+    gardener = Gardener(5, 5, with_walls=True, seed=0)
+    sm = StateMachine(load_cgml_sm("GardenerWalker.graphml"), {'gardener': gardener})
+    run = StateMachineRun(sm, [], None, detect_loops=True, max_steps=50)
+    run.run_steps()
+    configurations = run.loop_detector.configurations
+    # Обходчик не меняет поле: одни и те же байты поля на всех шагах
+    fields = {id(component[3]) for configuration in configurations
+              for component in configuration[2] if len(component) == 4}
+    assert len(configurations) > 10 and len(fields) == 1
@@ -0,0 +1,57 @@
+import random
+
+from state_machine_sim.cgml_signal import StateMachine
+from state_machine_sim.components import Gardener
+from state_machine_sim.maze_sweep import run_maze, sweep_mazes
+from tests.helpers import load_cgml_sm
+
+
+def test_gardener_field_reproducible_by_seed():
+    assert Gardener(7, 5, with_walls=True, seed=1).field == Gardener(7, 5, with_walls=True, seed=1).field
+    assert Gardener(7, 5, with_walls=True, seed=1).field != Gardener(7, 5, with_walls=True, seed=2).field
+    # Явный генератор и глобальный random не влияют друг на друга
+    state = random.getstate()
+    gardener = Gardener(7, 5, with_walls=True, rng=random.Random(1))
+    assert random.getstate() == state
+    assert gardener.field == Gardener(7, 5, with_walls=True, seed=1).field
+
+
+def test_sweep_matches_sequential_runs():
+    cgml_sm = load_cgml_sm("GardenerWalker.graphml")
+    sizes = [(5, 5), (8, 4)]
+    result = sweep_mazes(cgml_sm, sizes, 6, base_seed=10, workers=2, chunk_size=4,
+                         keep_runs=True, max_steps=300, drop_unhandled=True)
+    sm = StateMachine(cgml_sm, {'gardener': Gardener(5, 5)})
+    expected = [run_maze(sm, size, seed, [], max_steps=300, drop_unhandled=True)
+                for size in sizes for seed in range(10, 16)]
+    assert result.runs == expected
+    assert result.total.runs == 12
+    assert result.by_size[(8, 4)].runs == 6
+    assert result.total.crash_rate == 0
+    assert 0 < result.total.mean_coverage <= 1
+
+
+def test_sweep_counts_crashes():
+    result = sweep_mazes(load_cgml_sm("GardenerWalker.graphml"), [(4, 4)], 5, signals=['blind'],
+                         workers=1, max_steps=300, keep_runs=True)
+    assert result.total.crashes == 5
+    assert result.total.crash_rate == 1
+    # Шаги до аварии тоже считаются
+    assert all(run.crashed and run.steps > 0 for run in result.runs)
+    assert result.total.mean_steps > 0
+
+
+def test_reset_restores_sensor_readings():
+    cgml_sm = load_cgml_sm("GardenerWalker.graphml")
+
+    def readings(sm):
+        sensor = sm.components['Sensor1'].obj
+        return (sensor.flower, sensor.wall_right, sensor.wall_left, sensor.wall_straight,
+                sensor.wall_back)
+
+    fresh = readings(StateMachine(cgml_sm, {'gardener': Gardener(4, 4)}))
+    sm = StateMachine(cgml_sm, {'gardener': Gardener(4, 4)})
+    run_maze(sm, (4, 4), 0, [], max_steps=50, drop_unhandled=True)
+    assert readings(sm) != fresh
+    sm.reset({'gardener': Gardener(4, 4)})
+    assert readings(sm) == fresh
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from state_machine_sim.cgml_signal import StateMachine, run_state_machine
+from state_machine_sim.microsteps import MicrostepTracer
+from tests.helpers import load_cgml_sm
+
+
+def test_tracer_records_microsteps():
+    sm = StateMachine(load_cgml_sm(), {'message': 'А'})
+    tracer = MicrostepTracer(sm)
+    sm.set_tracer(tracer)
+    run_state_machine(sm, [], None)
+    lines = tracer.to_text().splitlines()
+    assert lines[:4] == [
+        f'entry {sm.state_name(sm.element_ids[sm.initial])}',
+        f'dispatch noconditionTransition in {sm.state_name(sm.element_ids[sm.initial])}',
+        f'exit {sm.state_name(sm.element_ids[sm.initial])}',
+        'entry Состояние',
+    ]
+    assert 'guard [Reader1.current_char == А] = True in Состояние' in lines
+    assert 'dispatch Reader1.line_finished in Состояние' in lines
+    records = json.loads(tracer.to_json())
+    assert len(records) == tracer.count
+    assert records[1] == {'kind': 'dispatch', 'state': records[0]['state'],
+                          'event': 'noconditionTransition'}
+
+
+def test_tracer_keeps_last_records():
+    sm = StateMachine(load_cgml_sm(), {'message': 'АБВ' * 10})
+    full = MicrostepTracer(sm)
+    sm.set_tracer(full)
+    run_state_machine(sm, [], None)
+    sm.reset({'message': 'АБВ' * 10})
+    ring = MicrostepTracer(sm, capacity=8)
+    sm.set_tracer(ring)
+    run_state_machine(sm, [], None)
+    assert ring.count == full.count
+    assert ring.raw_records() == full.raw_records()[-8:]
+
+
+def test_detached_tracer_records_nothing():
+    sm = StateMachine(load_cgml_sm(), {'message': 'А'})
+    tracer = MicrostepTracer(sm)
+    sm.set_tracer(tracer)
+    sm.set_tracer(None)
+    run_state_machine(sm, [], None)
+    assert tracer.count == 0
+    with pytest.raises(ValueError):
+        MicrostepTracer(sm, capacity=0)
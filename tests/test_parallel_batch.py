@@ -0,0 +1,32 @@
+from state_machine_sim.batch import run_batch
+from state_machine_sim.cgml_signal import StateMachine, run_state_machine
+from state_machine_sim.parallel import run_batch_parallel
+from tests.helpers import load_cgml_sm
+
+
+def test_parallel_results_in_input_order():
+    cgml_sm = load_cgml_sm()
+    messages = ['А' * i + 'Б' for i in range(30)]
+    expected = [
+        run_state_machine(StateMachine(cgml_sm, {'message': m}), [], 10).called_signals
+        for m in messages
+    ]
+    items = list(run_batch_parallel(
+        cgml_sm, [{'message': m} for m in messages], [],
+        workers=2, chunk_size=4, timeout_sec=10))
+    assert [item.index for item in items] == list(range(len(messages)))
+    assert [item.result.called_signals for item in items] == expected
+
+
+def test_parallel_stops_on_first_failure():
+    cgml_sm = load_cgml_sm()
+    messages = ['А' * i + 'Б' for i in range(30)]
+    expected = [item.passed for item in run_batch(
+        StateMachine(cgml_sm, {'message': ''}), [{'message': m} for m in messages], [],
+        check=lambda result: result.steps < 12, stop_on_first_failure=True, timeout_sec=10)]
+    items = list(run_batch_parallel(
+        cgml_sm, [{'message': m} for m in messages], [],
+        check=lambda result: result.steps < 12, stop_on_first_failure=True,
+        workers=2, chunk_size=4, timeout_sec=10))
+    assert [item.passed for item in items] == expected
+    assert expected[-1] is False and len(expected) < len(messages)
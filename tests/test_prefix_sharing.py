@@ -0,0 +1,51 @@
+import pytest
+
+from state_machine_sim.cgml_signal import StateMachine, run_state_machine
+from state_machine_sim.prefix import build_prefix_trie, run_prefix_shared, sharing_pays_off
+from tests.helpers import load_cgml_sm
+
+
+def test_prefix_shared_matches_separate_runs():
+    cgml_sm = load_cgml_sm()
+    messages = ['АААБББАВС', 'АААБББ', 'ААА', '', 'БББ', 'АААБББАВС', 'АБВГДА' * 5]
+    expected = []
+    for message in messages:
+        result = run_state_machine(StateMachine(cgml_sm, {'message': message}), [], None)
+        expected.append((result.signals, result.called_signals, result.steps, result.stop_reason))
+    results, stats = run_prefix_shared(StateMachine(cgml_sm, {'message': ''}), messages, [],
+                                       timeout_sec=None)
+    assert [(r.signals, r.called_signals, r.steps, r.stop_reason) for r in results] == expected
+    assert stats.steps_separate == sum(item[2] for item in expected)
+
+
+def test_prefix_shared_saves_steps_on_common_prefix():
+    sm = StateMachine(load_cgml_sm(), {'message': ''})
+    prefix = 'АБВ' * 20
+    _, stats = run_prefix_shared(sm, [prefix + tail for tail in 'АБВГД'], [], timeout_sec=None)
+    assert stats.steps_executed < stats.steps_separate / 2
+
+
+def test_prefix_shared_runs_separately_without_common_prefixes():
+    messages = ['АААГБББАВС', 'ОМСМЯЧСФЫ', 'АБВ']
+    assert not sharing_pays_off(build_prefix_trie(messages))
+    assert sharing_pays_off(build_prefix_trie(['АБВ' * 5 + tail for tail in 'АБ']))
+    sm = StateMachine(load_cgml_sm(), {'message': ''})
+    results, stats = run_prefix_shared(sm, messages, [], timeout_sec=None)
+    assert stats.steps_executed == stats.steps_separate
+    expected = [run_state_machine(StateMachine(load_cgml_sm(), {'message': m}), [], None)
+                for m in messages]
+    assert [(r.called_signals, r.steps) for r in results] == [
+        (r.called_signals, r.steps) for r in expected]
+
+
+def test_prefix_trie_groups_messages():
+    root = build_prefix_trie(['АБ', 'А', 'В'])
+    assert list(root.children) == ['А', 'В']
+    assert root.children['А'].ends == [1]
+    assert root.children['А'].subtree == [0, 1]
+
+
+def test_prefix_shared_rejects_stream_trace():
+    sm = StateMachine(load_cgml_sm(), {'message': ''})
+    with pytest.raises(ValueError):
+        run_prefix_shared(sm, ['А'], [], trace='stream', trace_sink=print)
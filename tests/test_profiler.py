@@ -0,0 +1,38 @@
+import json
+
+from state_machine_sim.cgml_signal import StateMachine, run_state_machine
+from state_machine_sim.profiler import Profiler
+from tests.helpers import load_cgml_sm
+
+
+def test_profiler_counts_dispatches_and_guards():
+    sm = StateMachine(load_cgml_sm(), {'message': 'АБАБ'})
+    profiler = Profiler(sm)
+    sm.set_tracer(profiler)
+    result = run_state_machine(sm, [], None)
+    assert sum(p.dispatches for p in profiler.states.values()) == result.steps
+    state_id = next(i for i, name in sm.state_names.items() if name == 'Состояние')
+    profile = profiler.states[state_id]
+    # Условие [Reader1.current_char == А] проверяется на каждом из четырех символов
+    assert profile.guard_evaluations == 4
+    assert profile.self_ns <= profile.dispatch_ns
+    guarded = [p for p in profiler.transitions.values() if p.guard_evaluations]
+    assert [(p.guard_evaluations, p.guard_passes) for p in guarded] == [(4, 2)]
+
+    exported = json.loads(profiler.to_json())
+    assert exported['states'][state_id]['name'] == 'Состояние'
+    assert exported['states'][state_id]['dispatches'] == profile.dispatches
+
+
+def test_profiler_collapsed_stacks():
+    sm = StateMachine(load_cgml_sm(), {'message': 'АБВ' * 200})
+    profiler = Profiler(sm)
+    sm.set_tracer(profiler)
+    run_state_machine(sm, [], None)
+    lines = profiler.to_collapsed().splitlines()
+    assert lines
+    for line in lines:
+        stack, value = line.rsplit(' ', 1)
+        assert int(value) > 0
+        assert stack.split(';')[0] in set(sm.state_names.values()) | set(sm.element_ids.values())
+    assert any(line.startswith('Состояние;[') for line in lines)
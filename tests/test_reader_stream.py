@@ -0,0 +1,60 @@
+import io
+import random
+
+import pytest
+
+from state_machine_sim.cgml_signal import StateMachine, StateMachineRun, run_state_machine
+from state_machine_sim.components.reader import message_chunks
+from tests.helpers import load_cgml_sm
+
+
+def random_chunks(text, rnd):
+    position = 0
+    while position < len(text):
+        size = rnd.randint(0, 7)
+        yield text[position:position + size]
+        position += size
+
+
+def outcome(result):
+    return result.signals, result.called_signals, result.steps, result.stop_reason
+
+
+MESSAGE = 'АББВАГААБВ' * 30
+
+
+@pytest.mark.parametrize('make_source', [
+    lambda: iter(MESSAGE),
+    lambda: random_chunks(MESSAGE, random.Random(1)),
+    lambda: io.StringIO(MESSAGE),
+    lambda: io.BytesIO(MESSAGE.encode('utf-8')),
+])
+def test_stream_matches_string_message(make_source):
+    cgml_sm = load_cgml_sm()
+    expected = run_state_machine(StateMachine(cgml_sm, {'message': MESSAGE}), [], None)
+    sm = StateMachine(cgml_sm, {'message': make_source()})
+    result = run_state_machine(sm, [], None)
+    assert outcome(result) == outcome(expected)
+    assert sm.components['Reader1'].obj.index == expected.components['Reader1'].obj.index
+
+
+def test_binary_chunks_split_multibyte_characters():
+    data = 'АБВ' * 5
+    chunks = list(message_chunks(io.BytesIO(data.encode('utf-8')), chunk_size=3))
+    assert ''.join(chunks) == data
+    assert max(len(chunk) for chunk in chunks) <= 3
+
+
+def test_streaming_reader_keeps_one_chunk():
+    sm = StateMachine(load_cgml_sm(), {'message': random_chunks(MESSAGE, random.Random(2))})
+    run_state_machine(sm, [], None, trace='last')
+    reader = sm.components['Reader1'].obj
+    assert len(reader.message) <= 7
+    assert reader.offset + len(reader.message) == len(MESSAGE)
+
+
+def test_streaming_reader_cannot_be_snapshotted():
+    sm = StateMachine(load_cgml_sm(), {'message': iter(MESSAGE)})
+    run = StateMachineRun(sm, [], None)
+    with pytest.raises(ValueError):
+        run.snapshot()
@@ -0,0 +1,75 @@
+import json
+import sqlite3
+
+from state_machine_sim import cache as cache_module
+from state_machine_sim.cache import (
+    ResultCache,
+    is_cacheable,
+    result_key,
+    run_state_machine_cached,
+)
+from state_machine_sim.cgml_signal import StateMachine, run_state_machine
+from tests.helpers import load_cgml_sm
+
+
+def outcome(result):
+    return result.signals, result.called_signals, result.steps, result.stop_reason
+
+
+def test_cached_result_matches_run():
+    cgml_sm = load_cgml_sm()
+    cache = ResultCache()
+    expected = run_state_machine(StateMachine(cgml_sm, {'message': 'АБВ'}), [], None)
+    first = run_state_machine_cached(cache, cgml_sm, {'message': 'АБВ'}, [], timeout_sec=None)
+    second = run_state_machine_cached(cache, cgml_sm, {'message': 'АБВ'}, [], timeout_sec=None)
+    assert outcome(first) == outcome(second) == outcome(expected)
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+    assert second.components == {}
+    # Другие входы или опции - другой ключ
+    run_state_machine_cached(cache, cgml_sm, {'message': 'АБ'}, [], timeout_sec=None)
+    run_state_machine_cached(cache, cgml_sm, {'message': 'АБВ'}, [], max_steps=3)
+    assert cache.stats.misses == 3
+
+
+def test_lru_evicts_oldest():
+    cgml_sm = load_cgml_sm()
+    cache = ResultCache(max_entries=2)
+    for message in ('А', 'Б', 'В'):
+        run_state_machine_cached(cache, cgml_sm, {'message': message}, [])
+    assert len(cache) == 2
+    run_state_machine_cached(cache, cgml_sm, {'message': 'А'}, [])
+    assert cache.stats.hits == 0
+
+
+def test_sqlite_cache_survives_restart(tmp_path):
+    cgml_sm = load_cgml_sm()
+    path = str(tmp_path / 'results.sqlite')
+    with ResultCache(path=path) as cache:
+        expected = run_state_machine_cached(cache, cgml_sm, {'message': 'ББА'}, [])
+    with ResultCache(path=path) as cache:
+        result = run_state_machine_cached(cache, cgml_sm, {'message': 'ББА'}, [])
+        assert cache.stats.hits == 1
+    assert outcome(result) == outcome(expected)
+    # В файле - JSON, а не pickle
+    with sqlite3.connect(path) as db:
+        [(value,)] = db.execute('SELECT value FROM results').fetchall()
+    assert json.loads(value)[2] == expected.called_signals
+
+
+def test_key_depends_on_cache_version(monkeypatch):
+    key = result_key('hash', {'message': 'А'}, [], {})
+    monkeypatch.setattr(cache_module, 'CACHE_VERSION', cache_module.CACHE_VERSION + 1)
+    assert result_key('hash', {'message': 'А'}, [], {}) != key
+
+
+def test_nondeterministic_runs_are_not_cached():
+    cgml_sm = load_cgml_sm("CyberiadaFormat-Blinker.graphml")
+    assert not is_cacheable(cgml_sm)
+    assert is_cacheable(cgml_sm, virtual_time=True)
+    cache = ResultCache()
+    run_state_machine_cached(cache, cgml_sm, {}, [], max_steps=10, virtual_time=False)
+    assert cache.stats.refused == 1
+    assert len(cache) == 0
+    # Параметры, которые нельзя записать в JSON
+    run_state_machine_cached(cache, load_cgml_sm(), {'message': 'А', 'extra': object()}, [])
+    assert cache.stats.refused == 2
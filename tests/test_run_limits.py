@@ -0,0 +1,52 @@
+from state_machine_sim.cgml_signal import (
+    StateMachine,
+    run_state_machine,
+    STOP_FINISHED,
+    STOP_MAX_STEPS,
+    STOP_MAX_TRANSITIONS,
+    STOP_TIMEOUT,
+)
+from tests.helpers import load_cgml_sm
+
+MESSAGE = 'АААБББАВС'
+
+
+def load_sm():
+    return StateMachine(load_cgml_sm(), {'message': MESSAGE})
+
+
+def test_finished_run_reports_steps():
+    result = run_state_machine(load_sm(), [], 10)
+    assert result.stop_reason == STOP_FINISHED
+    assert not result.timeout
+    assert result.steps == len(result.signals)
+    assert result.transitions >= 1
+
+
+def test_max_steps():
+    result = run_state_machine(load_sm(), [], None, max_steps=5)
+    assert result.stop_reason == STOP_MAX_STEPS
+    assert result.timeout
+    assert result.steps == 5
+
+
+def test_run_ending_exactly_at_max_steps_is_finished():
+    steps = run_state_machine(load_sm(), [], None).steps
+    result = run_state_machine(load_sm(), [], None, max_steps=steps)
+    assert result.stop_reason == STOP_FINISHED
+    assert not result.timeout
+    assert result.steps == steps
+    result = run_state_machine(load_sm(), [], None, max_steps=steps - 1)
+    assert result.stop_reason == STOP_MAX_STEPS
+
+
+def test_max_transitions():
+    result = run_state_machine(load_sm(), [], None, max_transitions=1)
+    assert result.stop_reason == STOP_MAX_TRANSITIONS
+    assert result.transitions == 1
+
+
+def test_clock_is_sampled():
+    result = run_state_machine(load_sm(), [], 0, clock_check_interval=3)
+    assert result.stop_reason == STOP_TIMEOUT
+    assert result.steps == 3
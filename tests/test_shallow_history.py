@@ -0,0 +1,25 @@
+from state_machine_sim.cgml_signal import StateMachine, run_state_machine
+from tests.helpers import load_cgml_sm
+
+
+def test_history_uses_default_transition_first_time():
+    sm = StateMachine(load_cgml_sm("ShallowHistory.graphml"), {})
+    result = run_state_machine(sm, ['resume'], None)
+    # Пауза, затем вход через историю без записи - переход по умолчанию в Первый
+    assert result.called_signals == ['impulseC', 'impulseA']
+    assert sm.state_name(sm.current_state_id()) == 'Первый'
+
+
+def test_history_restores_last_substate():
+    sm = StateMachine(load_cgml_sm("ShallowHistory.graphml"), {})
+    result = run_state_machine(sm, ['resume', 'next', 'pause', 'resume'], None)
+    assert result.called_signals == ['impulseC', 'impulseA', 'impulseB', 'impulseC', 'impulseB']
+    assert sm.state_name(sm.current_state_id()) == 'Второй'
+
+
+def test_history_is_cleared_on_reset():
+    sm = StateMachine(load_cgml_sm("ShallowHistory.graphml"), {})
+    run_state_machine(sm, ['resume', 'next', 'pause'], None)
+    sm.reset({})
+    result = run_state_machine(sm, ['resume'], None)
+    assert result.called_signals == ['impulseC', 'impulseA']
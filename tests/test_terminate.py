@@ -0,0 +1,27 @@
+from state_machine_sim.cgml_signal import (
+    StateMachine,
+    run_state_machine,
+    STOP_FINAL,
+    STOP_TERMINATED,
+)
+from tests.helpers import load_cgml_sm
+
+
+def test_terminate_stops_and_discards_queue():
+    sm = StateMachine(load_cgml_sm("Terminate.graphml"), {})
+    result = run_state_machine(sm, ['tick', 'kill', 'tick', 'tick'], None)
+    assert result.stop_reason == STOP_TERMINATED
+    assert not result.timeout
+    assert result.called_signals == ['impulseA']
+    assert result.signals == ['noconditionTransition', 'tick', 'kill']
+    assert sm.current_state_id() == 'stop'
+
+
+def test_final_stops_without_processing_pending_events():
+    sm = StateMachine(load_cgml_sm("Terminate.graphml"), {})
+    result = run_state_machine(sm, ['finish', 'tick'], None)
+    assert result.stop_reason == STOP_FINAL
+    assert result.called_signals == ['impulseB']
+    # Необработанное событие остается в очереди, 'break' больше не нужен
+    assert result.signals == ['noconditionTransition', 'finish', 'tick', 'impulseB']
+    assert result.steps == 2
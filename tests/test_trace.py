@@ -0,0 +1,35 @@
+import pytest
+
+from state_machine_sim.cgml_signal import StateMachine, run_state_machine
+from tests.helpers import load_cgml_sm
+
+MESSAGE = 'АААБББАВС' * 200
+
+
+def run(cgml_sm, **kwargs):
+    return run_state_machine(StateMachine(cgml_sm, {'message': MESSAGE}), [], 10, **kwargs)
+
+
+def test_trace_modes_bound_called_signals():
+    cgml_sm = load_cgml_sm()
+    full = run(cgml_sm)
+
+    last = run(cgml_sm, trace='last', trace_size=5)
+    assert last.signals == full.signals[-5:]
+    assert len(full.called_signals) > 5
+    assert last.called_signals == full.called_signals[-5:]
+
+    called = run(cgml_sm, trace='called')
+    assert called.signals == []
+    assert called.called_signals == full.called_signals
+
+    streamed = []
+    stream = run(cgml_sm, trace='stream', trace_sink=lambda e, c: streamed.append((e, c)))
+    assert [e for e, c in streamed if not c] == full.signals
+    assert [e for e, c in streamed if c] == full.called_signals
+    assert stream.called_signals == []
+
+
+def test_unknown_trace_mode():
+    with pytest.raises(ValueError):
+        run(load_cgml_sm(), trace='everything')
@@ -0,0 +1,30 @@
+from state_machine_sim.cgml_signal import StateMachine, run_state_machine, STOP_LOOP, STOP_MAX_STEPS
+from state_machine_sim.virtual_clock import VirtualClock
+from tests.helpers import load_cgml_sm
+
+
+def test_blinker_runs_in_virtual_time():
+    # Timer1.start(1000): каждое событие таймера - ровно секунда виртуального времени
+    sm = StateMachine(load_cgml_sm("CyberiadaFormat-Blinker.graphml"), {})
+    result = run_state_machine(sm, [], None, max_steps=7, virtual_time=True)
+    assert result.stop_reason == STOP_MAX_STEPS
+    assert result.signals.count('Timer1.timeout') == 6
+    assert result.virtual_time == 6000
+
+
+def test_virtual_timers_are_part_of_configuration():
+    sm = StateMachine(load_cgml_sm("CyberiadaFormat-Blinker.graphml"), {})
+    result = run_state_machine(sm, [], None, virtual_time=True, detect_loops=True)
+    assert result.stop_reason == STOP_LOOP
+    assert result.virtual_time == 2000
+
+
+def test_virtual_clock_order_and_cancel():
+    clock = VirtualClock()
+    clock.schedule(10, 'b')
+    first = clock.schedule(5, 'a')
+    clock.schedule(10, 'c')
+    clock.cancel(first)
+    assert clock.pending() == ((10, 'b'), (10, 'c'))
+    assert [clock.pop_due(), clock.pop_due(), clock.pop_due()] == ['b', 'c', None]
+    assert clock.now == 10